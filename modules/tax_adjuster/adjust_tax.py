@@ -5,11 +5,24 @@
 使用 formulas + openpyxl 实现纯 Python Excel 公式计算
 """
 
+import hashlib
+import io
 import os
-import shutil
-from datetime import datetime
-import formulas
-import openpyxl
+import time
+import numpy as np
+
+from .backends import CompiledBackend
+from .memo import EvaluationMemo
+from .parallel import WorkerError, WorkerPool
+from .solver import brent, broyden, expand_bracket, piecewise_linear, section_search
+from .surrogate import QuadraticSurface, grid_design
+from .telemetry import SearchTelemetry, instrumented
+from .warm_start import WarmStartStore
+from .xlsx_patch import patch_cells, read_cached_values
+
+
+class SearchTimeout(Exception):
+    """搜索达到时间预算（time_budget），由调用方改用目前最优的候选方案"""
 
 
 class TaxAdjuster:
@@ -47,7 +60,112 @@ class TaxAdjuster:
     MARGIN_CELL = 'J14'
     MARGIN_SHEET = '生产成本月结表'
 
-    def __init__(self, file_path, progress_callback=None):
+    # 搜索时会修改的输入单元格
+    SEARCH_INPUTS = (
+        ('测算表', 'E18'),
+        ('测算表', 'G25'),
+        ('生产成本月结表', 'J14'),
+        ('产品成本', 'B11'),
+    )
+
+    # 搜索时需要读取的输出单元格
+    SEARCH_OUTPUTS = (
+        ('测算表', 'G22'),
+        ('测算表', 'E21'),
+        ('测算表', 'E22'),
+        ('测算表', 'E29'),
+        ('测算表', 'E30'),
+        ('测算表', 'E31'),
+        ('测算表', 'B47'),
+        ('销售成本', 'J12'),
+        ('生产成本月结表', 'H11'),
+        ('生产成本月结表', 'F20'),
+    )
+
+    # 计算结果备忘录的输入量化精度（小数位数），差异小于该精度的输入视为同一组
+    MEMO_DECIMALS = {
+        ('测算表', 'E18'): 4,
+        ('测算表', 'G25'): 10,
+        (MARGIN_SHEET, MARGIN_CELL): 6,
+        ('产品成本', 'B11'): 0,
+    }
+
+    # 联立求解 E18、G25 时读取的单元格（前两个为求解目标 G22、E31）
+    JOINT_OUTPUTS = (
+        ('测算表', 'G22'),
+        ('测算表', 'E31'),
+        ('测算表', 'E29'),
+        ('测算表', 'E21'),
+        ('测算表', 'E22'),
+        ('测算表', 'B47'),
+        ('销售成本', 'J12'),
+    )
+
+    # 热启动初始半宽（以上一次结果为中心，未包含目标时几何扩大）
+    WARM_START_WIDTH = {
+        'E18': 5_000,
+        'G25': 0.005,
+        'margin': 0.01,
+    }
+
+    # 灵敏度矩阵（what_if 线性估算）的输出单元格
+    SENSITIVITY_OUTPUTS = (
+        ('测算表', 'G22'),
+        ('测算表', 'E31'),
+        (MARGIN_SHEET, 'H11'),
+        (MARGIN_SHEET, 'F20'),
+    )
+
+    # 灵敏度矩阵各输入（SEARCH_INPUTS）的前向差分步长
+    SENSITIVITY_STEPS = (1.0, 1e-4, 1e-4, 1.0)
+
+    # 响应面代理求解：设计网格每维水平数、候选方案最多校正次数、
+    # 拟合残差上限（相对设计点 H11 跨度，超出时退回 v4）
+    SURROGATE_LEVELS = 3
+    SURROGATE_CORRECTIONS = 3
+    SURROGATE_MAX_RESIDUAL = 0.05
+
+    # 帕累托前沿备选方案：相邻方案间隔（按前沿误差范围归一化）超过 1/备选数量时在其间补点，
+    # 每次最多补点数（一次批量计算）
+    PARETO_GAP_SAMPLES = 6
+
+    # 逐行延拓扫描：预测毛利率附近的搜索窗口半宽与初始步长
+    CONTINUATION_WINDOW = 0.02
+    CONTINUATION_WIDTH = 0.002
+
+    # 个体工商户经营所得税率表各档上限（应纳税所得额），G22 随 E18 在这些拐点间线性变化
+    TAX_BRACKETS = (30_000, 90_000, 300_000, 500_000)
+
+    # 投资者减除（应纳税所得额 = E18 - E19）
+    DEDUCTION_CELL = ('测算表', 'E19')
+
+    # 并行计算工作进程的启动方式
+    PARALLEL_START_METHOD = 'spawn'
+
+    # 当前数据读取的单元格（调整前的展示值）
+    CURRENT_DATA_CELLS = (
+        ('测算表', 'E17'),
+        ('测算表', 'E18'),
+        ('测算表', 'E21'),
+        ('测算表', 'E22'),
+        ('测算表', 'G22'),
+        ('测算表', 'B47'),
+        ('测算表', 'E29'),
+        ('测算表', 'E30'),
+        ('测算表', 'E31'),
+        ('销售成本', 'J12'),
+    )
+
+    # 模型的根工作表：所有读写的单元格都在这些工作表上，
+    # 只加载、编译从它们的公式可达的工作表
+    MODEL_SHEETS = ('测算表', '生产成本月结表', '产品成本', '销售成本')
+
+    # 库存毛利率搜索的输入（毛利率、加工费）与输出（H11、F20）
+    MARGIN_SEARCH_INPUTS = ((MARGIN_SHEET, MARGIN_CELL), ('产品成本', 'B11'))
+    MARGIN_SEARCH_OUTPUTS = ((MARGIN_SHEET, 'H11'), (MARGIN_SHEET, 'F20'))
+
+    def __init__(self, file_path, progress_callback=None, model_cache=None, use_model_cache=True,
+                 backend=None, warm_start=None, use_warm_start=True, telemetry_log=None, keep_loaded=False):
         """初始化，保存文件路径
 
         Args:
@@ -55,82 +173,311 @@ class TaxAdjuster:
             progress_callback: 进度回调函数，签名为 callback(progress, message)
                               progress: 0-100 的进度值
                               message: 进度描述文字
+            model_cache: 模型磁盘缓存（ModelCache），默认使用用户目录下的缓存
+            use_model_cache: 是否启用模型磁盘缓存
+            backend: 计算后端（见 backends 模块），默认使用剪枝编译后端 CompiledBackend；
+                     传入 ParityBackend 可与参考实现并行比对
+            warm_start: 上一次求解结果记录（WarmStartStore），默认使用用户目录下的记录
+            use_warm_start: 是否从同一工作簿系列上一次的结果热启动搜索
+            telemetry_log: 计时统计 JSON Lines 日志路径，默认不写日志
+                           （统计结果总是写入各计算方法返回值的 stats['telemetry']）
+            keep_loaded: 会话模式：模型与计算缓存在各方法调用之间保持加载，工作簿文件
+                         （修改时间、大小、内容哈希）不变时直接复用，不再重新编译；
+                         用完后调用 close() 释放
         """
         self.file_path = os.path.abspath(file_path)
         self._filename = os.path.basename(self.file_path)
-        self.temp_file_path = None  # 临时副本文件路径
+        self._content = None  # 加载模型时读入内存的工作簿内容（bytes），卸载时释放
         self._model = None
+        self._keep_loaded = keep_loaded
+        self._model_users = 0  # 正在使用模型的（嵌套）调用数，_load_model / _unload_model 成对增减
         self._progress_callback = progress_callback
+        if backend is None:
+            backend = CompiledBackend(
+                self.SEARCH_INPUTS, self.SEARCH_OUTPUTS,
+                model_cache=model_cache, use_model_cache=use_model_cache, sheets=self.MODEL_SHEETS,
+            )
+        self._backend = backend
+        # 会话级计算结果备忘录，所有搜索算法共用；工作簿文件变化时清空
+        self._memo = EvaluationMemo(decimals=self.MEMO_DECIMALS)
+        self._source_stat = None  # 上次检查时工作簿文件的 (修改时间, 大小)
+        self._source_digest = None  # 已加载内容的哈希（文件修改时间变化时用于判断内容是否变化）
+        self._sensitivity = None  # 当前工作簿的灵敏度矩阵（与备忘录同时失效）
+        self._solver_evaluations = {}  # 最近一次求根各变量的模型计算次数
+        self._warm_used = set()  # 本次调用中热启动区间包含了目标的变量（E18、G25、margin）
+        # 限时搜索：截止时刻（time.monotonic()，None 表示不限时）、H11/F20 目标范围、
+        # 目前最优的候选方案 (误差, 方案) 与已计算的点数
+        self._deadline = None
+        self._budget_ranges = None
+        self._best_candidate = None
+        self._budget_points = 0
+        if warm_start is None and use_warm_start:
+            warm_start = WarmStartStore()
+        self._warm_start = warm_start if use_warm_start else None
+        self._lineage = WarmStartStore.lineage(self.file_path)
+        # 最近一次计算调用的计时统计（模型计算、加载与各阶段耗时）
+        self._telemetry = SearchTelemetry(telemetry_log)
 
     def _report_progress(self, progress, message=""):
-        """报告进度"""
+        """报告进度（同时作为计时统计的阶段划分）"""
+        self._telemetry.phase(message)
         if self._progress_callback:
             self._progress_callback(progress, message)
 
-    def _create_temp_copy(self):
-        """创建原文件的临时副本"""
-        if self.temp_file_path is None:
-            base, ext = os.path.splitext(self.file_path)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            self.temp_file_path = f"{base}_temp_{timestamp}{ext}"
-            shutil.copy2(self.file_path, self.temp_file_path)
-        return self.temp_file_path
-
-    def _cleanup_temp_file(self):
-        """清理临时副本文件"""
-        if self.temp_file_path and os.path.exists(self.temp_file_path):
-            try:
-                os.remove(self.temp_file_path)
-            except Exception:
-                pass  # 忽略清理失败
-            self.temp_file_path = None
-
     def _cell_key(self, sheet_name, cell):
         """生成 formulas 单元格引用键"""
         return f"'[{self._filename}]{sheet_name}'!{cell}"
 
     def _load_model(self):
-        """加载 formulas ExcelModel"""
+        """通过计算后端加载工作簿（原文件只读取一次到内存，不写临时文件）
+
+        与 _unload_model 成对调用。最外层调用时先检查工作簿文件是否变化，
+        会话模式下文件未变化时复用保持加载的模型。
+        """
+        self._check_source()
         if self._model is None:
-            temp_path = self._create_temp_copy()
-            # 更新 _filename 为临时文件名，因为 formulas 使用文件名作为键的一部分
-            self._filename = os.path.basename(temp_path)
-            self._model = formulas.ExcelModel().loads(temp_path).finish()
+            start = time.perf_counter()
+            with open(self.file_path, 'rb') as f:
+                self._content = f.read()
+            self._source_digest = hashlib.sha256(self._content).hexdigest()
+            self._open_backend(self.file_path, self._content)
+            self._telemetry.record_load(time.perf_counter() - start)
+        self._model_users += 1
+
+    def _open_backend(self, path, content=None):
+        """由计算后端加载工作簿（content 为已读入内存的文件内容，并行工作进程只给出路径）"""
+        self._backend.load(path, content)
+        # formulas 使用文件名作为键的一部分，以后端实际使用的文件名为准
+        self._filename = self._backend.filename
+        self._model = self._backend.model
+
+    def _check_source(self):
+        """工作簿文件变化时清空计算结果备忘录与灵敏度矩阵，并释放已加载的模型
+
+        修改时间、大小都未变时视为未变化；只有修改时间变化时再比较内容哈希，
+        内容相同（如重新保存）时仍保留。有调用正在使用模型时不检查。
+        """
+        if self._model_users:
+            return
+        try:
+            stat = os.stat(self.file_path)
+            source = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            source = None
+        if source is not None and source == self._source_stat:
+            return
+        if (source is not None and self._source_stat is not None and source[1] == self._source_stat[1]
+                and self._source_digest is not None and self._file_digest() == self._source_digest):
+            self._source_stat = source
+            return
+        self._memo.clear()
+        self._sensitivity = None
+        self._source_digest = None
+        self._release_model()
+        self._source_stat = source
+
+    def _file_digest(self):
+        """工作簿文件的内容哈希"""
+        digest = hashlib.sha256()
+        with open(self.file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _warm_solution(self):
+        """本工作簿系列上一次的求解结果（未启用或未记录时为空字典）"""
+        if self._warm_start is None:
+            return {}
+        return self._warm_start.load(self._lineage) or {}
+
+    def _save_warm_solution(self, **solution):
+        """保存求解结果供下次热启动（写入失败不影响计算结果）"""
+        if self._warm_start is None:
+            return
+        try:
+            self._warm_start.save(self._lineage, self.file_path, **solution)
+        except OSError:
+            pass
 
-    def _unload_model(self, save_to_original=False):
-        """卸载模型并清理
+    def _start_budget(self, time_budget, h11_range, f20_range, initial=None):
+        """开始限时搜索（time_budget 为 None 时不限时）
 
         Args:
-            save_to_original: 如果为 True，将副本内容复制回原文件
+            initial: 初始候选方案（如当前值），搜索中的点不优于它时到时返回它
+        """
+        self._deadline = None if time_budget is None else time.monotonic() + time_budget
+        self._budget_ranges = (h11_range, f20_range)
+        self._best_candidate = None
+        self._budget_points = 0
+        if initial is not None:
+            self._consider_candidate(initial['margin'], initial['B11'], initial['H11'], initial['F20'])
+
+    def _end_budget(self):
+        """结束限时搜索"""
+        self._deadline = None
+        self._budget_ranges = None
+        self._best_candidate = None
+
+    def _check_deadline(self):
+        """超过截止时刻时抛出 SearchTimeout（每次实际计算前检查，备忘录命中不受限）"""
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            raise SearchTimeout()
+
+    @staticmethod
+    def _range_error(value, value_range):
+        """value 到目标范围的距离（在范围内为 0）"""
+        low, high = value_range
+        return max(low - value, value - high, 0.0)
+
+    def _consider_candidate(self, margin, b11, h11, f20):
+        """H11 到目标范围的距离更小（相同时比较 F20）时替换目前最优的候选方案"""
+        h11_range, f20_range = self._budget_ranges
+        error = (self._range_error(h11, h11_range), self._range_error(f20, f20_range))
+        if self._best_candidate is None or error < self._best_candidate[0]:
+            self._best_candidate = (error, {'margin': margin, 'B11': b11, 'H11': h11, 'F20': f20})
+
+    def _track_candidates(self, inputs, rows, values):
+        """限时搜索中记录毛利率搜索的计算点"""
+        if self._deadline is None or tuple(inputs) != self.MARGIN_SEARCH_INPUTS:
+            return
+        for (margin, b11), (h11, f20) in zip(rows, values):
+            self._budget_points += 1
+            self._consider_candidate(margin, b11, float(self._to_number(h11)), float(self._to_number(f20)))
+
+    def _budget_result(self):
+        """时间预算用尽时的结果：目前最优的候选方案，converged=False
+
+        Returns:
+            dict: margin, B11, H11, F20, converged, timed_out, h11_error, f20_error、
+                  iterations（限时搜索中的计算点数）
+        """
+        error, candidate = self._best_candidate
+        return {
+            **candidate,
+            'converged': False,
+            'timed_out': True,
+            'h11_error': error[0],
+            'f20_error': error[1],
+            'iterations': self._budget_points,
+        }
+
+    def _memo_stats(self, start):
+        """自 start=(命中, 未命中) 以来的备忘录统计，用于结果 stats"""
+        hits, misses = self._memo.counts()
+        return {'cache_hits': hits - start[0], 'cache_misses': misses - start[1]}
+
+    def _unload_model(self):
+        """结束一次模型使用（与 _load_model 成对调用）
+
+        最外层调用结束时卸载模型并释放内存中的工作簿内容；会话模式下保持加载供下次调用复用。
         """
+        self._model_users = max(self._model_users - 1, 0)
+        if not self._model_users and not self._keep_loaded:
+            self._release_model()
+
+    def _release_model(self):
+        """卸载模型并释放内存中的工作簿内容"""
         self._model = None
+        self._content = None
+        self._backend.close()
 
-        # 如果需要保存到原文件，先复制再清理
-        if save_to_original and self.temp_file_path:
-            shutil.copy2(self.temp_file_path, self.file_path)
+    def close(self):
+        """结束会话：释放保持加载的模型、工作簿内容与计算缓存（如选择了其他文件时）
 
-        # 清理临时文件
-        self._cleanup_temp_file()
+        有计算正在使用模型时，模型在该计算结束后释放。
+        """
+        self._keep_loaded = False
+        if self._model_users:
+            return
+        self._release_model()
+        self._memo.clear()
+        self._sensitivity = None
+        self._source_stat = None
+        self._source_digest = None
+
+    def _calculate(self, inputs=None, outputs=(), default=0):
+        """通过计算后端计算，只返回需要的输出单元格
+
+        默认后端在输入只涉及 SEARCH_INPUTS 时使用剪枝子模型；否则使用完整模型计算。
+        单元格键每个模型只解析一次，计算结果不保留完整 solution；
+        带输入的计算经会话级备忘录去重。
 
-    def _get_value(self, solution, sheet_name, cell):
-        """从 formulas solution 获取单元格值"""
-        key = self._cell_key(sheet_name, cell)
-        if key in solution:
-            val = solution[key].value
-            # formulas 返回 numpy 数组，需要提取标量值
-            if hasattr(val, '__iter__') and not isinstance(val, str):
-                try:
-                    return val[0][0] if len(val) > 0 and hasattr(val[0], '__len__') else val[0]
-                except (IndexError, TypeError):
-                    return val
-            return val
-        return None
-
-    def _calculate(self, inputs=None):
-        """使用 formulas 计算，返回 solution"""
+        Args:
+            inputs: {(sheet, cell): 值}，为空时返回当前工作簿的计算值
+            outputs: 需要读取的单元格 ((sheet, cell), ...)
+            default: 非数值单元格的取值
+
+        Returns:
+            tuple: 与 outputs 顺序一致的浮点数
+        """
+        if inputs:
+            key = self._memo.key(inputs)
+            values = self._memo.lookup(key, outputs)
+            if values is None:
+                self._check_deadline()
+                start = time.perf_counter()
+                values = self._backend.evaluate(inputs, outputs)
+                self._telemetry.record_evaluation(time.perf_counter() - start)
+                self._memo.store(key, outputs, values)
+            if tuple(outputs[:2]) == self.MARGIN_SEARCH_OUTPUTS:
+                self._track_candidates(inputs, [tuple(inputs.values())], [values[:2]])
+        else:
+            start = time.perf_counter()
+            values = self._backend.evaluate({}, outputs)
+            self._telemetry.record_evaluation(time.perf_counter() - start)
+        return tuple(float(self._to_number(value, default)) for value in values)
+
+    def evaluate_many(self, inputs_array, inputs=None, outputs=None):
+        """批量计算多组输入，返回输出数组
+
+        Args:
+            inputs_array: 二维数组，每行一组输入取值，列与 inputs 对应
+            inputs: 输入单元格 ((sheet, cell), ...)，默认 SEARCH_INPUTS
+            outputs: 输出单元格 ((sheet, cell), ...)，默认 SEARCH_OUTPUTS
+
+        Returns:
+            numpy.ndarray: 形状为 (行数, 输出数) 的浮点数组
+        """
         if inputs is None:
-            inputs = {}
-        return self._model.calculate(inputs=inputs)
+            inputs = self.SEARCH_INPUTS
+        if outputs is None:
+            outputs = self.SEARCH_OUTPUTS
+
+        rows = np.asarray(inputs_array, dtype=float).reshape(-1, len(inputs))
+        results = [None] * len(rows)
+        keys = [self._memo.key(dict(zip(inputs, row.tolist()))) for row in rows]
+
+        # 备忘录未命中的行一次批量计算
+        missing = []
+        for i, key in enumerate(keys):
+            results[i] = self._memo.lookup(key, outputs)
+            if results[i] is None:
+                missing.append(i)
+        if missing:
+            self._check_deadline()
+            start = time.perf_counter()
+            computed = self._backend.evaluate_many(inputs, rows[missing], outputs)
+            self._telemetry.record_evaluation(time.perf_counter() - start, len(missing))
+            for i, row in zip(missing, computed):
+                self._memo.store(keys[i], outputs, row)
+                results[i] = row
+
+        values = np.empty((len(rows), len(outputs)))
+        for i, row in enumerate(results):
+            values[i] = [self._to_number(value) for value in row]
+        if tuple(outputs[:2]) == self.MARGIN_SEARCH_OUTPUTS:
+            self._track_candidates(inputs, rows.tolist(), values[:, :2].tolist())
+        return values
+
+    def _get_search_model(self):
+        """获取后端的剪枝子模型（后端不支持时返回 None）"""
+        search_model = getattr(self._backend, 'search_model', None)
+        return search_model() if search_model else None
+
+    def parity_report(self):
+        """比对模式（ParityBackend）下各输出单元格的最大偏差，其他后端返回 None"""
+        report = getattr(self._backend, 'report', None)
+        return report() if report else None
 
     def _to_number(self, value, default=0):
         """将值转换为数字"""
@@ -156,14 +503,21 @@ class TaxAdjuster:
     def _check_margin_cell(self):
         """检查 J14 单元格是否有有效毛利率值
 
+        只流式读取毛利率工作表中保存的值，不再另外解析整个工作簿；
+        J14 为公式且没有可信的计算结果时，从已加载的模型读取。
+
         Returns:
             (is_valid, margin_value, error_message)
         """
+        cell = (self.MARGIN_SHEET, self.MARGIN_CELL)
         try:
-            wb = openpyxl.load_workbook(self.temp_file_path or self.file_path, data_only=True)
-            ws = wb[self.MARGIN_SHEET]
-            value = ws[self.MARGIN_CELL].value
-            wb.close()
+            values = read_cached_values(self._workbook_source(), [cell])
+            if cell in values:
+                value = values[cell]
+            elif self._model is not None:
+                (value,) = self._backend.evaluate({}, [cell])
+            else:
+                value = None
 
             if value is None:
                 return False, None, f"请在 Excel 的 '{self.MARGIN_SHEET}' 工作表 {self.MARGIN_CELL} 单元格中设置毛利率值"
@@ -186,29 +540,155 @@ class TaxAdjuster:
             raise ValueError(error_msg)
         return margin
 
+    def _read_cells(self, cells):
+        """读取当前工作簿的计算值，返回 {单元格: 值}（G25 缺省为 1）"""
+        data = dict(zip((cell for _, cell in cells), self._calculate(outputs=cells)))
+        (data['G25'],) = self._calculate(outputs=[('测算表', 'G25')], default=1)
+        return data
+
+    def _workbook_source(self):
+        """读取工作簿的来源：已读入内存时为内存中的内容，否则为文件路径"""
+        return io.BytesIO(self._content) if self._content is not None else self.file_path
+
+    def _read_cached_cells(self, cells):
+        """从工作簿中 Excel 保存的计算结果读取 {单元格: 值}（取值规则与 _read_cells 一致）
+
+        有单元格没有可信的计算结果或读取失败时返回 None。
+        """
+        g25 = ('测算表', 'G25')
+        try:
+            values = read_cached_values(self._workbook_source(), tuple(cells) + (g25,))
+        except Exception:
+            return None
+        if any(cell not in values for cell in cells) or g25 not in values:
+            return None
+        data = {cell: float(self._to_number(values[(sheet, cell)])) for sheet, cell in cells}
+        data['G25'] = float(self._to_number(values[g25], 1))
+        return data
+
     def get_current_data(self):
-        """获取当前数据（使用 formulas 读取实际计算值）"""
+        """获取当前数据
+
+        模型已加载时从模型读取；否则优先读取工作簿中 Excel 保存的计算结果（只流式解析涉及的工作表），
+        工作簿标记为打开时重算或缺少计算结果时才加载模型计算。
+        """
+        cells = self.CURRENT_DATA_CELLS + (('测算表', 'B2'),)
+        if self._model is None:
+            data = self._read_cached_cells(cells)
+            if data is not None:
+                return data
         self._load_model()
         try:
-            solution = self._calculate()
+            return self._read_cells(cells)
+        finally:
+            self._unload_model()
 
-            return {
-                'E17': self._to_number(self._get_value(solution, '测算表', 'E17')),
-                'E18': self._to_number(self._get_value(solution, '测算表', 'E18')),
-                'E21': self._to_number(self._get_value(solution, '测算表', 'E21')),
-                'E22': self._to_number(self._get_value(solution, '测算表', 'E22')),
-                'E29': self._to_number(self._get_value(solution, '测算表', 'E29')),
-                'E30': self._to_number(self._get_value(solution, '测算表', 'E30')),
-                'E31': self._to_number(self._get_value(solution, '测算表', 'E31')),
-                'G22': self._to_number(self._get_value(solution, '测算表', 'G22')),
-                'B47': self._to_number(self._get_value(solution, '测算表', 'B47')),
-                'G25': self._to_number(self._get_value(solution, '测算表', 'G25'), 1),
-                'J12': self._to_number(self._get_value(solution, '销售成本', 'J12')),
-                'B2': self._to_number(self._get_value(solution, '测算表', 'B2')),
+    def sensitivity(self):
+        """当前工作簿在当前输入处的灵敏度矩阵（工作簿不变时只计算一次）
+
+        当前输入及各输入分别加 SENSITIVITY_STEPS 的 5 组取值一次批量计算，前向差分。
+
+        Returns:
+            dict: {
+                'inputs': {'E18': 当前值, 'G25': ..., 'J14': ..., 'B11': ...},
+                'base': {'G22': 当前值, 'E31': ..., 'H11': ..., 'F20': ...},
+                'matrix': 形状为 (输出数, 输入数) 的数组，matrix[i, j] 为输出 i 对输入 j 的偏导数,
             }
+        """
+        self._check_source()
+        if self._sensitivity is not None:
+            return self._sensitivity
+
+        self._load_model()
+        try:
+            current = self._read_cells(self.SEARCH_INPUTS)
+            names = [cell for _, cell in self.SEARCH_INPUTS]
+            base = np.array([current[name] for name in names])
+            steps = np.array(self.SENSITIVITY_STEPS)
+            rows = np.vstack([base, base + np.diag(steps)])
+            values = self.evaluate_many(rows, self.SEARCH_INPUTS, self.SENSITIVITY_OUTPUTS)
         finally:
             self._unload_model()
 
+        self._sensitivity = {
+            'inputs': dict(zip(names, base.tolist())),
+            'base': dict(zip((cell for _, cell in self.SENSITIVITY_OUTPUTS), values[0].tolist())),
+            'matrix': ((values[1:] - values[0]) / steps[:, None]).T,
+        }
+        return self._sensitivity
+
+    def what_if(self, deltas, verify=False):
+        """由灵敏度矩阵线性估算输入变化后的输出，无需重新搜索
+
+        G22 随 E18 分段线性（税率档拐点），跨档的变化估算有偏差，可用 verify 验证。
+
+        Args:
+            deltas: {输入单元格名: 变化量}，单元格名为 E18、G25、J14、B11
+            verify: 为 True 时另做一次实际计算
+
+        Returns:
+            dict: {
+                'inputs': {输入单元格名: 变化后的值},
+                'estimate': {输出单元格名: 估算值},
+                'exact': {输出单元格名: 实际计算值}（仅 verify）,
+                'error': {输出单元格名: 估算值 - 实际计算值}（仅 verify）,
+            }
+
+        Raises:
+            ValueError: deltas 中有未知的输入单元格名
+        """
+        names = [cell for _, cell in self.SEARCH_INPUTS]
+        unknown = set(deltas) - set(names)
+        if unknown:
+            raise ValueError(f"未知的输入单元格: {', '.join(sorted(unknown))}")
+
+        sensitivity = self.sensitivity()
+        delta = np.array([deltas.get(name, 0.0) for name in names], dtype=float)
+        inputs = {name: sensitivity['inputs'][name] + d for name, d in zip(names, delta)}
+        estimate = np.array(list(sensitivity['base'].values())) + sensitivity['matrix'] @ delta
+        outputs = [cell for _, cell in self.SENSITIVITY_OUTPUTS]
+        result = {
+            'inputs': inputs,
+            'estimate': dict(zip(outputs, estimate.tolist())),
+        }
+
+        if verify:
+            self._load_model()
+            try:
+                exact = self._calculate(
+                    dict(zip(self.SEARCH_INPUTS, inputs.values())), self.SENSITIVITY_OUTPUTS
+                )
+            finally:
+                self._unload_model()
+            result['exact'] = dict(zip(outputs, exact))
+            result['error'] = {name: result['estimate'][name] - value for name, value in zip(outputs, exact)}
+        return result
+
+    def apply_solution(self, values, output_path=None):
+        """把求得的输入值写回工作簿
+
+        只改写输入单元格所在工作表的 XML，并设置 Excel 打开时完全重算，
+        其余内容（样式、其他工作表等）原样保留。写回原文件后模型、备忘录与灵敏度矩阵随文件变化失效。
+
+        Args:
+            values: {输入单元格名: 值}，单元格名为 E18、G25、J14、B11
+            output_path: 输出路径，默认写回原文件
+
+        Returns:
+            list: 改写的部件名
+
+        Raises:
+            ValueError: values 中有未知的输入单元格名
+        """
+        cells = {cell: (sheet, cell) for sheet, cell in self.SEARCH_INPUTS}
+        unknown = set(values) - set(cells)
+        if unknown:
+            raise ValueError(f"未知的输入单元格: {', '.join(sorted(unknown))}")
+
+        return patch_cells(
+            self.file_path, {cells[name]: value for name, value in values.items()}, output_path
+        )
+
     def calculate_tax(self, income):
         """累进税率计算（个体工商户经营所得税率表）"""
         if income <= 30000:
@@ -237,20 +717,64 @@ class TaxAdjuster:
 
     def _get_G22_at_E18(self, E18):
         """设置 E18 并获取计算后的 G22 值"""
-        inputs = {self._cell_key('测算表', 'E18'): E18}
-        solution = self._calculate(inputs)
-        return self._to_number(self._get_value(solution, '测算表', 'G22'))
+        (G22,) = self._calculate({('测算表', 'E18'): E18}, [('测算表', 'G22')])
+        return G22
+
+    def _tax_bracket_knots(self):
+        """税率档拐点对应的 E18 取值（应纳税所得额拐点 + 投资者减除）"""
+        (deduction,) = self._calculate(outputs=[self.DEDUCTION_CELL])
+        return [bracket + deduction for bracket in self.TAX_BRACKETS]
 
-    def find_E18_for_target_G22(self, target_G22=0, tolerance=0.009):
+    def find_E18_for_target_G22(self, target_G22=0, tolerance=0.009, method='piecewise', sections=None,
+                                start=None):
         """
-        二分法查找 E18，使 G22 接近目标值
+        查找 E18，使 G22 接近目标值
         返回 (E18, G22, is_in_range, boundary_info)
+
+        Args:
+            method: 'piecewise'（默认）在税率档拐点处批量计算后按线段线性求解，再验证一次（共 ~7 次计算）；
+                    'brent' 为 Brent 法
+            sections: 给出时改用 k 等分法，每轮批量计算 sections 个内点（1 即二分法）
+            start: 预计的 E18（如上一次的结果），给出时先在其附近的小区间内求解
         """
         low, high = self.E18_MIN, self.E18_MAX
 
-        # 先计算边界值
-        G22_at_low = self._get_G22_at_E18(low)
-        G22_at_high = self._get_G22_at_E18(high)
+        def get_G22_many(points):
+            return self.evaluate_many(
+                [[p] for p in points], (('测算表', 'E18'),), (('测算表', 'G22'),)
+            )
+
+        def solve(low, high, G22_at_low, G22_at_high):
+            # E18 精度到 0.01 元（G22 敏感度约 0.1/元）
+            if sections:
+                return section_search(
+                    lambda points: get_G22_many(points)[:, 0], low, high, target_G22, tolerance,
+                    xtol=0.01, sections=sections, decreasing=True,
+                )
+            if method == 'piecewise':
+                return piecewise_linear(
+                    lambda points: get_G22_many(points)[:, 0], low, high, self._tax_bracket_knots(),
+                    target_G22, tolerance, xtol=0.01, f_low=G22_at_low, f_high=G22_at_high,
+                )
+            return brent(
+                self._get_G22_at_E18, low, high, target_G22, tolerance,
+                xtol=0.01, f_low=G22_at_low, f_high=G22_at_high,
+            )
+
+        # 热启动：从 start 附近的小区间开始，未包含目标时外推/几何扩大
+        if start is not None:
+            *bracket, bracketed, evaluations = expand_bracket(
+                lambda points: get_G22_many(points)[:, 0], start, low, high,
+                self.WARM_START_WIDTH['E18'], target_G22, tolerance,
+            )
+            if bracketed:
+                root = solve(*bracket)
+                self._solver_evaluations['E18'] = evaluations + root.evaluations
+                self._warm_used.add('E18')
+                return root.x, root.value, root.converged, None
+
+        # 先计算边界值（两个边界一次批量计算）
+        (G22_at_low,), (G22_at_high,) = get_G22_many([low, high]).tolist()
 
         # 确定 G22 随 E18 变化的方向
         # E18 增加 -> E21(税额) 增加 -> E22 增加 -> G22 减小
@@ -279,143 +803,169 @@ class TaxAdjuster:
                 'max_G22': max_G22,
             }
 
-        # 二分法查找
-        mid = (low + high) / 2
-        for _ in range(50):  # 最多迭代50次
-            if high - low < 0.01:  # E18 精度到 0.01 元（G22 敏感度约 0.1/元）
-                break
-            mid = (low + high) / 2
-            G22 = self._get_G22_at_E18(mid)
+        root = solve(low, high, G22_at_low, G22_at_high)
+        # 计算次数包含两个边界
+        self._solver_evaluations['E18'] = 2 + root.evaluations
+        return root.x, root.value, root.converged, None
 
-            if abs(G22 - target_G22) < tolerance:
-                return mid, G22, True, None
+    def _solve_E18_G25_jointly(self, E18, G25):
+        """以当前 E18、G25 为初始点，Broyden 法联立求解 G22 = 0、E31 = 0
 
-            # G22 随 E18 增加而减小
-            if G22 > target_G22:
-                low = mid
-            else:
-                high = mid
+        每次计算同时读取结果需要的全部单元格，求解后的验证读取直接命中备忘录。
+
+        Returns:
+            RootResult: x 为 [E18, G25]，value 为 [G22, E31]
+        """
+        inputs = (('测算表', 'E18'), ('测算表', 'G25'))
 
-        final_G22 = self._get_G22_at_E18(mid)
-        return mid, final_G22, abs(final_G22 - target_G22) < tolerance, None
+        def get_values_many(points):
+            return self.evaluate_many(points, inputs, self.JOINT_OUTPUTS)[:, :2]
 
-    def calculate_combined_adjustment(self):
+        root = broyden(
+            get_values_many, [E18, G25],
+            low=[self.E18_MIN, self.G25_MIN], high=[self.E18_MAX, self.G25_MAX],
+            targets=[0, 0], tolerances=[0.009, 0.009], steps=[1.0, 1e-4],
+        )
+        self._solver_evaluations['joint'] = root.evaluations
+        return root
+
+    @instrumented('combined')
+    def calculate_combined_adjustment(self, method='joint'):
         """
         整合计算年利润和月毛利调整方案
         同时调整 E18 和 G25，使 G22 = 0 且 E31 = 0
 
         利用 formulas 公式计算，不在代码中硬编码公式
+
+        Args:
+            method: 'joint'（默认）先联立求解，未收敛时退回逐个求解；'sequential' 先求 E18 再求 G25
+
+        返回值的 stats['telemetry'] 为本次调用的计时统计（见 SearchTelemetry.summary）
         """
         self._report_progress(0, "正在加载 Excel 模型...")
         self._load_model()
+        memo_start = self._memo.counts()
+        self._solver_evaluations = {}
+        self._warm_used = set()
         try:
             self._report_progress(10, "正在读取当前数据...")
             # 获取当前数据（无输入修改）
-            solution = self._calculate()
-
-            original_E18 = self._to_number(self._get_value(solution, '测算表', 'E18'))
-            original_G25 = self._to_number(self._get_value(solution, '测算表', 'G25'), 1)
-
-            current = {
-                'E17': self._to_number(self._get_value(solution, '测算表', 'E17')),
-                'E18': original_E18,
-                'E21': self._to_number(self._get_value(solution, '测算表', 'E21')),
-                'E22': self._to_number(self._get_value(solution, '测算表', 'E22')),
-                'G22': self._to_number(self._get_value(solution, '测算表', 'G22')),
-                'G25': original_G25,
-                'B47': self._to_number(self._get_value(solution, '测算表', 'B47')),
-                'E29': self._to_number(self._get_value(solution, '测算表', 'E29')),
-                'E30': self._to_number(self._get_value(solution, '测算表', 'E30')),
-                'E31': self._to_number(self._get_value(solution, '测算表', 'E31')),
-                'J12': self._to_number(self._get_value(solution, '销售成本', 'J12')),
-            }
-
-            # === 第一步: 查找 E18 使 G22 = 0 ===
-            self._report_progress(20, "正在搜索最优 E18...")
-            target_E18, verify_G22, e18_in_range, e18_boundary = self.find_E18_for_target_G22(
-                target_G22=0, tolerance=0.009
-            )
-
-            # 检查 E18 是否在安全范围
-            e18_safe, e18_msg = self._check_range(
-                target_E18, self.E18_MIN, self.E18_MAX, 'E18'
-            )
-
-            # 设置新的 E18，计算新的 E29
-            inputs_e18 = {self._cell_key('测算表', 'E18'): target_E18}
-            solution_e18 = self._calculate(inputs_e18)
-            new_E29 = self._to_number(self._get_value(solution_e18, '测算表', 'E29'))
-            verify_E21 = self._to_number(self._get_value(solution_e18, '测算表', 'E21'))
-            verify_E22 = self._to_number(self._get_value(solution_e18, '测算表', 'E22'))
-
-            # === 第二步: 查找 G25 使 E31 = 0（在新 E18 基础上）===
-            self._report_progress(50, "正在搜索最优 G25...")
-            # 需要同时设置 E18 和 G25
-            def get_values_at_G25_with_E18(g25):
-                inputs = {
-                    self._cell_key('测算表', 'E18'): target_E18,
-                    self._cell_key('测算表', 'G25'): g25,
-                }
-                sol = self._calculate(inputs)
-                return (
-                    self._to_number(self._get_value(sol, '测算表', 'E31')),
-                    self._to_number(self._get_value(sol, '测算表', 'B47')),
-                    self._to_number(self._get_value(sol, '销售成本', 'J12')),
+            current = self._read_cells(self.CURRENT_DATA_CELLS)
+            original_E18 = current['E18']
+            original_G25 = current['G25']
+            # 同一工作簿系列上一次的结果（逐个求解时热启动）
+            warm = self._warm_solution()
+
+            # === 联立求解 E18、G25 使 G22 = 0 且 E31 = 0 ===
+            joint = None
+            if method == 'joint':
+                self._report_progress(20, "正在联立搜索 E18 和 G25...")
+                # 工作簿当前值通常已沿用上期调整结果，作为联立求解的初始点
+                joint = self._solve_E18_G25_jointly(original_E18, original_G25)
+
+            if joint is not None and joint.converged:
+                target_E18, target_G25 = joint.x.tolist()
+                (verify_G22, verify_E31, new_E29, verify_E21, verify_E22,
+                 verify_B47, verify_J12) = self._calculate(
+                    {('测算表', 'E18'): target_E18, ('测算表', 'G25'): target_G25},
+                    self.JOINT_OUTPUTS,
                 )
-
-            low, high = self.G25_MIN, self.G25_MAX
-
-            E31_at_low, B47_at_low, J12_at_low = get_values_at_G25_with_E18(low)
-            E31_at_high, B47_at_high, J12_at_high = get_values_at_G25_with_E18(high)
-
-            min_E31 = min(E31_at_low, E31_at_high)
-            max_E31 = max(E31_at_low, E31_at_high)
-            target_E31 = 0
-            tolerance = 0.009
-
-            g25_in_range = True
-            g25_boundary = None
-
-            if target_E31 < min_E31:
-                target_G25 = high if E31_at_high < E31_at_low else low
-                verify_E31, verify_B47, verify_J12 = get_values_at_G25_with_E18(target_G25)
-                g25_in_range = False
-                g25_boundary = {
-                    'reason': 'target_too_low',
-                    'target_E31': target_E31,
-                    'min_E31': min_E31,
-                    'boundary_G25': target_G25,
-                }
-            elif target_E31 > max_E31:
-                target_G25 = low if E31_at_low > E31_at_high else high
-                verify_E31, verify_B47, verify_J12 = get_values_at_G25_with_E18(target_G25)
-                g25_in_range = False
-                g25_boundary = {
-                    'reason': 'target_too_high',
-                    'target_E31': target_E31,
-                    'max_E31': max_E31,
-                    'boundary_G25': target_G25,
-                }
+                e18_in_range = g25_in_range = True
+                e18_boundary = g25_boundary = None
             else:
-                # 二分法查找
-                mid = (low + high) / 2
-                for _ in range(50):
-                    if high - low < 1e-9:
-                        break
-                    mid = (low + high) / 2
-                    E31, B47, J12 = get_values_at_G25_with_E18(mid)
+                # 联立求解未收敛（如目标超出安全范围）时逐个求解，给出边界信息
+                # === 第一步: 查找 E18 使 G22 = 0 ===
+                self._report_progress(20, "正在搜索最优 E18...")
+                target_E18, verify_G22, e18_in_range, e18_boundary = self.find_E18_for_target_G22(
+                    target_G22=0, tolerance=0.009, start=warm.get('E18')
+                )
 
-                    if abs(E31 - target_E31) < tolerance:
-                        break
+                # 设置新的 E18，计算新的 E29
+                new_E29, verify_E21, verify_E22 = self._calculate(
+                    {('测算表', 'E18'): target_E18},
+                    [('测算表', 'E29'), ('测算表', 'E21'), ('测算表', 'E22')],
+                )
 
-                    if E31 > target_E31:
-                        low = mid
+                # === 第二步: 查找 G25 使 E31 = 0（在新 E18 基础上）===
+                self._report_progress(50, "正在搜索最优 G25...")
+                # 需要同时设置 E18 和 G25
+                g25_outputs = (('测算表', 'E31'), ('测算表', 'B47'), ('销售成本', 'J12'))
+
+                def get_values_at_G25_with_E18(g25):
+                    return self._calculate(
+                        {('测算表', 'E18'): target_E18, ('测算表', 'G25'): g25}, g25_outputs
+                    )
+
+                def get_values_many_at_G25(points):
+                    return self.evaluate_many(
+                        [(target_E18, g25) for g25 in points],
+                        (('测算表', 'E18'), ('测算表', 'G25')), g25_outputs,
+                    )
+
+                low, high = self.G25_MIN, self.G25_MAX
+                target_E31 = 0
+                tolerance = 0.009
+
+                g25_in_range = True
+                g25_boundary = None
+
+                # 热启动：从上一次的 G25 附近的小区间开始，未包含目标时计算整个范围的两端
+                bracket = None
+                if warm.get('G25') is not None:
+                    *bracket, bracketed, evaluations = expand_bracket(
+                        lambda points: get_values_many_at_G25(points)[:, 0], warm['G25'], low, high,
+                        self.WARM_START_WIDTH['G25'], target_E31, tolerance,
+                    )
+                    if bracketed:
+                        self._warm_used.add('G25')
                     else:
-                        high = mid
+                        bracket = None
+
+                if bracket is None:
+                    evaluations = 2
+                    (E31_at_low, _, _), (E31_at_high, _, _) = get_values_many_at_G25([low, high]).tolist()
+                    min_E31 = min(E31_at_low, E31_at_high)
+                    max_E31 = max(E31_at_low, E31_at_high)
+
+                    if target_E31 < min_E31:
+                        target_G25 = high if E31_at_high < E31_at_low else low
+                        verify_E31, verify_B47, verify_J12 = get_values_at_G25_with_E18(target_G25)
+                        g25_in_range = False
+                        g25_boundary = {
+                            'reason': 'target_too_low',
+                            'target_E31': target_E31,
+                            'min_E31': min_E31,
+                            'boundary_G25': target_G25,
+                        }
+                    elif target_E31 > max_E31:
+                        target_G25 = low if E31_at_low > E31_at_high else high
+                        verify_E31, verify_B47, verify_J12 = get_values_at_G25_with_E18(target_G25)
+                        g25_in_range = False
+                        g25_boundary = {
+                            'reason': 'target_too_high',
+                            'target_E31': target_E31,
+                            'max_E31': max_E31,
+                            'boundary_G25': target_G25,
+                        }
+                    else:
+                        bracket = (low, high, E31_at_low, E31_at_high)
+
+                if bracket is not None:
+                    # Brent 法查找（端点已计算）
+                    bracket_low, bracket_high, E31_at_low, E31_at_high = bracket
+                    root = brent(
+                        lambda g25: get_values_at_G25_with_E18(g25)[0], bracket_low, bracket_high,
+                        target_E31, tolerance, xtol=1e-9, f_low=E31_at_low, f_high=E31_at_high,
+                    )
+                    self._solver_evaluations['G25'] = evaluations + root.evaluations
+                    target_G25 = root.x
+                    verify_E31, verify_B47, verify_J12 = get_values_at_G25_with_E18(target_G25)
+                    g25_in_range = abs(verify_E31 - target_E31) < tolerance
 
-                target_G25 = mid
-                verify_E31, verify_B47, verify_J12 = get_values_at_G25_with_E18(target_G25)
-                g25_in_range = abs(verify_E31 - target_E31) < tolerance
+            # 检查 E18 是否在安全范围
+            e18_safe, e18_msg = self._check_range(
+                target_E18, self.E18_MIN, self.E18_MAX, 'E18'
+            )
 
             # 检查 G25 是否在安全范围
             g25_safe, g25_msg = self._check_range(
@@ -424,12 +974,10 @@ class TaxAdjuster:
 
             # 读取最终的 E30
             self._report_progress(90, "正在验证结果...")
-            final_inputs = {
-                self._cell_key('测算表', 'E18'): target_E18,
-                self._cell_key('测算表', 'G25'): target_G25,
-            }
-            final_solution = self._calculate(final_inputs)
-            verify_E30 = self._to_number(self._get_value(final_solution, '测算表', 'E30'))
+            (verify_E30,) = self._calculate(
+                {('测算表', 'E18'): target_E18, ('测算表', 'G25'): target_G25},
+                [('测算表', 'E30')],
+            )
 
             # 如果 target 值与 original 值非常接近，使用原始计算值以避免 formulas 库的计算差异
             e18_unchanged = abs(target_E18 - original_E18) < 1
@@ -471,8 +1019,20 @@ class TaxAdjuster:
                     'G25_safe': g25_safe,
                     'G25_msg': g25_msg,
                 },
+                'stats': {
+                    'solver_evaluations': dict(self._solver_evaluations),
+                    # 热启动仅用于逐个求解（联立求解以工作簿当前值为初始点）
+                    'warm_start': bool(self._warm_used),
+                    **self._memo_stats(memo_start),
+                },
             }
 
+            if result['in_range']:
+                self._save_warm_solution(
+                    E18=target_E18, G25=target_G25,
+                    outputs={'G22': verify_G22, 'E31': verify_E31},
+                )
+
             if not e18_in_range and e18_boundary:
                 result['e18_boundary_info'] = e18_boundary
             if not g25_in_range and g25_boundary:
@@ -485,12 +1045,12 @@ class TaxAdjuster:
 
     def find_optimal_margin_v2(self, h11_range, f20_range, margin_range):
         """
-        优化版搜索算法：利用 F20-B11 线性关系 + 二分法
+        优化版搜索算法：利用 F20-B11 线性关系 + Brent 法
 
         原理：
         - 对于任意固定的 margin 值，F20 与 B11 是完美线性关系
         - 只需 2 次计算即可确定直线方程，直接求解使 F20 落在目标范围内的 B11
-        - 对 margin 使用二分法搜索，找到使 H11 落在目标范围内的值
+        - 对 margin 使用 Brent 法搜索，找到使 H11 落在目标范围内的值
 
         Args:
             h11_range: (min, max) H11 目标范围
@@ -512,14 +1072,9 @@ class TaxAdjuster:
             """获取 H11 和 F20 值"""
             nonlocal calc_count
             calc_count += 1
-            inputs = {
-                self._cell_key(self.MARGIN_SHEET, self.MARGIN_CELL): margin,
-                self._cell_key('产品成本', 'B11'): b11,
-            }
-            solution = self._calculate(inputs)
-            h11 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'H11'))
-            f20 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'F20'))
-            return h11, f20
+            return self._calculate(
+                dict(zip(self.MARGIN_SEARCH_INPUTS, (margin, b11))), self.MARGIN_SEARCH_OUTPUTS
+            )
 
         def find_b11_for_target_f20(margin, target_f20):
             """利用线性关系计算使 F20=target 的 B11"""
@@ -542,53 +1097,51 @@ class TaxAdjuster:
             target_b11 = max(self.B11_MIN, min(self.B11_MAX, target_b11))
             return target_b11
 
-        # 二分法搜索 margin
-        self._report_progress(20, "二分法搜索最优毛利率...")
-        low, high = margin_min, margin_max
+        # Brent 法搜索 margin
+        self._report_progress(20, "搜索最优毛利率...")
         target_f20 = (f20_min + f20_max) / 2  # F20 目标中点
+        probes = {}
 
-        for iteration in range(25):  # 最多 25 次迭代
-            mid = (low + high) / 2
-
-            # 利用线性关系直接计算 B11
-            b11 = find_b11_for_target_f20(mid, target_f20)
-
-            # 验证结果
-            h11, f20 = get_values(mid, b11)
-            error = abs(h11) / 10.0 + abs(f20) / 40000.0
+        def h11_at(margin):
+            """利用线性关系直接计算 B11，记录 (B11, H11, F20) 并返回 H11"""
+            nonlocal best_error, best_result
+            b11 = find_b11_for_target_f20(margin, target_f20)
+            h11, f20 = get_values(margin, b11)
+            probes[margin] = (b11, h11, f20)
+            self._report_progress(min(90, 20 + 2 * len(probes)), f"搜索中... (迭代 {len(probes)})")
 
             # 更新最优解
+            error = abs(h11) / 10.0 + abs(f20) / 40000.0
             if error < best_error:
                 best_error = error
                 best_result = {
-                    'margin': mid,
+                    'margin': margin,
                     'B11': b11,
                     'H11': h11,
                     'F20': f20,
                 }
+            return h11
 
-            # 检查是否满足约束
-            h11_ok = h11_min <= h11 <= h11_max
-            f20_ok = f20_min <= f20 <= f20_max
-
-            if h11_ok and f20_ok:
-                # 找到满足约束的解
-                best_result['converged'] = True
-                best_result['iterations'] = calc_count
-                return best_result
-
-            # 调整搜索范围
-            # H11 通常随 margin 增加而增加
-            if h11 < (h11_min + h11_max) / 2:
-                low = mid
-            else:
-                high = mid
-
-            # 检查收敛
-            if high - low < 0.0001:
-                break
+        def satisfied(margin, h11):
+            """H11 与 F20 均满足约束"""
+            _, _, f20 = probes[margin]
+            return h11_min <= h11 <= h11_max and f20_min <= f20 <= f20_max
 
-            self._report_progress(20 + int(iteration * 2.5), f"搜索中... (迭代 {iteration + 1})")
+        root = brent(
+            h11_at, margin_min, margin_max, (h11_min + h11_max) / 2,
+            accept=satisfied, xtol=0.0001, maxiter=25,
+        )
+        if root.converged:
+            # 找到满足约束的解
+            b11, h11, f20 = probes[root.x]
+            return {
+                'margin': root.x,
+                'B11': b11,
+                'H11': h11,
+                'F20': f20,
+                'converged': True,
+                'iterations': calc_count,
+            }
 
         # 未找到精确解，返回最优近似解
         if best_result is None:
@@ -623,8 +1176,6 @@ class TaxAdjuster:
         Returns:
             dict: 包含 margin, B11, H11, F20, converged, iterations, fit_error_pct
         """
-        import numpy as np
-
         h11_min, h11_max = h11_range
         f20_min, f20_max = f20_range
         margin_min, margin_max = margin_range
@@ -633,17 +1184,24 @@ class TaxAdjuster:
 
         calc_count = 0
 
-        def get_values(margin, b11):
+        def get_values_many(points):
+            """批量获取多组 (margin, b11) 的 (H11, F20)"""
             nonlocal calc_count
-            calc_count += 1
-            inputs = {
-                self._cell_key(self.MARGIN_SHEET, self.MARGIN_CELL): margin,
-                self._cell_key('产品成本', 'B11'): b11,
-            }
-            solution = self._calculate(inputs)
-            h11 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'H11'))
-            f20 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'F20'))
-            return h11, f20
+            calc_count += len(points)
+            return self.evaluate_many(
+                points, self.MARGIN_SEARCH_INPUTS, self.MARGIN_SEARCH_OUTPUTS
+            ).tolist()
+
+        def get_values(margin, b11):
+            return get_values_many([(margin, b11)])[0]
+
+        def b11_for_target_f20(f20_0, f20_100k):
+            """由 B11=0 与 B11=100000 两点的 F20 线性求解使 F20=target 的 B11"""
+            k = (f20_100k - f20_0) / 100000
+            if abs(k) > 1e-10:
+                b11 = (target_f20 - f20_0) / k
+                return max(self.B11_MIN, min(self.B11_MAX, b11))
+            return 0
 
         # ========== 阶段 1: 采样并拟合 ==========
         self._report_progress(20, "采样关键点...")
@@ -651,24 +1209,14 @@ class TaxAdjuster:
         degree = 3 if use_cubic else 2
 
         sample_margins = np.linspace(margin_min, margin_max, n_samples)
-        sample_h11 = []
-
-        for m in sample_margins:
-            # 对每个 margin，用 2 点线性关系求使 F20=target 的 B11
-            _, f20_0 = get_values(m, 0)
-            _, f20_100k = get_values(m, 100000)
 
-            k = (f20_100k - f20_0) / 100000
-            intercept = f20_0
-
-            if abs(k) > 1e-10:
-                b11 = (target_f20 - intercept) / k
-                b11 = max(self.B11_MIN, min(self.B11_MAX, b11))
-            else:
-                b11 = 0
-
-            h11, _ = get_values(m, b11)
-            sample_h11.append(h11)
+        # 对每个 margin，用 2 点线性关系求使 F20=target 的 B11（所有采样点一次批量计算）
+        line_values = get_values_many([(m, b11) for m in sample_margins for b11 in (0, 100000)])
+        sample_b11 = [
+            b11_for_target_f20(line_values[2 * i][1], line_values[2 * i + 1][1])
+            for i in range(n_samples)
+        ]
+        sample_h11 = [h11 for h11, _ in get_values_many(list(zip(sample_margins, sample_b11)))]
 
         # ========== 阶段 2: 拟合 H11 = f(margin) ==========
         self._report_progress(50, "拟合函数...")
@@ -703,17 +1251,8 @@ class TaxAdjuster:
 
         # ========== 阶段 4: 计算最终 B11 ==========
         self._report_progress(70, "计算最终参数...")
-        _, f20_0 = get_values(optimal_margin, 0)
-        _, f20_100k = get_values(optimal_margin, 100000)
-
-        k = (f20_100k - f20_0) / 100000
-        intercept = f20_0
-
-        if abs(k) > 1e-10:
-            optimal_b11 = (target_f20 - intercept) / k
-            optimal_b11 = max(self.B11_MIN, min(self.B11_MAX, optimal_b11))
-        else:
-            optimal_b11 = 0
+        (_, f20_0), (_, f20_100k) = get_values_many([(optimal_margin, 0), (optimal_margin, 100000)])
+        optimal_b11 = b11_for_target_f20(f20_0, f20_100k)
 
         final_h11, final_f20 = get_values(optimal_margin, optimal_b11)
 
@@ -729,15 +1268,8 @@ class TaxAdjuster:
 
             for _ in range(10):
                 mid = (low + high) / 2
-                _, f20_0 = get_values(mid, 0)
-                _, f20_100k = get_values(mid, 100000)
-                k = (f20_100k - f20_0) / 100000
-
-                if abs(k) > 1e-10:
-                    b11 = (target_f20 - f20_0) / k
-                    b11 = max(self.B11_MIN, min(self.B11_MAX, b11))
-                else:
-                    b11 = 0
+                (_, f20_0), (_, f20_100k) = get_values_many([(mid, 0), (mid, 100000)])
+                b11 = b11_for_target_f20(f20_0, f20_100k)
 
                 h11, _ = get_values(mid, b11)
 
@@ -769,106 +1301,283 @@ class TaxAdjuster:
             'fit_error_pct': fit_error_pct,
         }
 
+    def find_optimal_margin_surrogate(self, h11_range, f20_range, margin_range, start=None):
+        """
+        响应面代理算法：拟合 H11、F20 关于 (margin, B11) 的二次响应面，在响应面上求解
+
+        算法原理：
+        1. 覆盖 margin、B11 范围的 3×3 网格设计点一次批量计算，拟合两个二次响应面
+        2. 在响应面上按 v4 的方式求解：每个 margin 取使 F20=0 的 B11，Brent 法搜索使 H11 达标的 margin
+        3. 候选方案用实际模型验证；未达标时以响应面梯度为初始 Jacobian 作有界 Broyden 校正
+        4. 拟合残差超出 SURROGATE_MAX_RESIDUAL、响应面上目标不可达或校正后仍未达标时退回 v4
+
+        Args:
+            h11_range, f20_range, margin_range: 同 find_optimal_margin_v4
+            start: 退回 v4 时的热启动 margin
+
+        Returns:
+            dict: 同 find_optimal_margin_v4，另含 surrogate 统计：
+                  points（实际计算的点数，按备忘录未命中次数统计；退回 v4 时含 v4 的计算）、
+                  model_calls（模型调用次数，设计点批量计算计为一次）、fit_residual、corrections、
+                  fallback（退回 v4 的原因或 None）；
+                  响应面求解成功时（未运行 v4）另含估计值：
+                  v4_points_estimate（按响应面上的 Brent 步数、每步 3 个点估计的 v4 计算点数，
+                  不含区间扩展，仅供参考）、points_saved_estimate（v4_points_estimate − points）；
+                  退回 v4 时另含实测值：
+                  v4_points（v4 实际计算的点数）、
+                  points_saved（v4_points − points，为负，即响应面阶段多计算的点数）
+        """
+        h11_min, h11_max = h11_range
+        f20_min, f20_max = f20_range
+        margin_min, margin_max = margin_range
+        target_h11 = (h11_min + h11_max) / 2
+        target_f20 = 0  # 与 v4 相同：使 F20 尽量接近 0
+
+        def get_values_many(points):
+            return self.evaluate_many(points, self.MARGIN_SEARCH_INPUTS, self.MARGIN_SEARCH_OUTPUTS)
+
+        def accept(margin, h11):
+            return h11_min <= h11 <= h11_max
+
+        misses_start = self._memo.counts()[1]
+
+        # ========== 阶段 1: 设计点批量计算并拟合 ==========
+        self._report_progress(20, "计算响应面设计点...")
+        low, high = (margin_min, self.B11_MIN), (margin_max, self.B11_MAX)
+        design = grid_design(low, high, self.SURROGATE_LEVELS)
+        values = get_values_many(design)
+        h11_surface = QuadraticSurface(low, high).fit(design, values[:, 0])
+        f20_surface = QuadraticSurface(low, high).fit(design, values[:, 1])
+
+        evaluations = len(design)
+        v4_points_estimate = None
+        stats = {
+            'points': None,
+            'model_calls': 1,
+            'fit_residual': h11_surface.residual,
+            'corrections': 0,
+            'fallback': None,
+        }
+
+        def surrogate_at(margin):
+            """响应面上 margin 处使 F20=target_f20 的 B11 及对应的 H11"""
+            b11 = f20_surface.solve_y(margin, target_f20)
+            return b11, float(h11_surface([(margin, b11)])[0])
+
+        # ========== 阶段 2: 响应面上求解，实际模型验证 ==========
+        best_result = None
+        if h11_surface.residual > self.SURROGATE_MAX_RESIDUAL * np.ptp(values[:, 0]):
+            stats['fallback'] = 'fit_residual'
+        else:
+            self._report_progress(40, "在响应面上求解...")
+            root = brent(
+                lambda margin: surrogate_at(margin)[1], margin_min, margin_max, target_h11,
+                accept=accept, xtol=1e-5, maxiter=25,
+            )
+            if not root.converged:
+                stats['fallback'] = 'unreachable'
+            else:
+                # 粗略估计：v4 每个 margin 顺序计算 3 个点（两点确定 F20 直线 + 一次求值），
+                # Brent 法步数按响应面上的步数计
+                v4_points_estimate = 3 * root.evaluations
+                candidate = (root.x, surrogate_at(root.x)[0])
+
+                # 候选方案实际计算验证，未达标时以响应面梯度为初始 Jacobian 作 Broyden 校正
+                self._report_progress(60, "验证候选方案...")
+                confirm = broyden(
+                    get_values_many, candidate, low, high,
+                    targets=[target_h11, (f20_min + f20_max) / 2],
+                    tolerances=[(h11_max - h11_min) / 2, (f20_max - f20_min) / 2],
+                    steps=None, maxiter=self.SURROGATE_CORRECTIONS,
+                    jacobian=[h11_surface.gradient(candidate), f20_surface.gradient(candidate)],
+                )
+                evaluations += confirm.evaluations
+                stats['model_calls'] += confirm.evaluations
+                stats['corrections'] = confirm.evaluations - 1
+                if confirm.converged:
+                    margin, b11 = confirm.x.tolist()
+                    h11, f20 = confirm.value.tolist()
+                    best_result = {'margin': margin, 'B11': b11, 'H11': h11, 'F20': f20}
+                else:
+                    stats['fallback'] = 'not_converged'
+
+        if best_result is None:
+            self._report_progress(60, "响应面未收敛，改用 v4 搜索...")
+            v4_start = self._memo.counts()[1]
+            best_result = self.find_optimal_margin_v4(h11_range, f20_range, margin_range, start=start)
+            best_result['iterations'] += evaluations
+            misses = self._memo.counts()[1]
+            stats['points'] = misses - misses_start
+            stats['v4_points'] = misses - v4_start
+            stats['points_saved'] = stats['v4_points'] - stats['points']
+            best_result['surrogate'] = stats
+            return best_result
+
+        self._report_progress(95, "验证结果...")
+        stats['points'] = self._memo.counts()[1] - misses_start
+        stats['v4_points_estimate'] = v4_points_estimate
+        stats['points_saved_estimate'] = v4_points_estimate - stats['points']
+        f20_ok = f20_min <= best_result['F20'] <= f20_max
+        best_result.update(
+            converged=True,
+            h11_ok=True,
+            f20_ok=f20_ok,  # 仅供参考（同 v4，H11 优先）
+            iterations=evaluations,
+            surrogate=stats,
+        )
+        return best_result
+
     def find_alternative_solutions(self, optimal_result, target_H11=0, target_F20=0, num_alternatives=4):
         """
         生成帕累托前沿上的备选方案
 
-        提供不同权衡的方案：
-        - H11 优先方案
-        - F20 优先方案
-        - 平衡方案
+        以会话中已计算过的全部 (margin, B11) 点（备忘录）为候选，按 |H11 - 目标|、|F20 - 目标|
+        两个误差做非支配筛选；前沿上相邻方案间隔过大时在其间补点（一次批量计算），
+        再沿前沿均匀选取（前沿点数不足时依次取下一层非支配方案），提供不同权衡的方案：
+        - H11 优先方案（H11 误差最小）
+        - F20 优先方案（F20 误差最小）
+        - 平衡方案（两者之间）
 
         Args:
-            optimal_result: find_optimal_margin_v4 的返回结果
+            optimal_result: find_optimal_margin_v4 的返回结果（不重复列为备选）
             target_H11: H11 目标值
             target_F20: F20 目标值
             num_alternatives: 备选方案数量
 
         Returns:
-            list: 备选方案列表
+            list: 备选方案列表（按 H11 误差从小到大）
         """
-        alternatives = []
-
-        def get_values(margin, b11):
-            inputs = {
-                self._cell_key(self.MARGIN_SHEET, self.MARGIN_CELL): margin,
-                self._cell_key('产品成本', 'B11'): b11,
-            }
-            solution = self._calculate(inputs)
-            h11 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'H11'))
-            f20 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'F20'))
-            return h11, f20
-
-        # 策略1: H11 优先（固定较小的 B11，调整 margin 使 H11 最小）
-        self._report_progress(86, "生成 H11 优先方案...")
-        best_h11_sol = None
-        best_h11_error = float('inf')
-
-        for margin in [0.70, 0.72, 0.74, 0.76, 0.78, 0.80]:
-            for b11 in [0, 50000, 100000]:
-                h11, f20 = get_values(margin, b11)
-                h11_error = abs(h11 - target_H11)
-                if h11_error < best_h11_error:
-                    best_h11_error = h11_error
-                    best_h11_sol = {'margin': margin, 'B11': b11, 'H11': h11, 'F20': f20}
-
-        if best_h11_sol:
-            best_h11_sol['label'] = 'H11优先'
-            alternatives.append(best_h11_sol)
-
-        # 策略2: F20 优先（使用线性关系直接计算使 F20=0 的 B11）
-        self._report_progress(88, "生成 F20 优先方案...")
-        for margin in [0.75, 0.80, 0.85]:
-            # 采样两点确定线性关系
-            _, f20_0 = get_values(margin, 0)
-            _, f20_200k = get_values(margin, 200000)
-            slope = (f20_200k - f20_0) / 200000
-
-            if abs(slope) > 1e-10:
-                target_b11 = -f20_0 / slope
-                target_b11 = max(self.B11_MIN, min(self.B11_MAX, target_b11))
-                h11, f20 = get_values(margin, target_b11)
-                alternatives.append({
-                    'margin': margin,
-                    'B11': target_b11,
-                    'H11': h11,
-                    'F20': f20,
-                    'label': f'F20优先 (m={margin:.2f})'
-                })
+        optimal_key = self._memo.key(
+            dict(zip(self.MARGIN_SEARCH_INPUTS, (optimal_result['margin'], optimal_result['B11'])))
+        )
 
-            if len(alternatives) >= num_alternatives:
-                break
+        def errors(candidate):
+            return abs(candidate['H11'] - target_H11), abs(candidate['F20'] - target_F20)
+
+        def session_candidates():
+            """会话中安全范围内的计算点（不含最优解）"""
+            candidates = []
+            for (margin, b11), (h11, f20) in self._memo.records(self.MARGIN_SEARCH_INPUTS, self.MARGIN_SEARCH_OUTPUTS):
+                if not (self.MARGIN_MIN <= margin <= self.MARGIN_MAX and self.B11_MIN <= b11 <= self.B11_MAX):
+                    continue
+                if self._memo.key(dict(zip(self.MARGIN_SEARCH_INPUTS, (margin, b11)))) == optimal_key:
+                    continue
+                h11, f20 = float(self._to_number(h11)), float(self._to_number(f20))
+                candidates.append({'margin': margin, 'B11': b11, 'H11': h11, 'F20': f20})
+            return candidates
+
+        # 补点：前沿点太少时覆盖整个范围，否则在间隔过大的相邻方案之间取输入中点
+        self._report_progress(86, "生成帕累托前沿...")
+        front = self._pareto_front(session_candidates(), errors)
+        if len(front) < 2:
+            samples = grid_design((self.MARGIN_MIN, self.B11_MIN), (self.MARGIN_MAX, self.B11_MAX)).tolist()
+        else:
+            gaps = self._front_gaps(front, errors)
+            samples = [
+                ((front[i]['margin'] + front[i + 1]['margin']) / 2, (front[i]['B11'] + front[i + 1]['B11']) / 2)
+                for i in np.argsort(gaps)[::-1][:self.PARETO_GAP_SAMPLES]
+                if gaps[i] > 1 / max(num_alternatives, 1)
+            ]
+        misses = self._memo.counts()[1]
+        if samples:
+            self._report_progress(88, "补充前沿方案...")
+            try:
+                self.evaluate_many(samples, self.MARGIN_SEARCH_INPUTS, self.MARGIN_SEARCH_OUTPUTS)
+            except SearchTimeout:
+                pass  # 时间预算用尽时只用已有的计算点
+        # 补点中实际计算（备忘录未命中）的点数
+        self._solver_evaluations['alternatives'] = self._memo.counts()[1] - misses
+
+        # 逐层取非支配方案，最后一层只取所需数量（沿前沿均匀选取）
+        remaining = session_candidates()
+        chosen = []
+        while remaining and len(chosen) < num_alternatives:
+            layer = self._pareto_front(remaining, errors)
+            remaining = [candidate for candidate in remaining if candidate not in layer]
+            needed = num_alternatives - len(chosen)
+            if len(layer) > needed:
+                position = np.concatenate([[0.0], np.cumsum(self._front_gaps(layer, errors))])
+                picked = []
+                for target in np.linspace(0, position[-1], needed):
+                    order = np.argsort(np.abs(position - target))
+                    picked.append(next(i for i in order if i not in picked))
+                layer = [layer[i] for i in sorted(picked)]
+            chosen.extend(layer)
+
+        alternatives = sorted((dict(candidate) for candidate in chosen), key=errors)
+        f20_best = min(range(len(alternatives)), key=lambda i: errors(alternatives[i])[1], default=None)
+        for i, solution in enumerate(alternatives):
+            if i == 0:
+                solution['label'] = 'H11优先'
+            elif i == f20_best:
+                solution['label'] = 'F20优先'
+            else:
+                solution['label'] = '平衡'
+        return alternatives
 
-        return alternatives[:num_alternatives]
+    @staticmethod
+    def _pareto_front(candidates, errors):
+        """非支配筛选（两个误差均越小越好），返回按第一个误差升序的前沿
 
+        Args:
+            candidates: 候选方案列表
+            errors: 函数 candidate -> (误差1, 误差2)
+        """
+        front = []
+        best_second = float('inf')
+        for candidate in sorted(candidates, key=errors):
+            second = errors(candidate)[1]
+            if second < best_second:
+                front.append(candidate)
+                best_second = second
+        return front
+
+    @staticmethod
+    def _front_gaps(front, errors):
+        """前沿上相邻方案的间隔（误差按前沿范围归一化后的距离）"""
+        values = np.array([errors(candidate) for candidate in front], dtype=float)
+        span = np.ptp(values, axis=0)
+        span[span == 0] = 1.0
+        return np.hypot(*(np.diff(values, axis=0) / span).T)
+
+    @instrumented('inventory')
     def calculate_inventory_margin_adjustment(
         self,
         h11_range=None,
         f20_range=None,
         margin_range=None,
         max_solutions=5,
-        algorithm='v4'
+        algorithm='v4',
+        time_budget=None
     ):
         """
-        计算库存毛利率调整方案（优化版：H11 优先 + 高效二分法）
+        计算库存毛利率调整方案（优化版：H11 优先 + Brent 法）
         目标: 使 H11 和 F20 落在指定范围内
         工作表: 生产成本月结表、产品成本
         调整变量: 毛利率 (J14单元格), B11 (产品成本中的加工费)
 
         算法选项：
-        - v4 (默认): H11 优先 + 二分法，~15-20 次计算
+        - v4 (默认): H11 优先 + Brent 法
+        - surrogate: 二次响应面代理求解，实际模型验证候选方案，未收敛时退回 v4
         - v3: 函数拟合法，~10-15 次计算
-        - v2: 纯二分法，~75 次计算
+        - v2: F20 线性求解 + Brent 法
 
         Args:
             h11_range: (min, max) H11 目标范围，默认 (-10, 10)
             f20_range: (min, max) F20 目标范围，默认 (-40000, 40000)
             margin_range: (min, max) 毛利率搜索范围，默认 (0.70, 0.90)
             max_solutions: 最多返回的候选方案数量，默认 5
-            algorithm: 搜索算法版本，'v4' (H11优先), 'v3' (拟合法), 'v2' (二分法)
+            algorithm: 搜索算法版本，'v4' (H11优先), 'surrogate' (响应面), 'v3' (拟合法), 'v2' (线性求解)
+            time_budget: 搜索阶段的时间预算（秒，不含模型加载），默认不限时；
+                         到时返回已计算过的点中 H11 误差最小（其次 F20）的方案，converged=False、timed_out=True
 
         Returns:
-            dict: 包含 current（当前值）、solutions（方案列表）、stats（搜索统计）
+            dict: 包含 current（当前值）、solutions（方案列表）、
+                  stats（搜索统计，含计算结果备忘录命中次数 cache_hits / cache_misses、
+                  备选方案补点计算次数 alternative_samples、
+                  是否超时 timed_out 及最优解 H11/F20 到目标范围的距离 h11_error / f20_error、
+                  计时统计 telemetry（见 SearchTelemetry.summary）；
+                  surrogate 算法另含 surrogate 统计，见 find_optimal_margin_surrogate）
         """
         # 使用默认值
         if h11_range is None:
@@ -879,6 +1588,7 @@ class TaxAdjuster:
             margin_range = (self.MARGIN_MIN, self.MARGIN_MAX)
         self._report_progress(0, "正在加载 Excel 模型...")
         self._load_model()
+        memo_start = self._memo.counts()
         try:
             self._report_progress(5, "正在检查毛利率单元格...")
             # 检查 J14 单元格是否有效
@@ -892,10 +1602,9 @@ class TaxAdjuster:
 
             self._report_progress(10, "正在读取当前数据...")
             # 获取当前值
-            solution = self._calculate()
-            current_H11 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'H11'))
-            current_F20 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'F20'))
-            current_B11 = self._to_number(self._get_value(solution, '产品成本', 'B11'))
+            current_H11, current_F20, current_B11 = self._calculate(
+                outputs=self.MARGIN_SEARCH_OUTPUTS + (('产品成本', 'B11'),)
+            )
 
             # 添加"保持当前值"作为候选方案
             current_solution = {
@@ -923,29 +1632,48 @@ class TaxAdjuster:
                         'converged': False,
                         'skipped': True,
                         'skip_reason': f'毛利率 ({current_margin:.4f}) 低于 0.7 且加工费 ({current_B11:,.0f}) 不在有效范围 ({self.B11_VALID_MIN:,}-{self.B11_VALID_MAX:,})',
+                        **self._memo_stats(memo_start),
                     },
                 }
 
             # 使用优化的快速搜索算法
             self._report_progress(15, "正在快速搜索最优解...")
-            if algorithm == 'v4':
-                optimal_result = self.find_optimal_margin_v4(
-                    h11_range=h11_range,
-                    f20_range=f20_range,
-                    margin_range=margin_range
-                )
-            elif algorithm == 'v3':
-                optimal_result = self.find_optimal_margin_v3(
-                    h11_range=h11_range,
-                    f20_range=f20_range,
-                    margin_range=margin_range
-                )
-            else:
-                optimal_result = self.find_optimal_margin_v2(
-                    h11_range=h11_range,
-                    f20_range=f20_range,
-                    margin_range=margin_range
-                )
+            # 同一工作簿系列上一次的结果（热启动，v4 及 surrogate 退回 v4 时使用）
+            warm = self._warm_solution()
+            self._warm_used = set()
+            self._start_budget(time_budget, h11_range, f20_range, initial=current_solution)
+            try:
+                if algorithm == 'v4':
+                    optimal_result = self.find_optimal_margin_v4(
+                        h11_range=h11_range,
+                        f20_range=f20_range,
+                        margin_range=margin_range,
+                        start=warm.get('margin'),
+                    )
+                elif algorithm == 'surrogate':
+                    optimal_result = self.find_optimal_margin_surrogate(
+                        h11_range=h11_range,
+                        f20_range=f20_range,
+                        margin_range=margin_range,
+                        start=warm.get('margin'),
+                    )
+                elif algorithm == 'v3':
+                    optimal_result = self.find_optimal_margin_v3(
+                        h11_range=h11_range,
+                        f20_range=f20_range,
+                        margin_range=margin_range
+                    )
+                else:
+                    optimal_result = self.find_optimal_margin_v2(
+                        h11_range=h11_range,
+                        f20_range=f20_range,
+                        margin_range=margin_range
+                    )
+            except SearchTimeout:
+                self._report_progress(80, "已达时间预算，返回目前最优的方案")
+                optimal_result = self._budget_result()
+
+            surrogate_stats = optimal_result.pop('surrogate', None)
 
             # 构建解列表
             all_solutions = [current_solution]
@@ -957,6 +1685,8 @@ class TaxAdjuster:
                     optimal_result['label'] = '最优解 ✓'
                 else:
                     optimal_result['label'] = 'H11达标 ✓'
+            elif optimal_result.get('timed_out'):
+                optimal_result['label'] = '限时最优解'
             else:
                 boundary = optimal_result.get('boundary', '')
                 if boundary == 'h11_target_too_low':
@@ -968,17 +1698,24 @@ class TaxAdjuster:
 
             all_solutions.append(optimal_result)
 
-            # 添加备选方案
+            # 添加备选方案（由会话中的计算点构成帕累托前沿，时间预算用尽时不再补点）
             self._report_progress(85, "正在生成备选方案...")
             alternatives = self.find_alternative_solutions(
                 optimal_result,
-                target_H11=0, target_F20=0,
+                target_H11=(h11_range[0] + h11_range[1]) / 2,
+                target_F20=(f20_range[0] + f20_range[1]) / 2,
                 num_alternatives=min(3, max_solutions - 2)
             )
             for i, alt in enumerate(alternatives):
                 alt['label'] = f'备选方案 {i + 1}'
                 all_solutions.append(alt)
 
+            if optimal_result.get('converged'):
+                self._save_warm_solution(
+                    margin=optimal_result['margin'],
+                    outputs={'H11': optimal_result['H11'], 'F20': optimal_result['F20']},
+                )
+
             # 为每个解添加安全检查
             self._report_progress(95, "正在验证结果...")
             for sol in all_solutions:
@@ -1003,6 +1740,13 @@ class TaxAdjuster:
                 'stats': {
                     'iterations': optimal_result.get('iterations', 0),
                     'converged': optimal_result.get('converged', False),
+                    'warm_start': bool(self._warm_used),
+                    'timed_out': optimal_result.get('timed_out', False),
+                    'alternative_samples': self._solver_evaluations.get('alternatives', 0),
+                    'h11_error': self._range_error(optimal_result['H11'], h11_range),
+                    'f20_error': self._range_error(optimal_result['F20'], f20_range),
+                    **({'surrogate': surrogate_stats} if surrogate_stats else {}),
+                    **self._memo_stats(memo_start),
                 },
             }
 
@@ -1013,8 +1757,10 @@ class TaxAdjuster:
                 'solutions': [],
             }
         finally:
+            self._end_budget()
             self._unload_model()
 
+    @instrumented('scan')
     def scan_b11_margin_table(
         self,
         b11_start=20000,
@@ -1023,7 +1769,10 @@ class TaxAdjuster:
         h11_target_range=(-10, 10),
         margin_range=None,
         row_callback=None,
-        stop_check=None
+        stop_check=None,
+        workers=None,
+        continuation=True,
+        time_budget=None
     ):
         """
         扫描不同 B11（加工费）值下的最优毛利率，生成对照表
@@ -1040,6 +1789,15 @@ class TaxAdjuster:
             row_callback: 行回调函数，每计算完一行调用，签名为 callback(row_dict)
                           用于边查询边输出
             stop_check: 停止检查函数，返回 True 时停止搜索
+            workers: 并行工作进程数，大于 1 时各行分配到进程池并行搜索
+                     （每个进程加载一次模型，使用默认计算后端）；
+                     结果仍按 B11 顺序交给 row_callback，停止或提前结束时终止未完成的行；
+                     工作进程无法启动时改为顺序计算，原因记在 stats['parallel_error']
+            continuation: 顺序扫描时逐行延拓：由已求解的行外推本行毛利率，
+                          只在预测附近的窄区间内搜索，未找到时退回整个范围
+            time_budget: 整个扫描的时间预算（秒，不含模型加载），默认不限时；
+                         到时正在计算的行取目前 H11 误差最小的点（converged=False、timed_out=True），
+                         之后的行不再计算
 
         Returns:
             dict: {
@@ -1047,7 +1805,9 @@ class TaxAdjuster:
                     {'B11': 20000, 'margin': 0.85, 'H11': 5.2, 'F20': 12345, 'converged': True},
                     ...
                 ],
-                'stats': {'total_rows': 20, 'converged_count': 18}
+                'stats': {'total_rows': 20, 'converged_count': 18, 'timed_out': False,
+                          'cache_hits': 12, 'cache_misses': 60,
+                          'telemetry': {...}}  # 计时统计，并行时不含工作进程中的计算
             }
         """
         if margin_range is None:
@@ -1058,6 +1818,7 @@ class TaxAdjuster:
 
         self._report_progress(0, "正在加载 Excel 模型...")
         self._load_model()
+        memo_start = self._memo.counts()
 
         try:
             # 检查毛利率单元格
@@ -1079,38 +1840,117 @@ class TaxAdjuster:
             total_steps = len(b11_ranges)
             stopped_early = False
             user_stopped = False
+            timed_out = False
+            self._start_budget(time_budget, h11_target_range, (self.F20_MIN, self.F20_MAX))
 
-            for idx, (range_start, range_end) in enumerate(b11_ranges):
-                # 检查用户是否请求停止
+            def should_stop():
+                """用户请求停止或达到时间预算"""
+                nonlocal timed_out
                 if stop_check and stop_check():
-                    user_stopped = True
-                    self._report_progress(100, "用户停止搜索")
-                    break
-
-                # 在区间内取随机数
-                b11 = random.randint(range_start, range_end - 1)
-
-                progress = int(10 + (idx / total_steps) * 85)
-                self._report_progress(progress, f"正在计算 B11={b11:,}...")
-
-                # 对当前 B11 值，二分搜索最优 margin
-                result = self._find_margin_for_b11(
-                    b11, h11_min, h11_max, margin_min, margin_max
+                    return True
+                timed_out = self._deadline is not None and time.monotonic() >= self._deadline
+                return timed_out
+
+            # 在每个区间内取随机数
+            b11_values = [
+                random.randint(range_start, range_end - 1)
+                for range_start, range_end in b11_ranges
+            ]
+            search_args = (h11_min, h11_max, margin_min, margin_max)
+            # 已收敛行的 (B11, margin) 与最近一行 H11 对 margin 的斜率，用于逐行延拓
+            solved = []
+            slope = None
+
+            pool = None
+            parallel_error = None
+            if workers and workers > 1 and len(b11_values) > 1:
+                self._report_progress(5, "正在启动并行计算进程...")
+                pool = WorkerPool(
+                    self.file_path,
+                    min(workers, len(b11_values)),
+                    model_cache=getattr(self._backend, 'model_cache', None),
+                    start_method=self.PARALLEL_START_METHOD,
+                    content=self._content,
                 )
-                result['B11'] = b11
-                results.append(result)
-
-                # 边查询边输出
-                if row_callback:
-                    row_callback(result)
+                try:
+                    pool.start(should_stop)
+                except WorkerError as e:
+                    # 工作进程无法启动时改为在本进程顺序计算
+                    pool.terminate()
+                    pool = None
+                    parallel_error = str(e)
+                    self._report_progress(8, "并行计算进程启动失败，改为顺序计算")
+                else:
+                    tasks = [
+                        pool.submit('_find_margin_for_b11', b11, *search_args)
+                        for b11 in b11_values
+                    ]
 
-                # 若找不到符合 H11 范围的数据，停止搜索
-                if not result.get('converged', False):
-                    stopped_early = True
-                    self._report_progress(100, "H11 超出范围，停止搜索")
-                    break
+            try:
+                for idx, b11 in enumerate(b11_values):
+                    # 检查用户是否请求停止或时间预算是否用尽
+                    if should_stop():
+                        user_stopped = not timed_out
+                        break
 
-            if not stopped_early and not user_stopped:
+                    progress = int(10 + (idx / total_steps) * 85)
+                    self._report_progress(progress, f"正在计算 B11={b11:,}...")
+
+                    result = None
+                    if pool is not None:
+                        try:
+                            result = pool.wait(tasks[idx], should_stop)
+                        except WorkerError as e:
+                            # 部分工作进程初始化失败：本行及之后的行改为顺序计算
+                            pool.terminate()
+                            pool = None
+                            parallel_error = str(e)
+                        else:
+                            if result is None:
+                                user_stopped = not timed_out
+                                break
+
+                    # 对当前 B11 值，搜索最优 margin
+                    if pool is None:
+                        prediction = None
+                        if continuation and solved:
+                            prediction = (self._predict_margin(solved, b11), slope)
+                        self._best_candidate = None
+                        try:
+                            result = self._find_margin_for_b11(b11, *search_args, prediction=prediction)
+                        except SearchTimeout:
+                            # 本行取目前最优的计算点，尚无计算点时不输出本行
+                            timed_out = True
+                            if self._best_candidate is None:
+                                break
+                            result = self._budget_result()
+                    slope = result.pop('slope', slope)
+                    result['B11'] = b11
+                    results.append(result)
+                    if result.get('converged', False):
+                        solved.append((b11, result['margin']))
+
+                    # 边查询边输出
+                    if row_callback:
+                        row_callback(result)
+
+                    # 达到时间预算，或找不到符合 H11 范围的数据，停止搜索
+                    if timed_out:
+                        break
+                    if not result.get('converged', False):
+                        stopped_early = True
+                        self._report_progress(100, "H11 超出范围，停止搜索")
+                        break
+            finally:
+                # 停止、提前结束或出错时终止仍在计算的行
+                if pool is not None:
+                    pool.terminate()
+
+            if user_stopped:
+                self._report_progress(100, "用户停止搜索")
+            elif timed_out:
+                self._report_progress(100, "已达时间预算，停止搜索")
+            elif not stopped_early:
                 self._report_progress(100, "计算完成")
 
             converged_count = sum(1 for r in results if r.get('converged', False))
@@ -1124,48 +1964,89 @@ class TaxAdjuster:
                     'margin_range': margin_range,
                     'stopped_early': stopped_early,
                     'user_stopped': user_stopped,
+                    'timed_out': timed_out,
+                    'parallel_error': parallel_error,
+                    **self._memo_stats(memo_start),
                 }
             }
 
         finally:
+            self._end_budget()
             self._unload_model()
 
-    def _find_margin_for_b11(self, b11, h11_min, h11_max, margin_min, margin_max):
+    @staticmethod
+    def _predict_margin(solved, b11):
+        """由已求解的行外推 b11 处的毛利率（最近三行二次外推，两行线性，一行取其值）"""
+        points = solved[-3:]
+        if len(points) == 1:
+            return points[0][1]
+        x, y = np.array(points, dtype=float).T
+        # 以 b11 为原点、10 万为单位拟合，常数项即预测值
+        coef = np.polyfit((x - b11) / 100_000, y, len(points) - 1)
+        return float(coef[-1])
+
+    def _find_margin_for_b11(self, b11, h11_min, h11_max, margin_min, margin_max, prediction=None):
         """
-        对于固定的 B11 值，二分搜索使 H11 落在目标范围内的毛利率
+        对于固定的 B11 值，用 Brent 法搜索使 H11 落在目标范围内的毛利率
 
         Args:
             b11: 固定的加工费值
             h11_min, h11_max: H11 目标范围
             margin_min, margin_max: 毛利率搜索范围
+            prediction: 逐行延拓的预测 (margin, 上一行 H11 对 margin 的斜率或 None)，
+                        给出时先在预测附近 CONTINUATION_WINDOW 内搜索，未找到时退回整个范围
 
         Returns:
-            dict: {'margin': float, 'H11': float, 'F20': float, 'converged': bool}
+            dict: {'margin': float, 'H11': float, 'F20': float, 'converged': bool}，
+                  收敛时另含 'slope'（本行 H11 对 margin 的近似斜率，供下一行延拓）
         """
+        def get_values_many(margins):
+            """批量获取多个 margin（固定 b11）下的 (H11, F20) 值"""
+            return self.evaluate_many(
+                [(margin, b11) for margin in margins],
+                self.MARGIN_SEARCH_INPUTS, self.MARGIN_SEARCH_OUTPUTS,
+            ).tolist()
+
         def get_values(margin):
             """获取指定 margin 和 b11 下的 H11, F20 值"""
-            inputs = {
-                self._cell_key(self.MARGIN_SHEET, self.MARGIN_CELL): margin,
-                self._cell_key('产品成本', 'B11'): b11,
-            }
-            solution = self._calculate(inputs)
-            h11 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'H11'))
-            f20 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'F20'))
-            return h11, f20
-
-        # 获取边界值以确定搜索方向
-        h11_at_min, f20_at_min = get_values(margin_min)
-        h11_at_max, f20_at_max = get_values(margin_max)
+            return get_values_many([margin])[0]
 
         target_h11 = (h11_min + h11_max) / 2  # H11 目标中点
 
+        def accept(margin, h11):
+            return h11_min <= h11 <= h11_max
+
+        if prediction is not None:
+            # 逐行延拓：从预测值开始（有上一行斜率时先走 Newton 步），只在窄区间内查找
+            predicted, slope = prediction
+            low = max(margin_min, predicted - self.CONTINUATION_WINDOW)
+            high = min(margin_max, predicted + self.CONTINUATION_WINDOW)
+            a, b, h11_a, h11_b, bracketed, _ = expand_bracket(
+                lambda margins: [h11 for h11, _ in get_values_many(margins)], predicted, low, high,
+                self.CONTINUATION_WIDTH, target_h11, accept=accept, slope=slope,
+            )
+            if bracketed:
+                root = brent(
+                    lambda margin: get_values(margin)[0], a, b, target_h11, accept=accept,
+                    xtol=1e-5, maxiter=30, f_low=h11_a, f_high=h11_b,
+                )
+                if root.converged:
+                    h11, f20 = get_values(root.x)
+                    return {
+                        'margin': root.x,
+                        'H11': h11,
+                        'F20': f20,
+                        'converged': True,
+                        'slope': (h11_b - h11_a) / (b - a) if b > a else slope,
+                    }
+
+        # 获取边界值以确定搜索方向（两个边界一次批量计算）
+        (h11_at_min, f20_at_min), (h11_at_max, f20_at_max) = get_values_many([margin_min, margin_max])
+
         # 检查目标是否在可达范围内
         h11_lower = min(h11_at_min, h11_at_max)
         h11_upper = max(h11_at_min, h11_at_max)
 
-        # H11 随 margin 变化的方向
-        h11_increases_with_margin = h11_at_max > h11_at_min
-
         # 如果目标范围完全在可达范围外，返回边界解
         if h11_max < h11_lower:
             # 目标太低，返回使 H11 最小的 margin
@@ -1191,69 +2072,37 @@ class TaxAdjuster:
                 'note': 'H11目标过高'
             }
 
-        # 二分搜索
-        low, high = margin_min, margin_max
-        best_margin = (low + high) / 2
-        best_h11, best_f20 = get_values(best_margin)
-
-        for _ in range(30):  # 最多 30 次迭代
-            if high - low < 1e-5:
-                break
-
-            mid = (low + high) / 2
-            h11, f20 = get_values(mid)
-
-            # 检查是否在目标范围内
-            if h11_min <= h11 <= h11_max:
-                return {
-                    'margin': mid,
-                    'H11': h11,
-                    'F20': f20,
-                    'converged': True
-                }
-
-            # 更新最优解（最接近目标范围中点）
-            if abs(h11 - target_h11) < abs(best_h11 - target_h11):
-                best_margin = mid
-                best_h11 = h11
-                best_f20 = f20
-
-            # 调整搜索范围
-            if h11_increases_with_margin:
-                if h11 < target_h11:
-                    low = mid
-                else:
-                    high = mid
-            else:
-                if h11 > target_h11:
-                    low = mid
-                else:
-                    high = mid
-
-        # 返回最优近似解
+        # Brent 法搜索（端点已计算），H11 落入目标范围即停止；未收敛时返回最接近目标中点的解
+        root = brent(
+            lambda margin: get_values(margin)[0], margin_min, margin_max, target_h11,
+            accept=accept, xtol=1e-5, maxiter=30, f_low=h11_at_min, f_high=h11_at_max,
+        )
+        h11, f20 = get_values(root.x)
         return {
-            'margin': best_margin,
-            'H11': best_h11,
-            'F20': best_f20,
-            'converged': h11_min <= best_h11 <= h11_max
+            'margin': root.x,
+            'H11': h11,
+            'F20': f20,
+            'converged': root.converged,
+            'slope': (h11_at_max - h11_at_min) / (margin_max - margin_min),
         }
 
-    def find_optimal_margin_v4(self, h11_range, f20_range, margin_range):
+    def find_optimal_margin_v4(self, h11_range, f20_range, margin_range, start=None):
         """
-        优化搜索算法 v4：H11 优先 + 高效二分法
+        优化搜索算法 v4：H11 优先 + Brent 法
 
         算法原理：
         1. H11 优先：仅确保 H11 落在目标范围内
         2. 利用 F20-B11 线性关系：对任意 margin，只需 2 次计算确定使 F20=0 的 B11
-        3. 二分搜索 margin：找到使 H11 落在目标范围的 margin 值
+        3. Brent 法搜索 margin：找到使 H11 落在目标范围的 margin 值
         4. F20 范围不参与搜索判断，仅记录结果
 
-        复杂度：~15-20 次计算（二分 ~10 次 × 每次 ~2 次）
+        复杂度：H11 随 margin 近似线性，Brent 法通常 3-5 步收敛（每步 ~3 次计算）
 
         Args:
             h11_range: (min, max) H11 目标范围
             f20_range: (min, max) F20 目标范围（仅用于结果标记，不影响搜索）
             margin_range: (min, max) 毛利率搜索范围
+            start: 预计的 margin（如上一次的结果），给出时先在其附近的小区间内搜索
 
         Returns:
             dict: 包含 margin, B11, H11, F20, converged, iterations, h11_ok, f20_ok
@@ -1265,25 +2114,18 @@ class TaxAdjuster:
         target_f20 = 0  # 固定目标：使 F20 尽量接近 0
 
         calc_count = 0
-        cache = {}
+        probed = set()
 
         def get_values(margin, b11):
-            """获取 H11 和 F20 值（带缓存）"""
+            """获取 H11 和 F20 值（重复点由 _calculate 的备忘录返回，不计入计算次数）"""
             nonlocal calc_count
-            cache_key = (round(margin, 6), round(b11, 0))
-            if cache_key in cache:
-                return cache[cache_key]
-
-            calc_count += 1
-            inputs = {
-                self._cell_key(self.MARGIN_SHEET, self.MARGIN_CELL): margin,
-                self._cell_key('产品成本', 'B11'): b11,
-            }
-            solution = self._calculate(inputs)
-            h11 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'H11'))
-            f20 = self._to_number(self._get_value(solution, self.MARGIN_SHEET, 'F20'))
-            cache[cache_key] = (h11, f20)
-            return h11, f20
+            point = (round(margin, 6), round(b11, 0))
+            if point not in probed:
+                probed.add(point)
+                calc_count += 1
+            return self._calculate(
+                dict(zip(self.MARGIN_SEARCH_INPUTS, (margin, b11))), self.MARGIN_SEARCH_OUTPUTS
+            )
 
         def find_b11_for_f20(margin, target_f20_val):
             """利用线性关系计算使 F20=target 的 B11"""
@@ -1305,24 +2147,44 @@ class TaxAdjuster:
             h11, f20 = get_values(margin, b11)
             return h11, f20, b11
 
-        # ========== 阶段 1: 确定 H11 随 margin 的变化方向 ==========
+        # ========== 阶段 1: 确定搜索区间 ==========
         self._report_progress(20, "分析 H11-margin 关系...")
 
-        h11_at_min, f20_at_min, b11_at_min = get_h11_at_margin(margin_min)
-        h11_at_max, f20_at_max, b11_at_max = get_h11_at_margin(margin_max)
+        bracket = None
+        if start is not None:
+            # 热启动：上一次的 margin 仍使 H11 达标时直接采用，否则从其附近外推/扩大区间
+            start = min(max(start, margin_min), margin_max)
+            h11_at_start = get_h11_at_margin(start)[0]
+            *bracket, bracketed, _ = expand_bracket(
+                lambda margins: [get_h11_at_margin(m)[0] for m in margins], start,
+                margin_min, margin_max, self.WARM_START_WIDTH['margin'], target_h11,
+                accept=lambda margin, h11: h11_min <= h11 <= h11_max, f_center=h11_at_start,
+            )
+            if bracketed:
+                self._warm_used.add('margin')
+            else:
+                bracket = None
 
-        # H11 随 margin 的变化方向
-        h11_increases = h11_at_max > h11_at_min
+        if bracket is None:
+            h11_at_min, f20_at_min, b11_at_min = get_h11_at_margin(margin_min)
+            h11_at_max, f20_at_max, b11_at_max = get_h11_at_margin(margin_max)
+            bracket = (margin_min, margin_max, h11_at_min, h11_at_max)
 
-        # 检查目标是否可达
-        h11_lower = min(h11_at_min, h11_at_max)
-        h11_upper = max(h11_at_min, h11_at_max)
+            # H11 随 margin 的变化方向
+            h11_increases = h11_at_max > h11_at_min
+
+            # 检查目标是否可达
+            h11_lower = min(h11_at_min, h11_at_max)
+            h11_upper = max(h11_at_min, h11_at_max)
+        else:
+            # 热启动区间已包含目标
+            h11_increases = True
+            h11_lower, h11_upper = -np.inf, np.inf
 
-        # ========== 阶段 2: 二分搜索使 H11 落在目标范围的 margin ==========
-        self._report_progress(40, "二分搜索最优 margin...")
+        # ========== 阶段 2: Brent 法搜索使 H11 落在目标范围的 margin ==========
+        self._report_progress(40, "搜索最优 margin...")
 
         best_result = None
-        best_h11_error = float('inf')
 
         # 情况1: H11 目标范围完全在可达范围外
         if h11_max < h11_lower:
@@ -1350,49 +2212,31 @@ class TaxAdjuster:
                 'boundary': 'h11_target_too_high'
             }
         else:
-            # 情况2: 目标在可达范围内，二分搜索
-            low, high = margin_min, margin_max
-
-            for iteration in range(25):
-                if high - low < 1e-5:
-                    break
-
-                mid = (low + high) / 2
-                h11, f20, b11 = get_h11_at_margin(mid)
-
-                h11_error = abs(h11 - target_h11)
-
-                # 更新最优解
-                if h11_error < best_h11_error:
-                    best_h11_error = h11_error
-                    best_result = {
-                        'margin': mid,
-                        'B11': b11,
-                        'H11': h11,
-                        'F20': f20,
-                    }
-
-                # 检查 H11 是否在目标范围内
-                if h11_min <= h11 <= h11_max:
-                    # H11 已达标，搜索完成（不检查 F20 范围）
-                    self._report_progress(60, "H11 已达标")
-                    best_result['converged'] = True
-                    break
-
-                # 调整搜索范围
-                if h11_increases:
-                    if h11 < target_h11:
-                        low = mid
-                    else:
-                        high = mid
-                else:
-                    if h11 > target_h11:
-                        low = mid
-                    else:
-                        high = mid
-
-                progress = 40 + int(iteration * 2)
-                self._report_progress(progress, f"搜索中... (迭代 {iteration + 1})")
+            # 情况2: 目标在可达范围内，Brent 法搜索（端点已计算）
+            iteration = 0
+
+            def h11_at(margin):
+                nonlocal iteration
+                iteration += 1
+                self._report_progress(40 + int(iteration * 2), f"搜索中... (迭代 {iteration})")
+                return get_h11_at_margin(margin)[0]
+
+            low, high, h11_at_low, h11_at_high = bracket
+            root = brent(
+                h11_at, low, high, target_h11,
+                accept=lambda margin, h11: h11_min <= h11 <= h11_max,
+                xtol=1e-5, maxiter=25, f_low=h11_at_low, f_high=h11_at_high,
+            )
+            h11, f20, b11 = get_h11_at_margin(root.x)
+            best_result = {
+                'margin': root.x,
+                'B11': b11,
+                'H11': h11,
+                'F20': f20,
+            }
+            if root.converged:
+                # H11 已达标，搜索完成（不检查 F20 范围）
+                self._report_progress(60, "H11 已达标")
 
         # ========== 阶段 3: 验证结果 ==========
         self._report_progress(95, "验证结果...")
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+计算后端
+TaxAdjuster 通过统一的 load / evaluate / close 接口计算工作簿公式，
+formulas 完整模型为参考实现，可与更快的后端并行比对结果
+"""
+
+import io
+import os
+import re
+
+import formulas
+import numpy as np
+from formulas.excel import BOOK
+from formulas.excel.xlreader import load_workbook
+
+from .model_cache import ModelCache
+from .search_model import SearchModel
+
+# 公式中的工作表引用：'工作表名'!A1 或 工作表名!A1（外部工作簿引用按同名工作表处理，只会多加载）
+_SHEET_REFERENCE = re.compile(r"'((?:[^']|'')+)'!|([^\s'!=+\-*/^&(),;:<>{}\[\]\"]+)!")
+
+
+def reachable_sheets(book, roots):
+    """从根工作表出发，沿公式中的工作表引用可达的工作表（含根工作表）
+
+    Args:
+        book: formulas 读取的工作簿
+        roots: 根工作表名
+
+    Returns:
+        set: 工作表名（与 book.sheetnames 大小写一致）
+    """
+    names = {name.upper(): name for name in book.sheetnames}
+    reached = {names[root.upper()] for root in roots if root.upper() in names}
+    stack = list(reached)
+    while stack:
+        for row in book[stack.pop()].iter_rows():
+            for cell in row:
+                if cell.data_type != 'f':
+                    continue
+                text = cell.value if isinstance(cell.value, str) else getattr(cell.value, 'text', '') or ''
+                for quoted, plain in _SHEET_REFERENCE.findall(text):
+                    name = names.get((quoted.replace("''", "'") if quoted else plain).upper())
+                    if name is not None and name not in reached:
+                        reached.add(name)
+                        stack.append(name)
+    return reached
+
+
+class EvaluationBackend:
+    """计算后端接口
+
+    单元格一律以 (工作表名, 单元格) 表示，例如 ('测算表', 'E18')。
+    """
+
+    # 后端名称（用于日志与比对报告）
+    name = 'base'
+
+    def load(self, file_path, content=None):
+        """加载工作簿
+
+        Args:
+            file_path: 工作簿路径（文件名为单元格键的一部分）
+            content: 工作簿文件内容（bytes），给出时从内存加载，不再读取 file_path
+        """
+        raise NotImplementedError
+
+    def evaluate(self, inputs, outputs):
+        """修改输入单元格后计算输出单元格
+
+        Args:
+            inputs: {(sheet, cell): 值}
+            outputs: [(sheet, cell), ...]
+
+        Returns:
+            list: 与 outputs 顺序一致的单元格取值（标量）
+        """
+        raise NotImplementedError
+
+    def evaluate_many(self, inputs, rows, outputs):
+        """批量计算多组输入
+
+        Args:
+            inputs: 每一列对应的输入单元格 [(sheet, cell), ...]
+            rows: 二维数组，每行一组输入取值
+            outputs: [(sheet, cell), ...]
+
+        Returns:
+            list: 与 rows 顺序一致，每项为与 outputs 顺序一致的取值列表
+        """
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(inputs))
+        return [self.evaluate(dict(zip(inputs, row.tolist())), outputs) for row in rows]
+
+    def close(self):
+        """释放已加载的工作簿"""
+
+
+class FormulasBackend(EvaluationBackend):
+    """formulas 完整模型后端（参考实现）
+
+    每次带输入的计算都在完整 ExcelModel 上重算，结果作为其他后端的比对基准。
+    """
+
+    name = 'formulas'
+
+    def __init__(self, model_cache=None, use_model_cache=True, sheets=None):
+        """
+        Args:
+            model_cache: 模型磁盘缓存（ModelCache），默认使用用户目录下的缓存
+            use_model_cache: 是否启用模型磁盘缓存
+            sheets: 根工作表名，只加载、编译从这些工作表的公式可达的工作表；为 None 时加载全部工作表
+        """
+        self.sheets = tuple(sheets) if sheets else None
+        if use_model_cache:
+            self.model_cache = model_cache if model_cache is not None else ModelCache()
+        else:
+            self.model_cache = None
+        self.model = None
+        self.filename = None
+        self.digest = None  # 工作簿内容哈希（启用缓存时）
+        self._base_solution = None
+        self._keys = {}  # (sheet, cell) -> formulas 单元格键，随模型重置
+
+    def load(self, file_path, content=None):
+        """加载工作簿，优先从磁盘缓存读取已编译模型
+
+        工作簿只读取一次到内存（已给出 content 时不读取），在内存中编译，不写临时文件。
+        缓存以文件内容哈希为键，文件内容变化后自动失效。
+        命中时 filename 为构建缓存时的文件名，保证单元格键与模型一致。
+        """
+        self.filename = os.path.basename(file_path)
+        if content is None:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+        self.model = self._load_cached_model(content)
+        self._base_solution = None
+        self._keys = {}
+
+    def _compile(self, content):
+        """由内存中的工作簿内容编译模型
+
+        formulas 按文件名查找已读取的工作簿，预先放入后不再访问磁盘，
+        单元格键仍以 filename 为前缀。指定了根工作表时只编译可达的工作表，
+        其余工作表中被引用到的单元格（如定义名称引用）由 finish 时的补全按需加载。
+        编译完成后释放读取的工作簿，与从缓存加载的模型一致。
+        """
+        model = formulas.ExcelModel()
+        book = load_workbook(io.BytesIO(content))
+        model.books[self.filename.upper()] = {BOOK: book}
+        if self.sheets is None:
+            model.loads(self.filename)
+        else:
+            _, context = model.add_book(self.filename)
+            reached = reachable_sheets(book, self.sheets)
+            model.pushes(*(book[name] for name in book.sheetnames if name in reached), context=context)
+        model.finish()
+        model.books.clear()
+        return model
+
+    def _load_cached_model(self, content):
+        """优先从磁盘缓存加载模型，未命中时编译并写入缓存"""
+        if self.model_cache is None:
+            return self._compile(content)
+
+        self.digest = self.model_cache.content_digest(content, self.sheets)
+        cached = self.model_cache.load(self.digest)
+        if cached is not None:
+            self.filename, model = cached
+            return model
+
+        model = self._compile(content)
+        try:
+            self.model_cache.save(self.digest, self.filename, model)
+        except (OSError, TypeError, ValueError):
+            pass  # 缓存写入失败不影响计算
+        return model
+
+    def close(self):
+        self.model = None
+        self.digest = None
+        self._base_solution = None
+        self._keys = {}
+
+    def key(self, sheet_name, cell):
+        """生成 formulas 单元格引用键"""
+        return f"'[{self.filename}]{sheet_name}'!{cell}"
+
+    def keys(self, cells):
+        """[(sheet, cell), ...] -> formulas 单元格键列表，每个模型只拼接一次"""
+        keys = self._keys
+        result = []
+        for cell in cells:
+            key = keys.get(cell)
+            if key is None:
+                key = keys[cell] = self.key(*cell)
+            result.append(key)
+        return result
+
+    @staticmethod
+    def scalar(value):
+        """从 formulas 计算结果中提取标量值"""
+        if value is None:
+            return None
+        val = value.value
+        # formulas 返回 numpy 数组，需要提取标量值
+        if hasattr(val, '__iter__') and not isinstance(val, str):
+            try:
+                return val[0][0] if len(val) > 0 and hasattr(val[0], '__len__') else val[0]
+            except (IndexError, TypeError):
+                return val
+        return val
+
+    def solution(self, inputs=None):
+        """计算并返回 formulas solution（以 formulas 单元格键为键）
+
+        无输入修改时返回缓存的基准解。
+        """
+        if not inputs:
+            if self._base_solution is None:
+                self._base_solution = self.model.calculate(inputs={})
+            return self._base_solution
+        return self.model.calculate(inputs=inputs)
+
+    def solution_many(self, keys, rows):
+        """批量计算多组输入，返回与 rows 顺序一致的 solution 列表"""
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(keys))
+        return [self.solution(dict(zip(keys, row.tolist()))) for row in rows]
+
+    def evaluate(self, inputs, outputs):
+        solution = self.solution(dict(zip(self.keys(inputs), inputs.values())))
+        return [self.scalar(solution.get(key)) for key in self.keys(outputs)]
+
+    def evaluate_many(self, inputs, rows, outputs):
+        output_keys = self.keys(outputs)
+        solutions = self.solution_many(self.keys(inputs), rows)
+        return [[self.scalar(solution.get(key)) for key in output_keys] for solution in solutions]
+
+
+class CompiledBackend(FormulasBackend):
+    """剪枝编译后端
+
+    只修改搜索输入单元格时，在从输入到输出的依赖锥上计算：
+    优先使用转译生成的 Python/NumPy 代码，其次增量重算，最后完整重算锥；
+    其他输入仍使用完整模型。
+    """
+
+    name = 'compiled'
+
+    def __init__(self, search_inputs, search_outputs, model_cache=None, use_model_cache=True, sheets=None):
+        """
+        Args:
+            search_inputs: 搜索时会修改的单元格 [(sheet, cell), ...]
+            search_outputs: 搜索时需要读取的单元格 [(sheet, cell), ...]
+            model_cache: 模型磁盘缓存
+            use_model_cache: 是否启用模型磁盘缓存
+            sheets: 根工作表名，只加载可达的工作表（见 FormulasBackend）
+        """
+        super().__init__(model_cache=model_cache, use_model_cache=use_model_cache, sheets=sheets)
+        self.search_inputs = list(search_inputs)
+        self.search_outputs = list(search_outputs)
+        self.use_search_model = True  # False 时始终使用完整模型计算
+        self.use_incremental = True  # 子模型只重算变化输入的下游公式
+        self.verify_incremental = False  # 调试开关：每次计算后与完整重算比对（含生成代码）
+        self.use_generated_code = True  # 子模型转译为 Python/NumPy 代码计算
+        self._search_model = None
+
+    def close(self):
+        super().close()
+        self._search_model = None
+
+    def search_model(self):
+        """获取剪枝子模型，首次调用时构建；构建失败时返回 None（回退完整模型）"""
+        if not self.use_search_model:
+            return None
+        if self._search_model is None:
+            try:
+                self._search_model = SearchModel(
+                    self.model,
+                    [self.key(sheet, cell) for sheet, cell in self.search_inputs],
+                    [self.key(sheet, cell) for sheet, cell in self.search_outputs],
+                    base_solution=self.solution(),
+                    incremental=self.use_incremental,
+                    verify_incremental=self.verify_incremental,
+                )
+            except Exception:
+                self._search_model = False  # 标记构建失败，不再重试
+            else:
+                if self.use_generated_code:
+                    self._install_generated_code(self._search_model)
+        return self._search_model or None
+
+    def _install_generated_code(self, search_model):
+        """为子模型安装转译生成的 Python/NumPy 代码
+
+        每次由已加载的模型重新生成（几十毫秒），不从磁盘读取代码执行，
+        缓存目录被改写时也不会执行其中的代码；
+        子模型包含不支持转译的公式时保持使用 formulas 计算。
+        """
+        try:
+            search_model.install_kernel(search_model.generate_source())
+        except Exception:
+            pass  # 不支持转译，使用 formulas 计算
+
+    def solution(self, inputs=None):
+        """输入只涉及搜索输入时使用剪枝子模型（只返回搜索输出），否则使用完整模型"""
+        if not inputs:
+            return super().solution()
+        search_model = self.search_model()
+        if search_model is not None and search_model.accepts(inputs):
+            search_model.verify_incremental = self.verify_incremental
+            return search_model.calculate(inputs)
+        return super().solution(inputs)
+
+    def solution_many(self, keys, rows):
+        search_model = self.search_model()
+        if search_model is not None and search_model.accepts(keys):
+            search_model.verify_incremental = self.verify_incremental
+            return search_model.calculate_many(keys, rows)
+        return super().solution_many(keys, rows)
+
+
+class ParityBackend(EvaluationBackend):
+    """比对后端：同一组输入同时交给参考后端与候选后端计算
+
+    返回参考后端的结果，并按输出单元格记录两者的最大偏差，
+    用于在生产环境中安全地验证更快的后端。
+    """
+
+    name = 'parity'
+
+    def __init__(self, reference, candidate):
+        """
+        Args:
+            reference: 参考后端（结果以它为准），通常为 FormulasBackend
+            candidate: 待验证的后端
+        """
+        self.reference = reference
+        self.candidate = candidate
+        self._divergence = {}
+
+    @property
+    def model(self):
+        return getattr(self.reference, 'model', None)
+
+    @property
+    def filename(self):
+        return getattr(self.reference, 'filename', None)
+
+    def load(self, file_path, content=None):
+        self.reference.load(file_path, content)
+        self.candidate.load(file_path, content)
+
+    def close(self):
+        self.reference.close()
+        self.candidate.close()
+
+    def key(self, sheet_name, cell):
+        return self.reference.key(sheet_name, cell)
+
+    def evaluate(self, inputs, outputs):
+        expected = self.reference.evaluate(inputs, outputs)
+        actual = self.candidate.evaluate(inputs, outputs)
+        for cell, exp, act in zip(outputs, expected, actual):
+            self._record(cell, exp, act, inputs)
+        return expected
+
+    def evaluate_many(self, inputs, rows, outputs):
+        expected = self.reference.evaluate_many(inputs, rows, outputs)
+        actual = self.candidate.evaluate_many(inputs, rows, outputs)
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(inputs))
+        for row, exp_values, act_values in zip(rows, expected, actual):
+            row_inputs = dict(zip(inputs, row.tolist()))
+            for cell, exp, act in zip(outputs, exp_values, act_values):
+                self._record(cell, exp, act, row_inputs)
+        return expected
+
+    def _record(self, cell, expected, actual, inputs):
+        """记录一个输出单元格的偏差"""
+        abs_error = self._difference(expected, actual)
+        rel_error = abs_error / abs(expected) if abs_error and self._is_number(expected) and expected else 0.0
+        stats = self._divergence.setdefault(cell, {
+            'count': 0, 'max_abs': 0.0, 'max_rel': 0.0, 'worst_inputs': None,
+        })
+        stats['count'] += 1
+        if abs_error > stats['max_abs'] or stats['worst_inputs'] is None:
+            stats['worst_inputs'] = dict(inputs)
+        stats['max_abs'] = max(stats['max_abs'], abs_error)
+        stats['max_rel'] = max(stats['max_rel'], rel_error)
+
+    @staticmethod
+    def _is_number(value):
+        return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+
+    @classmethod
+    def _difference(cls, expected, actual):
+        """两个单元格取值的差（非数值时相同为 0，不同为 inf）"""
+        if cls._is_number(expected) and cls._is_number(actual):
+            return abs(float(expected) - float(actual))
+        return 0.0 if str(expected) == str(actual) else float('inf')
+
+    def report(self):
+        """按输出单元格汇总的最大偏差
+
+        Returns:
+            dict: {(sheet, cell): {'count', 'max_abs', 'max_rel', 'worst_inputs'}}
+        """
+        return {cell: dict(stats) for cell, stats in self._divergence.items()}
+
+    def reset(self):
+        """清空偏差记录"""
+        self._divergence = {}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量重算
+保留上一次的计算结果，只重算受变化输入影响的公式单元格
+"""
+
+import numpy as np
+
+
+class IncrementalEvaluator:
+    """基于 formulas 编译子模型的增量求值器
+
+    在 formulas 编译出的依赖锥（DispatchPipe.dsp）上按拓扑顺序调用公式函数，
+    每个输入单元格预先记录其下游公式，输入变化时只重算这些公式。
+    """
+
+    def __init__(self, dsp, input_keys, output_keys, initial_inputs):
+        """构建求值器并完成一次完整计算
+
+        Args:
+            dsp: formulas 编译子模型的 schedula Dispatcher
+            input_keys: 输入单元格键（与 initial_inputs 顺序一致）
+            output_keys: 输出单元格键
+            initial_inputs: 输入单元格的初始值列表
+        """
+        self.input_keys = list(input_keys)
+        self.output_keys = list(output_keys)
+        self._nodes = dsp.nodes
+
+        functions = [k for k, v in dsp.nodes.items() if v['type'] == 'function']
+        self._order = self._topological_order(dsp, functions)
+
+        # 每个输入单元格下游的公式（按拓扑顺序）
+        position = {k: i for i, k in enumerate(self._order)}
+        self._downstream = {}
+        for key in self.input_keys:
+            affected = self._downstream_functions(dsp, key)
+            self._downstream[key] = sorted(affected, key=position.__getitem__)
+
+        # 当前解：所有数据节点的取值
+        self._values = {}
+        for key, default in dsp.default_values.items():
+            self._set_data(key, default['value'])
+        self._last_inputs = {}
+        for key, value in zip(self.input_keys, initial_inputs):
+            self._set_data(key, value)
+            self._last_inputs[key] = value
+        for func_id in self._order:
+            self._run_function(func_id)
+
+    @staticmethod
+    def _topological_order(dsp, functions):
+        """公式函数节点的拓扑顺序"""
+        function_set = set(functions)
+        pred = dsp.dmap.pred
+
+        def function_preds(func_id):
+            result = set()
+            for data_id in pred[func_id]:
+                result.update(k for k in pred[data_id] if k in function_set)
+            return result
+
+        remaining = {k: function_preds(k) for k in functions}
+        order = []
+        ready = [k for k, deps in remaining.items() if not deps]
+        done = set()
+        while ready:
+            func_id = ready.pop()
+            order.append(func_id)
+            done.add(func_id)
+            for data_id in dsp.dmap.succ[func_id]:
+                for succ in dsp.dmap.succ[data_id]:
+                    if succ in remaining and succ not in done and remaining[succ] <= done:
+                        if succ not in ready:
+                            ready.append(succ)
+        if len(order) != len(functions):
+            raise ValueError("公式依赖存在循环引用，无法增量计算")
+        return order
+
+    @staticmethod
+    def _downstream_functions(dsp, source):
+        """返回 source 下游的所有公式函数节点"""
+        nodes = dsp.nodes
+        seen = set()
+        stack = [source]
+        while stack:
+            node = stack.pop()
+            for succ in dsp.dmap.succ.get(node, ()):
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return [k for k in seen if nodes[k]['type'] == 'function']
+
+    def _set_data(self, data_id, value):
+        """写入数据节点取值（应用节点过滤器）"""
+        for f in self._nodes[data_id].get('filters', ()):
+            value = f(value)
+        self._values[data_id] = value
+
+    def _run_function(self, func_id):
+        """调用一个公式函数并写入其输出"""
+        node = self._nodes[func_id]
+        args = [self._values[k] for k in node['inputs']]
+        result = node['function'](*args)
+        for f in node.get('filters', ()):
+            result = f(result)
+        outputs = node['outputs']
+        if len(outputs) == 1:
+            result = (result,)
+        for data_id, value in zip(outputs, result):
+            self._set_data(data_id, value)
+
+    def evaluate(self, input_values):
+        """计算输出单元格，只重算变化输入的下游公式
+
+        Args:
+            input_values: 输入单元格取值列表（与 input_keys 顺序一致）
+
+        Returns:
+            list: 输出单元格取值（formulas Ranges）
+        """
+        dirty = set()
+        for key, value in zip(self.input_keys, input_values):
+            if self._same_value(self._last_inputs.get(key), value):
+                continue
+            self._set_data(key, value)
+            self._last_inputs[key] = value
+            dirty.update(self._downstream[key])
+
+        if dirty:
+            for func_id in self._order:
+                if func_id in dirty:
+                    self._run_function(func_id)
+
+        return [self._values[k] for k in self.output_keys]
+
+    @staticmethod
+    def _same_value(old, new):
+        """判断输入值是否未变化"""
+        if old is new:
+            return True
+        try:
+            return bool(np.all(np.asarray(old, dtype=object) == np.asarray(new, dtype=object)))
+        except (TypeError, ValueError):
+            return False
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型计算结果备忘录
+以量化后的输入取值为键缓存输出单元格取值，各搜索算法共用，按最近使用淘汰
+"""
+
+from collections import OrderedDict
+
+
+class EvaluationMemo:
+    """会话级计算结果 LRU 缓存
+
+    键为按单元格排序的 ((sheet, cell), 量化取值) 元组，
+    值为 {输出单元格: 取值}；同一组输入先后请求不同输出时合并到同一条目。
+    """
+
+    # 默认最多保留的输入组数
+    DEFAULT_MAXSIZE = 4096
+
+    # 未单独配置的输入单元格保留的小数位数
+    DEFAULT_DECIMALS = 10
+
+    def __init__(self, maxsize=None, decimals=None):
+        """
+        Args:
+            maxsize: 最多保留的输入组数
+            decimals: {(sheet, cell): 小数位数}，输入取值按此量化后作为键
+        """
+        self.maxsize = self.DEFAULT_MAXSIZE if maxsize is None else maxsize
+        self.decimals = dict(decimals or {})
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, inputs):
+        """{(sheet, cell): 值} -> 缓存键"""
+        return tuple(sorted(
+            (cell, round(float(value), self.decimals.get(cell, self.DEFAULT_DECIMALS)))
+            for cell, value in inputs.items()
+        ))
+
+    def lookup(self, key, outputs):
+        """查找已缓存的输出取值，全部命中时返回取值列表，否则返回 None"""
+        entry = self._entries.get(key)
+        if entry is not None and all(cell in entry for cell in outputs):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [entry[cell] for cell in outputs]
+        self.misses += 1
+        return None
+
+    def store(self, key, outputs, values):
+        """写入一组输入的输出取值，超出容量时淘汰最久未使用的条目"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = {}
+        else:
+            self._entries.move_to_end(key)
+        entry.update(zip(outputs, values))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def records(self, inputs, outputs):
+        """输入单元格恰为 inputs、且已缓存全部 outputs 的计算结果（不计入命中统计）
+
+        Returns:
+            list: [(输入取值元组（与 inputs 顺序一致，已量化）, 输出取值列表), ...]
+        """
+        cells = tuple(sorted(inputs))
+        records = []
+        for key, entry in self._entries.items():
+            if tuple(cell for cell, _ in key) == cells and all(cell in entry for cell in outputs):
+                values = dict(key)
+                records.append((tuple(values[cell] for cell in inputs), [entry[cell] for cell in outputs]))
+        return records
+
+    def counts(self):
+        """(命中次数, 未命中次数)"""
+        return self.hits, self.misses
+
+    def clear(self):
+        """清空缓存（工作簿变化时调用），保留命中统计"""
+        self._entries.clear()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+formulas 模型磁盘缓存
+按工作簿内容哈希保存已编译模型的单元格定义，文件变化后自动失效
+"""
+
+import hashlib
+import json
+import os
+
+import formulas
+
+
+class ModelCache:
+    """formulas ExcelModel 磁盘缓存（内容哈希索引 + LRU 淘汰）"""
+
+    # 缓存格式版本，格式变化时递增以使旧缓存失效
+    FORMAT_VERSION = 1
+
+    # 默认缓存总大小上限（字节）
+    DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+    # 缓存文件后缀
+    SUFFIX = '.model.json'
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """初始化缓存
+
+        Args:
+            cache_dir: 缓存目录，默认 ~/.accounting_assistant/model_cache
+            max_bytes: 缓存总大小上限（字节），超出时按最近使用时间淘汰
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser('~'), '.accounting_assistant', 'model_cache')
+        self.cache_dir = cache_dir
+        self.max_bytes = self.DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+
+    @classmethod
+    def _new_digest(cls, sheets=None):
+        """内容哈希对象（已包含 formulas 版本、缓存格式版本及只加载部分工作表时的根工作表）"""
+        digest = hashlib.sha256()
+        digest.update(f"formulas={formulas.__version__};format={cls.FORMAT_VERSION};".encode('utf-8'))
+        if sheets:
+            digest.update(f"sheets={','.join(sorted(sheets))};".encode('utf-8'))
+        return digest
+
+    @classmethod
+    def file_digest(cls, file_path, sheets=None):
+        """计算工作簿内容哈希（包含 formulas 版本与缓存格式版本）
+
+        Args:
+            file_path: 工作簿路径
+            sheets: 模型只加载从这些根工作表可达的工作表时给出，不同的根工作表对应不同的缓存条目
+        """
+        digest = cls._new_digest(sheets)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @classmethod
+    def content_digest(cls, content, sheets=None):
+        """由内存中的工作簿内容（bytes）计算哈希，与同一文件、同一 sheets 的 file_digest 相同"""
+        digest = cls._new_digest(sheets)
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _entry_path(self, digest):
+        """缓存条目文件路径"""
+        return os.path.join(self.cache_dir, digest + self.SUFFIX)
+
+    def load(self, digest):
+        """读取缓存条目
+
+        Returns:
+            (filename, model) 或 None（未命中或缓存损坏）
+            filename: 构建模型时使用的文件名（formulas 单元格键的一部分）
+        """
+        path = self._entry_path(digest)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            model = formulas.ExcelModel().from_dict(entry['cells'])
+        except Exception:
+            # 缓存损坏，删除后按未命中处理
+            self._remove(path)
+            return None
+
+        # 更新访问时间，用于 LRU 淘汰
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return entry['filename'], model
+
+    def save(self, digest, filename, model):
+        """保存模型到缓存
+
+        Args:
+            digest: 工作簿内容哈希
+            filename: 构建模型时使用的文件名
+            model: 已 finish 的 formulas ExcelModel
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(digest)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        entry = {
+            'filename': filename,
+            'cells': model.to_dict(),
+        }
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        finally:
+            self._remove(tmp_path)
+        self.evict()
+
+    def _is_entry(self, name):
+        """判断文件是否为缓存条目"""
+        return name.endswith(self.SUFFIX)
+
+    def evict(self):
+        """按最近使用时间淘汰缓存，直到总大小不超过上限"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+
+        entries = []
+        total = 0
+        for name in names:
+            if not self._is_entry(name):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        # 最久未使用的优先淘汰
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """清空缓存目录中的全部条目"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if self._is_entry(name):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    def _remove(self, path):
+        """删除文件（忽略失败）"""
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            pass
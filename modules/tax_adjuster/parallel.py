@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程并行计算
+每个工作进程只加载一次工作簿模型，主进程按提交顺序收集结果，
+停止时终止工作进程以取消尚未完成的任务
+"""
+
+import multiprocessing
+import time
+
+# 工作进程内的 TaxAdjuster（由 _init_worker 创建）
+_worker = None
+# 工作进程初始化失败时的错误说明（由 _call 抛出，交给主进程）
+_init_error = None
+
+
+class WorkerError(RuntimeError):
+    """工作进程启动失败或无响应"""
+
+
+def _init_worker(file_path, content, cache_dir, use_model_cache):
+    """工作进程初始化：加载一次模型（优先读取主进程已写入的磁盘缓存）
+
+    初始化中的异常不抛出（否则进程池会不断重启工作进程），记录后由每个任务报告
+    """
+    global _worker, _init_error
+    try:
+        from .adjust_tax import TaxAdjuster
+        from .model_cache import ModelCache
+
+        model_cache = ModelCache(cache_dir=cache_dir) if use_model_cache and cache_dir else None
+        _worker = TaxAdjuster(file_path, model_cache=model_cache, use_model_cache=use_model_cache)
+        _worker._open_backend(file_path, content)
+    except Exception as e:
+        _init_error = f"{type(e).__name__}: {e}"
+
+
+def _call(method, args):
+    """在工作进程的 TaxAdjuster 上调用方法"""
+    if _init_error is not None:
+        raise WorkerError(f"工作进程初始化失败: {_init_error}")
+    if method is None:
+        return True
+    return getattr(_worker, method)(*args)
+
+
+class WorkerPool:
+    """加载了同一工作簿模型的工作进程池"""
+
+    # 轮询间隔（秒），等待结果期间按此间隔检查停止请求
+    POLL_INTERVAL = 0.05
+    # 等待工作进程完成初始化（加载模型）的最长时间（秒）
+    START_TIMEOUT = 120
+
+    def __init__(self, file_path, workers, model_cache=None, start_method='spawn', content=None):
+        """
+        Args:
+            file_path: 工作簿路径（文件名用于单元格键；未给出 content 时工作进程直接读取）
+            workers: 工作进程数
+            model_cache: 主进程使用的模型磁盘缓存，工作进程共用同一目录
+            start_method: 进程启动方式，默认 spawn（GUI 多线程进程中 fork 不安全）
+            content: 主进程已读入内存的工作簿内容，传给工作进程，不再读取文件
+        """
+        cache_dir = getattr(model_cache, 'cache_dir', None)
+        context = multiprocessing.get_context(start_method)
+        self._pool = context.Pool(
+            workers,
+            initializer=_init_worker,
+            initargs=(file_path, content, cache_dir, model_cache is not None),
+        )
+
+    def start(self, stop_check=None):
+        """等待一个工作进程完成初始化，确认进程池可用
+
+        工作进程无法启动时（如子进程导入失败）进程池会不断重启进程，任务永远不会完成，
+        因此握手任务限时等待
+
+        Returns:
+            bool: 是否可用；stop_check 返回 True 时返回 False
+
+        Raises:
+            WorkerError: 初始化失败或超时未完成
+        """
+        return self.wait(self.submit(None), stop_check, timeout=self.START_TIMEOUT) is not None
+
+    def submit(self, method, *args):
+        """提交一个 TaxAdjuster 方法调用，返回 AsyncResult"""
+        return self._pool.apply_async(_call, (method, args))
+
+    def wait(self, task, stop_check=None, timeout=None):
+        """等待任务结果，stop_check 返回 True 时返回 None
+
+        Args:
+            timeout: 最长等待时间（秒），默认不限
+
+        Raises:
+            WorkerError: 工作进程初始化失败或等待超时
+            工作进程中抛出的其他异常
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not task.ready():
+            if stop_check and stop_check():
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                raise WorkerError(f"工作进程 {timeout} 秒内未完成启动")
+            task.wait(self.POLL_INTERVAL)
+        return task.get()
+
+    def terminate(self):
+        """终止工作进程，取消所有未完成的任务"""
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.terminate()
+        return False
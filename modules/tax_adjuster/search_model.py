@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索用剪枝子模型
+只编译从搜索输入单元格到搜索输出单元格路径上的公式
+"""
+
+import numpy as np
+import schedula as sh
+
+from .incremental import IncrementalEvaluator
+from .transpile import generate_source, load_kernel
+
+
+class _CellValue:
+    """生成代码的计算结果，与 formulas Ranges 一样通过 .value 读取二维取值"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = [[value]]
+
+
+class SearchModel:
+    """剪枝子模型 - 只计算搜索输入到搜索输出的依赖锥"""
+
+    def __init__(self, model, input_keys, output_keys, base_solution=None,
+                 incremental=True, verify_incremental=False):
+        """从已 finish 的 formulas ExcelModel 构建子模型
+
+        Args:
+            model: formulas ExcelModel
+            input_keys: 搜索时会修改的单元格键
+            output_keys: 搜索时需要读取的单元格键
+            base_solution: 无输入修改时的完整计算结果，为 None 时自动计算
+            incremental: 是否启用增量重算（只重算变化输入的下游公式）
+            verify_incremental: 调试开关，每次计算后与完整重算结果比对
+                                （增量重算与生成函数的结果都会比对）
+        """
+        if base_solution is None:
+            base_solution = model.calculate()
+
+        data_nodes = model.dsp.data_nodes
+        self._accepted_inputs = set(input_keys)
+        # 模型中不存在的输入单元格（如空白的 J14）无法影响任何输出，直接忽略
+        self.input_keys = [k for k in input_keys if k in data_nodes]
+
+        downstream = self._downstream_nodes(model.dsp.dmap, self.input_keys)
+        self.output_keys = [k for k in output_keys if k in downstream]
+
+        # 不受输入影响的输出单元格，取值固定为基准解
+        self._constants = {
+            k: base_solution[k]
+            for k in output_keys
+            if k not in downstream and k in base_solution
+        }
+        # 未被修改的输入沿用基准值
+        self._base_inputs = [base_solution[k].value for k in self.input_keys]
+
+        self._func = None
+        if self.output_keys:
+            self._func = model.compile(inputs=self.input_keys, outputs=self.output_keys)
+
+        self.verify_incremental = verify_incremental
+        self._incremental = None
+        if incremental and self._func is not None:
+            try:
+                self._incremental = IncrementalEvaluator(
+                    self._func.dsp, self.input_keys, self.output_keys, self._base_inputs
+                )
+            except ValueError:
+                self._incremental = None  # 存在循环引用时每次完整重算
+
+        self._kernel = None  # 转译生成的 Python/NumPy 函数，见 install_kernel
+        self._kernel_base_inputs = None
+
+    @staticmethod
+    def _downstream_nodes(dmap, sources):
+        """返回从 sources 出发可到达的所有节点"""
+        seen = set(sources)
+        stack = list(sources)
+        while stack:
+            node = stack.pop()
+            for succ in dmap.succ.get(node, ()):
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return seen
+
+    def generate_source(self):
+        """把子模型转译为 Python/NumPy 源代码
+
+        Raises:
+            ValueError: 子模型包含不支持转译的公式（或无需计算的输出）
+        """
+        if self._func is None:
+            raise ValueError("子模型没有需要计算的输出单元格")
+        if self._incremental is not None:
+            values = self._incremental._values
+        else:
+            values = IncrementalEvaluator(
+                self._func.dsp, self.input_keys, self.output_keys, self._base_inputs
+            )._values
+        return generate_source(self._func.dsp, self.input_keys, self.output_keys, values)
+
+    def install_kernel(self, source):
+        """使用生成的源代码作为计算后端
+
+        生成函数的结果为非有限值（如除零）时，对应输入回退到 formulas 计算，
+        以保持 Excel 错误值语义。
+
+        Raises:
+            ValueError: 基准输入不是数值，生成函数无法表示
+        """
+        self._kernel_base_inputs = [self._kernel_input(v) for v in self._base_inputs]
+        self._kernel = load_kernel(source)
+
+    def accepts(self, inputs):
+        """判断给定输入是否都能由子模型处理"""
+        return all(key in self._accepted_inputs for key in inputs)
+
+    def calculate(self, inputs):
+        """计算输出单元格
+
+        Args:
+            inputs: {单元格键: 值}，键必须是搜索输入单元格
+
+        Returns:
+            dict: {单元格键: 取值}，仅包含输出单元格；
+                  取值为 formulas Ranges 或生成函数结果，均通过 .value 读取二维取值
+        """
+        solution = dict(self._constants)
+        if self._func is None:
+            return solution
+
+        if self._kernel is not None:
+            values = self._run_kernel(self._kernel_args(inputs))
+            if np.isfinite(values).all():
+                if self.verify_incremental:
+                    self._verify_kernel(values[0], inputs)
+                solution.update(zip(self.output_keys, map(_CellValue, values[0].tolist())))
+                return solution
+        return self._calculate_formulas(solution, inputs)
+
+    def _calculate_formulas(self, solution, inputs):
+        """使用 formulas（增量或完整重算）计算一组输入，结果写入 solution"""
+        args = [
+            inputs.get(key, base)
+            for key, base in zip(self.input_keys, self._base_inputs)
+        ]
+        if self._incremental is not None:
+            values = self._incremental.evaluate(args)
+            if self.verify_incremental:
+                self._verify(values, self._recalculate(args))
+        else:
+            values = self._recalculate(args)
+        solution.update(zip(self.output_keys, values))
+        return solution
+
+    def calculate_many(self, keys, rows):
+        """批量计算多组输入
+
+        已安装生成函数时所有输入一次向量化计算；
+        否则按输入列排序后依次求值，相邻两组输入只有靠后的列不同，
+        增量重算只需更新这些列的下游公式。
+
+        Args:
+            keys: 每一列对应的输入单元格键
+            rows: 二维数组，每行一组输入取值
+
+        Returns:
+            list: 与 rows 顺序一致的 solution 列表（同 calculate）
+        """
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(keys))
+        solutions = [None] * len(rows)
+
+        if self._kernel is not None and self._func is not None:
+            values = self._run_kernel(self._kernel_args(dict(zip(keys, rows.T))), len(rows))
+            for i in np.flatnonzero(np.isfinite(values).all(axis=1)):
+                if self.verify_incremental:
+                    self._verify_kernel(values[i], dict(zip(keys, rows[i].tolist())))
+                solution = dict(self._constants)
+                solution.update(zip(self.output_keys, map(_CellValue, values[i].tolist())))
+                solutions[i] = solution
+
+        # lexsort 以最后一个键为主序，反转后第一列变化最慢
+        for i in np.lexsort(rows.T[::-1]):
+            if solutions[i] is None:
+                inputs = dict(zip(keys, rows[i].tolist()))
+                solutions[i] = self._calculate_formulas(dict(self._constants), inputs)
+        return solutions
+
+    def _kernel_args(self, inputs):
+        """生成函数的参数：给定输入（标量或数组），其余沿用基准值"""
+        return [
+            self._kernel_input(inputs[key]) if key in inputs else base
+            for key, base in zip(self.input_keys, self._kernel_base_inputs)
+        ]
+
+    def _run_kernel(self, args, n=1):
+        """调用生成函数，返回形状为 (n, 输出数) 的数组"""
+        outputs = self._kernel(*args)
+        values = np.empty((n, len(self.output_keys)))
+        for j, output in enumerate(outputs):
+            values[:, j] = np.broadcast_to(np.asarray(output, dtype=float), n)
+        return values
+
+    @staticmethod
+    def _kernel_input(value):
+        """输入取值 -> 生成函数的数值参数（空单元格按 0）"""
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            return value
+        if isinstance(value, (int, float, np.integer, np.floating)):
+            return float(value)
+        array = np.asarray(getattr(value, 'value', value), dtype=object)
+        if array.size != 1:
+            raise ValueError(f"生成函数不支持区域输入: {value}")
+        item = array.ravel()[0]
+        if item is sh.EMPTY:
+            return 0.0
+        if isinstance(item, (int, float, np.integer, np.floating)) and not isinstance(item, bool):
+            return float(item)
+        raise ValueError(f"生成函数不支持非数值输入: {item}")
+
+    def _recalculate(self, args):
+        """在子模型上完整重算，返回输出单元格取值列表"""
+        values = self._func(*args)
+        if len(self.output_keys) == 1:
+            values = [values]
+        return values
+
+    def _verify(self, incremental_values, full_values):
+        """比对增量计算与完整重算结果，不一致时抛出 RuntimeError"""
+        for key, inc, full in zip(self.output_keys, incremental_values, full_values):
+            if not self._same_result(inc, full):
+                raise RuntimeError(
+                    f"增量计算结果与完整重算不一致: {key} 增量={inc.value} 完整={full.value}"
+                )
+
+    def _verify_kernel(self, kernel_values, inputs):
+        """比对生成函数与 formulas 的计算结果（相对误差 1e-9 内视为一致），不一致时抛出 RuntimeError"""
+        expected = self._calculate_formulas({}, inputs)
+        for key, value in zip(self.output_keys, kernel_values):
+            full = np.asarray(getattr(expected[key], 'value', expected[key]), dtype=object).ravel()[0]
+            try:
+                same = np.isclose(value, float(full), rtol=1e-9, atol=1e-12)
+            except (TypeError, ValueError):
+                same = False
+            if not same:
+                raise RuntimeError(
+                    f"生成函数结果与完整重算不一致: {key} 生成函数={value} 完整={full}"
+                )
+
+    @staticmethod
+    def _same_result(a, b):
+        """判断两个 formulas 计算结果是否相同"""
+        a = np.asarray(getattr(a, 'value', a), dtype=object)
+        b = np.asarray(getattr(b, 'value', b), dtype=object)
+        if a.shape != b.shape:
+            return False
+        return all(x == y or str(x) == str(y) for x, y in zip(a.ravel(), b.ravel()))
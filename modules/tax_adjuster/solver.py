@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+求根
+在有界区间内求单调（近似线性）响应 f(x) = target 的解：
+Brent 法、Illinois 试位法、批量 k 等分法与已知拐点的分段线性求解；
+多个输入联立时使用有界 Broyden 法；有上一次结果时由 expand_bracket 从其附近热启动。
+均报告模型计算次数
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# x: 解；value: f(x)；converged: 是否满足容差；evaluations: 本次求解调用 f 的次数
+RootResult = namedtuple('RootResult', ['x', 'value', 'converged', 'evaluations'])
+
+
+class _Problem:
+    """求根问题：计数调用次数，记录最接近目标的点"""
+
+    def __init__(self, f, target, tolerance, accept):
+        self.f = f
+        self.target = target
+        self.tolerance = tolerance
+        self.accept = accept
+        self.evaluations = 0
+        self.best = None  # (|f - target|, x, f)
+
+    def __call__(self, x):
+        """返回 f(x) - target"""
+        self.evaluations += 1
+        value = float(self.f(x))
+        self.record(x, value)
+        return value - self.target
+
+    def record(self, x, value):
+        error = abs(value - self.target)
+        if self.best is None or error < self.best[0]:
+            self.best = (error, x, value)
+
+    def done(self, x, value):
+        """是否满足收敛条件"""
+        if self.accept is not None:
+            return bool(self.accept(x, value))
+        return abs(value - self.target) < self.tolerance
+
+    def result(self, x, value, converged):
+        return RootResult(x, value, converged, self.evaluations)
+
+    def best_result(self):
+        _, x, value = self.best
+        return self.result(x, value, self.done(x, value))
+
+
+def _endpoints(problem, low, high, f_low, f_high):
+    """计算（或沿用已知的）区间端点残差"""
+    if f_low is None:
+        g_low = problem(low)
+    else:
+        problem.record(low, f_low)
+        g_low = f_low - problem.target
+    if f_high is None:
+        g_high = problem(high)
+    else:
+        problem.record(high, f_high)
+        g_high = f_high - problem.target
+    return g_low, g_high
+
+
+def brent(f, low, high, target=0.0, tolerance=0.0, accept=None, xtol=1e-12, maxiter=100,
+          f_low=None, f_high=None):
+    """Brent 法求 f(x) = target（每次迭代计算一次 f）
+
+    逆二次插值/割线步在近似线性的响应上几步即可收敛，不可信时退回二分保证收敛。
+
+    Args:
+        f: 函数 x -> 数值
+        low, high: 搜索区间
+        target: 目标值
+        tolerance: |f(x) - target| < tolerance 时视为收敛
+        accept: 可选的收敛判断 accept(x, f(x))，给出时代替 tolerance
+        xtol: 区间宽度小于该值时停止
+        maxiter: 最大迭代次数
+        f_low, f_high: 已知的端点函数值（不再重复计算）
+
+    Returns:
+        RootResult: 未收敛或区间不包含解时返回最接近目标的点
+    """
+    problem = _Problem(f, target, tolerance, accept)
+    a, b = low, high
+    fa, fb = _endpoints(problem, a, b, f_low, f_high)
+    for x, g in ((a, fa), (b, fb)):
+        if problem.done(x, g + target):
+            return problem.result(x, g + target, True)
+    if fa * fb > 0:
+        return problem.best_result()
+
+    if abs(fa) < abs(fb):
+        a, b, fa, fb = b, a, fb, fa
+    c, fc = a, fa
+    d = c
+    bisected = True
+    for _ in range(maxiter):
+        if abs(b - a) < xtol:
+            break
+        if fa != fc and fb != fc:
+            # 逆二次插值
+            s = (a * fb * fc / ((fa - fb) * (fa - fc))
+                 + b * fa * fc / ((fb - fa) * (fb - fc))
+                 + c * fa * fb / ((fc - fa) * (fc - fb)))
+        else:
+            # 割线
+            s = b - fb * (b - a) / (fb - fa)
+
+        # 插值点不在 (3a+b)/4 与 b 之间或收敛过慢时改用二分
+        bound = (3 * a + b) / 4
+        if (not (min(bound, b) < s < max(bound, b))
+                or (bisected and abs(s - b) >= abs(b - c) / 2)
+                or (not bisected and abs(s - b) >= abs(c - d) / 2)
+                or (bisected and abs(b - c) < xtol)
+                or (not bisected and abs(c - d) < xtol)):
+            s = (a + b) / 2
+            bisected = True
+        else:
+            bisected = False
+
+        fs = problem(s)
+        if problem.done(s, fs + target):
+            return problem.result(s, fs + target, True)
+
+        d, c, fc = c, b, fb
+        if fa * fs < 0:
+            b, fb = s, fs
+        else:
+            a, fa = s, fs
+        if abs(fa) < abs(fb):
+            a, b, fa, fb = b, a, fb, fa
+    return problem.best_result()
+
+
+def illinois(f, low, high, target=0.0, tolerance=0.0, accept=None, xtol=1e-12, maxiter=100,
+             f_low=None, f_high=None):
+    """Illinois 试位法求 f(x) = target（每次迭代计算一次 f）
+
+    参数与返回值同 brent；同一端点连续保留时将其函数值减半，避免试位法单侧停滞。
+    """
+    problem = _Problem(f, target, tolerance, accept)
+    a, b = low, high
+    fa, fb = _endpoints(problem, a, b, f_low, f_high)
+    for x, g in ((a, fa), (b, fb)):
+        if problem.done(x, g + target):
+            return problem.result(x, g + target, True)
+    if fa * fb > 0:
+        return problem.best_result()
+
+    side = 0
+    for _ in range(maxiter):
+        if abs(b - a) < xtol or fb == fa:
+            break
+        x = (a * fb - b * fa) / (fb - fa)
+        fx = problem(x)
+        if problem.done(x, fx + target):
+            return problem.result(x, fx + target, True)
+
+        if fx * fb > 0:
+            b, fb = x, fx
+            if side == -1:
+                fa /= 2
+            side = -1
+        elif fx * fa > 0:
+            a, fa = x, fx
+            if side == 1:
+                fb /= 2
+            side = 1
+        else:
+            break
+    return problem.best_result()
+
+
+def section_search(f_many, low, high, target=0.0, tolerance=0.0, accept=None, xtol=1e-12,
+                   maxiter=50, sections=7, decreasing=True):
+    """k 等分法求单调函数 f(x) = target
+
+    每轮在区间内取 k 个等距内点一次批量计算（生成代码对所有点向量化求值），
+    区间缩小为原来的 1/(k+1)；k=1 即二分法。
+
+    Args:
+        f_many: 函数 points -> 与 points 等长的数值数组
+        sections: 每轮内点数 k
+        decreasing: f 是否随 x 增加而减小
+        其余参数同 brent
+
+    Returns:
+        RootResult: evaluations 为计算的点数
+    """
+    problem = _Problem(None, target, tolerance, accept)
+    k = max(1, int(sections))
+    for _ in range(maxiter):
+        if high - low < xtol:
+            break
+        points = np.linspace(low, high, k + 2)[1:-1]
+        values = np.asarray(f_many(points), dtype=float).reshape(-1)
+        problem.evaluations += len(points)
+        # 本轮满足容差的点中取最接近目标的
+        for i in np.argsort(np.abs(values - target)):
+            x, value = float(points[i]), float(values[i])
+            problem.record(x, value)
+            if problem.done(x, value):
+                return problem.result(x, value, True)
+
+        # 解左侧的点：递减时 f > target，递增时 f < target
+        left = values > target if decreasing else values < target
+        j = int(np.argmin(left)) if not left.all() else k
+        if j > 0:
+            low = points[j - 1]
+        if j < k:
+            high = points[j]
+
+    if problem.best is None:
+        x = (low + high) / 2
+        value = float(np.asarray(f_many([x]), dtype=float).reshape(-1)[0])
+        problem.evaluations += 1
+        problem.record(x, value)
+    return problem.best_result()
+
+
+def piecewise_linear(f_many, low, high, knots, target=0.0, tolerance=0.0, accept=None,
+                     xtol=1e-12, f_low=None, f_high=None):
+    """分段线性单调函数求 f(x) = target（拐点位置已知）
+
+    端点与区间内的拐点一次批量计算，找到包含目标的线段后直接线性求解，
+    再计算一次验证；验证不满足时（实际函数在线段内并非线性）在该线段上退回 Brent 法。
+
+    Args:
+        f_many: 函数 points -> 与 points 等长的数值数组
+        knots: 拐点位置，区间外的拐点被忽略
+        其余参数同 brent
+
+    Returns:
+        RootResult
+    """
+    problem = _Problem(None, target, tolerance, accept)
+    points = sorted({low, high, *(k for k in knots if low < k < high)})
+    values = {x: v for x, v in ((low, f_low), (high, f_high)) if v is not None}
+    missing = [x for x in points if x not in values]
+    if missing:
+        computed = np.asarray(f_many(missing), dtype=float).reshape(-1)
+        problem.evaluations += len(missing)
+        values.update(zip(missing, computed.tolist()))
+
+    for x in points:
+        problem.record(x, values[x])
+        if problem.done(x, values[x]):
+            return problem.result(x, values[x], True)
+
+    # 包含目标的线段
+    for x0, x1 in zip(points, points[1:]):
+        g0, g1 = values[x0] - target, values[x1] - target
+        if g0 * g1 < 0:
+            break
+    else:
+        return problem.best_result()
+
+    x = x0 - g0 * (x1 - x0) / (g1 - g0)
+    value = float(np.asarray(f_many([x]), dtype=float).reshape(-1)[0])
+    problem.evaluations += 1
+    problem.record(x, value)
+    if problem.done(x, value):
+        return problem.result(x, value, True)
+
+    root = brent(
+        lambda x: float(np.asarray(f_many([x]), dtype=float).reshape(-1)[0]),
+        x0, x1, target, tolerance, accept, xtol, f_low=values[x0], f_high=values[x1],
+    )
+    if not root.converged:
+        problem.record(root.x, root.value)
+        problem.evaluations += root.evaluations
+        return problem.best_result()
+    return RootResult(root.x, root.value, True, problem.evaluations + root.evaluations)
+
+
+def broyden(f_many, x0, low, high, targets, tolerances, steps, xtol=1e-12, maxiter=20, jacobian=None):
+    """有界 Broyden 法联立求 F(x) = targets
+
+    初始点与各分量偏移 steps 的点一次批量计算，以有限差分得到初始 Jacobian（已给定时只计算初始点）；
+    之后每步计算一次，Newton 步截断到 [low, high] 内，并以 Broyden 秩一更新修正 Jacobian。
+    变量按区间宽度归一化后求解，避免量级相差悬殊（如 E18 与 G25）时更新失衡。
+
+    Args:
+        f_many: 函数 points -> 形状为 (点数, 维数) 的数值数组
+        x0: 初始点（超出区间时先截断）
+        low, high: 各变量的区间
+        targets: 各分量目标值
+        tolerances: 各分量 |F(x) - target| < tolerance 时视为收敛
+        steps: 有限差分步长（超出上界时反向偏移）
+        xtol: 归一化步长小于该值时停止
+        maxiter: 最大 Broyden 步数
+        jacobian: 初始 Jacobian（原始坐标，如由响应面求得），给定时不做有限差分，steps 可为 None
+
+    Returns:
+        RootResult: x、value 为数组；未收敛时返回按容差归一化残差最小的点
+    """
+    low, high = np.asarray(low, dtype=float), np.asarray(high, dtype=float)
+    targets, tolerances = np.asarray(targets, dtype=float), np.asarray(tolerances, dtype=float)
+    scale = high - low
+    x = np.clip(np.asarray(x0, dtype=float), low, high)
+    n = len(x)
+
+    def error(value):
+        return float(np.max(np.abs(value - targets) / tolerances))
+
+    best = None
+    evaluations = 0
+
+    def evaluate(points):
+        nonlocal best, evaluations
+        values = np.asarray(f_many(points), dtype=float).reshape(len(points), n)
+        evaluations += len(points)
+        for point, value in zip(points, values):
+            if best is None or error(value) < best[0]:
+                best = (error(value), point, value)
+        return values
+
+    def result():
+        _, point, value = best
+        return RootResult(point, value, best[0] < 1, evaluations)
+
+    if jacobian is not None:
+        (value,) = evaluate([x])
+        if best[0] < 1:
+            return result()
+        residual = value - targets
+        jacobian = np.asarray(jacobian, dtype=float) * scale
+    else:
+        # 有限差分初始 Jacobian（归一化坐标）
+        probes = [x]
+        for i in range(n):
+            probe = x.copy()
+            probe[i] += steps[i] if x[i] + steps[i] <= high[i] else -steps[i]
+            probes.append(probe)
+        values = evaluate(probes)
+        if best[0] < 1:
+            return result()
+        residual = values[0] - targets
+        jacobian = np.column_stack([
+            (values[i + 1] - values[0]) / ((probes[i + 1][i] - x[i]) / scale[i]) for i in range(n)
+        ])
+
+    for _ in range(maxiter):
+        try:
+            step = -np.linalg.solve(jacobian, residual)
+        except np.linalg.LinAlgError:
+            break
+        x_new = np.clip(x + step * scale, low, high)
+        dx = (x_new - x) / scale
+        if np.max(np.abs(dx)) < xtol:
+            break
+        (value,) = evaluate([x_new])
+        if best[0] < 1:
+            return result()
+        new_residual = value - targets
+        jacobian += np.outer(new_residual - residual - jacobian @ dx, dx) / (dx @ dx)
+        x, residual = x_new, new_residual
+    return result()
+
+
+def expand_bracket(f_many, center, low, high, width, target=0.0, tolerance=0.0, accept=None,
+                   growth=4.0, f_center=None, slope=None):
+    """从 center 开始查找包含 target 的区间（热启动、逐行延拓）
+
+    先计算 [center, center + width] 两端；未包含目标时只向目标所在一侧扩展，新端点取两端割线外推的解，
+    但每次扩展不超过按 growth 倍几何扩大的宽度（每次计算一个新端点）。响应近似线性且解在 center 附近时，
+    通常第一次外推即满足收敛条件。
+
+    Args:
+        f_many: 函数 points -> 与 points 等长的数值数组
+        center: 预计解的位置（如上一次的结果）
+        low, high: 搜索范围
+        width: 初始宽度
+        target, tolerance, accept: 同 brent，端点满足时直接返回该点
+        growth: 每次扩大的倍数
+        f_center: 已知的 center 处函数值（不再重复计算）
+        slope: 已知的近似斜率（如相邻问题的结果），与 f_center 同时给出时第二个端点取 Newton 步
+
+    Returns:
+        (a, b, f_a, f_b, bracketed, evaluations)：端点满足收敛条件时 a == b
+    """
+    problem = _Problem(None, target, tolerance, accept)
+
+    def f(points):
+        values = [float(v) for v in np.asarray(f_many(points), dtype=float).reshape(-1)]
+        problem.evaluations += len(points)
+        return values
+
+    def finish(a, b, fa, fb, bracketed):
+        for x, value in ((a, fa), (b, fb)):
+            if problem.done(x, value):
+                return x, x, value, value, True, problem.evaluations
+        return a, b, fa, fb, bracketed, problem.evaluations
+
+    center = min(max(center, low), high)
+    if f_center is None:
+        f_center, = f([center])
+    if problem.done(center, f_center):
+        return finish(center, center, f_center, f_center, True)
+
+    if slope:
+        other = min(max(center - (f_center - target) / slope, low), high)
+    else:
+        other = min(high, center + width) if center < high else max(low, center - width)
+    (f_other,) = f([other])
+    (a, fa), (b, fb) = sorted([(center, f_center), (other, f_other)])
+
+    while (fa - target) * (fb - target) > 0:
+        if problem.done(a, fa) or problem.done(b, fb):
+            break
+        width *= growth
+        # 同侧时离目标更近的一端所在方向即目标方向；割线外推，不超过几何扩大的宽度
+        secant = b - (fb - target) * (b - a) / (fb - fa) if fb != fa else None
+        if abs(fb - target) < abs(fa - target):
+            if b >= high:
+                break
+            limit = min(high, b + width)
+            x = limit if secant is None or not b < secant < limit else secant
+            a, fa, b = b, fb, x
+            (fb,) = f([b])
+        else:
+            if a <= low:
+                break
+            limit = max(low, a - width)
+            x = limit if secant is None or not limit < secant < a else secant
+            b, fb, a = a, fa, x
+            (fa,) = f([a])
+    return finish(a, b, fa, fb, (fa - target) * (fb - target) <= 0)
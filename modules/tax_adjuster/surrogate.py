@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应面代理模型
+以少量批量计算的设计点拟合二元二次响应面，在响应面上求解候选方案，
+候选方案再用实际模型验证
+"""
+
+import numpy as np
+
+
+def grid_design(low, high, levels=3):
+    """覆盖整个范围的 levels×levels 网格设计点
+
+    Args:
+        low, high: 两个输入的范围 (x_low, y_low)、(x_high, y_high)
+
+    Returns:
+        numpy.ndarray: 形状为 (levels², 2) 的设计点
+    """
+    xs = np.linspace(low[0], high[0], levels)
+    ys = np.linspace(low[1], high[1], levels)
+    return np.array([(x, y) for x in xs for y in ys])
+
+
+class QuadraticSurface:
+    """二元二次响应面 z = c0 + c1·x + c2·y + c3·x² + c4·x·y + c5·y²（x、y 按范围归一化到 [-1, 1]）"""
+
+    def __init__(self, low, high):
+        """
+        Args:
+            low, high: 两个输入的范围 (x_low, y_low)、(x_high, y_high)
+        """
+        self._center = (np.asarray(high, dtype=float) + np.asarray(low, dtype=float)) / 2
+        self._half = (np.asarray(high, dtype=float) - np.asarray(low, dtype=float)) / 2
+        self.coef = np.zeros(6)
+        self.residual = 0.0  # 设计点上的最大拟合残差
+
+    def _normalize(self, points):
+        u = (np.asarray(points, dtype=float).reshape(-1, 2) - self._center) / self._half
+        return u[:, 0], u[:, 1]
+
+    def _basis(self, points):
+        x, y = self._normalize(points)
+        return np.column_stack([np.ones_like(x), x, y, x * x, x * y, y * y])
+
+    def fit(self, points, values):
+        """最小二乘拟合，返回自身"""
+        basis = self._basis(points)
+        values = np.asarray(values, dtype=float)
+        self.coef = np.linalg.lstsq(basis, values, rcond=None)[0]
+        self.residual = float(np.max(np.abs(basis @ self.coef - values)))
+        return self
+
+    def __call__(self, points):
+        """响应面在 points 处的预测值数组"""
+        return self._basis(points) @ self.coef
+
+    def gradient(self, point):
+        """响应面在 point 处对两个输入的偏导数 (∂z/∂x, ∂z/∂y)"""
+        (u,), (v,) = self._normalize([point])
+        c = self.coef
+        return np.array([
+            c[1] + 2 * c[3] * u + c[4] * v,
+            c[2] + c[4] * u + 2 * c[5] * v,
+        ]) / self._half
+
+    def solve_y(self, x, target):
+        """固定 x 求 z(x, y) = target 的 y，取范围内的根，无根时取线性近似解并截断到范围内"""
+        (u,), _ = self._normalize([(x, self._center[1])])
+        c = self.coef
+        a = c[5]
+        b = c[2] + c[4] * u
+        constant = c[0] + c[1] * u + c[3] * u * u - target
+        if abs(a) > 1e-12 * max(abs(b), 1e-300):
+            discriminant = b * b - 4 * a * constant
+            if discriminant >= 0:
+                roots = [(-b + sign * np.sqrt(discriminant)) / (2 * a) for sign in (1, -1)]
+                inside = [v for v in roots if -1 <= v <= 1]
+                if inside:
+                    return float(self._center[1] + inside[0] * self._half[1])
+        v = -constant / b if b else 0.0
+        return float(self._center[1] + min(max(v, -1.0), 1.0) * self._half[1])
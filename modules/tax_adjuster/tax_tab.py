@@ -135,10 +135,16 @@ class MarginParamsDialog(wx.Dialog):
 class TaxAdjustTab(wx.Panel):
     """调整测算表 Tab"""
 
+    # 直接使用默认参数扫描（交互）时的时间预算（秒），到时保留已计算的行；
+    # 参数设置对话框中的扫描不限时
+    INTERACTIVE_TIME_BUDGET = 20
+
     def __init__(self, parent):
         super().__init__(parent)
 
+        # 当前文件的调整器会话：同一文件的多次计算复用已编译的模型与计算缓存，选择其他文件时释放
         self.adjuster = None
+        self._running_adjuster = None  # 正在后台计算的会话（计算中换了文件时，结束后再释放）
 
         # 文件路径（完整路径）
         self.excel_file_path = ""
@@ -289,8 +295,7 @@ class TaxAdjustTab(wx.Panel):
 
     def on_drop(self, file_path):
         """处理拖放文件"""
-        self.excel_file_path = file_path
-        self.file_entry.SetValue(os.path.basename(file_path))
+        self._select_file(file_path)
 
     def browse_file(self, event=None):
         """选择文件"""
@@ -301,9 +306,14 @@ class TaxAdjustTab(wx.Panel):
             style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST
         ) as dialog:
             if dialog.ShowModal() == wx.ID_OK:
-                file_path = dialog.GetPath()
-                self.excel_file_path = file_path
-                self.file_entry.SetValue(os.path.basename(file_path))
+                self._select_file(dialog.GetPath())
+
+    def _select_file(self, file_path):
+        """设置当前文件，换了文件时释放原文件的调整器会话"""
+        if self.adjuster is not None and self.adjuster.file_path != os.path.abspath(file_path):
+            self._release_adjuster()
+        self.excel_file_path = file_path
+        self.file_entry.SetValue(os.path.basename(file_path))
 
     def _ensure_file_selected(self):
         """确保已选择文件"""
@@ -313,14 +323,37 @@ class TaxAdjustTab(wx.Panel):
         return True
 
     def _load_adjuster(self):
-        """加载调整器"""
+        """加载调整器（同一文件复用已有会话，文件内容变化时会话自动重新加载模型）"""
+        if self.adjuster is not None and self.adjuster.file_path == os.path.abspath(self.excel_file_path):
+            return True
+        self._release_adjuster()
         try:
-            self.adjuster = TaxAdjuster(self.excel_file_path, progress_callback=self._on_progress)
+            self.adjuster = TaxAdjuster(
+                self.excel_file_path, progress_callback=self._on_progress, keep_loaded=True,
+            )
             return True
         except Exception as e:
             wx.MessageBox(f"加载文件失败: {e}", "错误", wx.OK | wx.ICON_ERROR)
             return False
 
+    def _release_adjuster(self):
+        """释放当前调整器会话（正在计算时待计算结束后释放）"""
+        if self.adjuster is not None and self.adjuster is not self._running_adjuster:
+            self.adjuster.close()
+        self.adjuster = None
+
+    def _start_calculation(self, calculate):
+        """在后台线程中用当前会话计算，calculate(adjuster) 由线程调用"""
+        adjuster = self._running_adjuster = self.adjuster
+        thread = threading.Thread(target=calculate, args=(adjuster,), daemon=True)
+        thread.start()
+
+    def _finish_calculation(self):
+        """计算结束（在主线程中）：计算期间换了文件时释放原会话"""
+        finished, self._running_adjuster = self._running_adjuster, None
+        if finished is not None and finished is not self.adjuster:
+            finished.close()
+
     def _on_progress(self, progress, message):
         """进度回调（从工作线程调用）"""
         wx.CallAfter(self._update_progress, progress, message)
@@ -377,18 +410,18 @@ class TaxAdjustTab(wx.Panel):
         self._show_progress()
         self._set_buttons_enabled(False)
 
-        def do_calculate():
+        def do_calculate(adjuster):
             try:
-                result = self.adjuster.calculate_combined_adjustment()
+                result = adjuster.calculate_combined_adjustment()
                 wx.CallAfter(self._on_combined_complete, result, None)
             except Exception as e:
                 wx.CallAfter(self._on_combined_complete, None, e)
 
-        thread = threading.Thread(target=do_calculate, daemon=True)
-        thread.start()
+        self._start_calculation(do_calculate)
 
     def _on_combined_complete(self, result, error):
         """处理计算完成（在主线程中）"""
+        self._finish_calculation()
         self._hide_progress()
         self._set_buttons_enabled(True)
 
@@ -403,6 +436,7 @@ class TaxAdjustTab(wx.Panel):
         Args:
             event: 按钮事件
             show_dialog: 是否显示参数设置对话框，默认 False 直接使用默认参数
+                         （默认参数的扫描限时 INTERACTIVE_TIME_BUDGET 秒）
         """
         if not self._ensure_file_selected():
             return
@@ -423,6 +457,7 @@ class TaxAdjustTab(wx.Panel):
                 'b11_step': 20000,
                 'h11_target_range': (TaxAdjuster.H11_MIN, TaxAdjuster.H11_MAX),
                 'margin_range': (TaxAdjuster.MARGIN_MIN, TaxAdjuster.MARGIN_MAX),
+                'time_budget': self.INTERACTIVE_TIME_BUDGET,
             }
 
         if not self._load_adjuster():
@@ -441,23 +476,23 @@ class TaxAdjustTab(wx.Panel):
             """每计算完一行，实时更新到界面"""
             wx.CallAfter(self._append_inventory_margin_row, row_data)
 
-        def do_calculate():
+        def do_calculate(adjuster):
             try:
-                result = self.adjuster.scan_b11_margin_table(
+                result = adjuster.scan_b11_margin_table(
                     b11_start=params['b11_start'],
                     b11_end=params['b11_end'],
                     b11_step=params['b11_step'],
                     h11_target_range=params['h11_target_range'],
                     margin_range=params['margin_range'],
                     row_callback=on_row,
-                    stop_check=self._check_stop
+                    stop_check=self._check_stop,
+                    time_budget=params.get('time_budget'),
                 )
                 wx.CallAfter(self._on_inventory_margin_complete, result, None)
             except Exception as e:
                 wx.CallAfter(self._on_inventory_margin_complete, None, e)
 
-        thread = threading.Thread(target=do_calculate, daemon=True)
-        thread.start()
+        self._start_calculation(do_calculate)
 
     def _init_inventory_margin_grid(self):
         """初始化库存毛利率结果 Grid（边查询边输出）"""
@@ -512,9 +547,13 @@ class TaxAdjustTab(wx.Panel):
         # F20
         self._set_cell(self.verify_grid, row, 3, f"{f20:,.0f}", align_right=True)
 
-        # 状态
-        status = "✓" if converged else "×"
-        status_color = wx.Colour(0, 128, 0) if converged else wx.Colour(200, 0, 0)
+        # 状态（限时扫描到时的行标记为"限时"）
+        if converged:
+            status, status_color = "✓", wx.Colour(0, 128, 0)
+        elif row_data.get('timed_out'):
+            status, status_color = "限时", wx.Colour(200, 150, 0)
+        else:
+            status, status_color = "×", wx.Colour(200, 0, 0)
         self._set_cell(self.verify_grid, row, 4, status, color=status_color)
 
         # 更新统计
@@ -525,6 +564,7 @@ class TaxAdjustTab(wx.Panel):
 
     def _on_inventory_margin_complete(self, result, error):
         """处理计算完成（在主线程中）"""
+        self._finish_calculation()
         self._hide_progress()
         self._set_buttons_enabled(True)
 
@@ -552,13 +592,18 @@ class TaxAdjustTab(wx.Panel):
 
         # 显示状态卡片
         self.status_box.Show()
-        self._clear_grid(self.status_grid)
+        timed_out = stats.get('timed_out', False)
+        self._reset_status_grid(rows=2 if timed_out else 1)
         h11_range = stats.get('h11_range', (-10, 10))
         self._set_cell(self.status_grid, 0, 0, "H11范围:", bold=True)
         self._set_cell(self.status_grid, 0, 1, f"{h11_range[0]} ~ {h11_range[1]}")
         margin_range = stats.get('margin_range', (0.70, 0.90))
         self._set_cell(self.status_grid, 0, 2, "毛利率范围:", bold=True)
         self._set_cell(self.status_grid, 0, 3, f"{margin_range[0]:.2f} ~ {margin_range[1]:.2f}")
+        if timed_out:
+            self._set_cell(self.status_grid, 1, 0, "提示:", bold=True)
+            self._set_cell(self.status_grid, 1, 1, "已达时间预算，未计算的行可在参数设置中不限时扫描",
+                           color=wx.Colour(200, 150, 0))
         self._auto_size_grid(self.status_grid)
 
         self.Layout()
@@ -567,6 +612,15 @@ class TaxAdjustTab(wx.Panel):
         """清空 Grid 内容"""
         grid.ClearGrid()
 
+    def _reset_status_grid(self, rows=1):
+        """清空状态卡片并调整为 rows 行（限时提示占用第二行，其他结果只有一行）"""
+        current_rows = self.status_grid.GetNumberRows()
+        if current_rows < rows:
+            self.status_grid.AppendRows(rows - current_rows)
+        elif current_rows > rows:
+            self.status_grid.DeleteRows(rows, current_rows - rows)
+        self._clear_grid(self.status_grid)
+
     def display_combined_result(self, result):
         """显示整合调整结果（年利润 + 月毛利）"""
         current = result['current']
@@ -624,7 +678,7 @@ class TaxAdjustTab(wx.Panel):
         self._auto_size_grid(self.verify_grid)
 
         # === 状态卡片 ===
-        self._clear_grid(self.status_grid)
+        self._reset_status_grid()
         self._set_cell(self.status_grid, 0, 0, "G22:", bold=True)
         self._set_cell(self.status_grid, 0, 1, "OK" if g22_ok else "FAIL",
                        color=wx.Colour(0, 128, 0) if g22_ok else wx.Colour(200, 0, 0))
@@ -736,7 +790,7 @@ class TaxAdjustTab(wx.Panel):
         self._auto_size_grid(self.verify_grid)
 
         # === 状态卡片 ===
-        self._clear_grid(self.status_grid)
+        self._reset_status_grid()
         self._set_cell(self.status_grid, 0, 0, "H11范围:", bold=True)
         self._set_cell(self.status_grid, 0, 1, f"{h11_min} ~ {h11_max}")
         margin_range = stats.get('margin_range', (0.70, 0.90))
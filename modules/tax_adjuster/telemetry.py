@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索计时统计
+记录一次计算调用中模型计算的次数与耗时分布、模型加载耗时及各阶段（进度消息）耗时，
+结果写入返回值的 stats，并可追加到 JSON Lines 日志便于汇总分析
+"""
+
+import functools
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+import numpy as np
+
+# 进度消息中的可变部分（如 "搜索中... (迭代 3)"、"正在计算 B11=20,000..."），阶段名不含这些内容
+_PHASE_SUFFIX = re.compile(r'\s*[=(（].*$')
+
+
+class SearchTelemetry:
+    """一次计算调用的计时统计"""
+
+    # 报告的单次计算耗时百分位
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, log_path=None):
+        """
+        Args:
+            log_path: JSON Lines 日志路径，为 None 时不写日志
+        """
+        self.log_path = log_path
+        self.reset()
+
+    def reset(self):
+        """开始新的一次调用"""
+        self._start = time.perf_counter()
+        self._latencies = []  # 每次后端计算的耗时（秒）
+        self._points = 0
+        self._load_time = 0.0
+        self._phases = {}  # 阶段名 -> 累计耗时（秒）
+        self._phase = None
+        self._phase_start = None
+
+    @staticmethod
+    def phase_name(message):
+        """进度消息 -> 阶段名（去掉省略号及迭代次数、取值等可变部分）"""
+        return _PHASE_SUFFIX.sub('', message).rstrip('.。… ') or message
+
+    def _close_phase(self, now):
+        if self._phase is not None:
+            self._phases[self._phase] = self._phases.get(self._phase, 0.0) + now - self._phase_start
+            self._phase_start = now
+
+    def phase(self, message):
+        """进入新阶段（由进度报告调用），同名阶段的耗时累计"""
+        now = time.perf_counter()
+        self._close_phase(now)
+        self._phase = self.phase_name(message)
+        self._phase_start = now
+
+    def record_evaluation(self, seconds, points=1):
+        """记录一次后端计算（批量计算计为一次，points 为其中的输入组数）"""
+        self._latencies.append(seconds)
+        self._points += points
+
+    def record_load(self, seconds):
+        """记录模型加载耗时"""
+        self._load_time += seconds
+
+    def summary(self):
+        """统计结果（耗时单位为秒）
+
+        Returns:
+            dict: evaluations（后端计算次数）、points（计算的输入组数）、evaluation_time、
+                  latency_p50 / p90 / p99（单次计算耗时，无计算时为 None）、load_time、
+                  phases（{阶段名: 耗时}）、total_time
+        """
+        now = time.perf_counter()
+        self._close_phase(now)
+        latencies = np.array(self._latencies)
+        percentiles = (
+            np.percentile(latencies, self.PERCENTILES).tolist() if len(latencies) else [None] * len(self.PERCENTILES)
+        )
+        return {
+            'evaluations': len(latencies),
+            'points': self._points,
+            'evaluation_time': float(latencies.sum()),
+            **{f'latency_p{p}': value for p, value in zip(self.PERCENTILES, percentiles)},
+            'load_time': self._load_time,
+            'phases': dict(self._phases),
+            'total_time': now - self._start,
+        }
+
+    def write(self, operation, file_path, stats):
+        """追加一行 JSON 日志（未配置日志或写入失败时忽略）"""
+        if not self.log_path:
+            return
+        record = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'operation': operation,
+            'file': os.path.basename(file_path),
+            'stats': stats,
+        }
+        try:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=_json_default) + '\n')
+        except OSError:
+            pass
+
+
+def _json_default(value):
+    """numpy 数值等非 JSON 类型的转换"""
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def instrumented(operation):
+    """方法装饰器：调用前重置计时统计，返回结果的 stats 中加入 telemetry 并写入日志
+
+    被装饰方法所属对象需有 _telemetry（SearchTelemetry）与 file_path 属性。
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            self._telemetry.reset()
+            result = method(self, *args, **kwargs)
+            if isinstance(result, dict):
+                stats = result.setdefault('stats', {})
+                stats['telemetry'] = self._telemetry.summary()
+                self._telemetry.write(operation, self.file_path, stats)
+            return result
+        return wrapper
+    return decorate
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公式转译
+把 formulas 编译子模型的依赖图转成一个纯 Python/NumPy 函数，
+输入单元格取值可以是数组，一次调用即可计算多组输入
+"""
+
+import formulas
+import numpy as np
+import schedula as sh
+from formulas.builder import AstBuilder
+from formulas.cell import CellWrapper, RangesAssembler
+
+from .incremental import IncrementalEvaluator
+
+# 二元运算符 -> Python 运算符
+_BINARY_OPERATORS = {
+    '+': '+',
+    '-': '-',
+    '*': '*',
+    '/': '/',
+    '^': '**',
+    '<': '<',
+    '<=': '<=',
+    '>': '>',
+    '>=': '>=',
+    '=': '==',
+    '<>': '!=',
+}
+
+# 生成模块的固定开头
+_PREAMBLE = '''# -*- coding: utf-8 -*-
+# 由 modules.tax_adjuster.transpile 自动生成，请勿手工修改
+import numpy as np
+
+
+def _round(x, digits):
+    """Excel ROUND：四舍五入（远离零）"""
+    scale = 10.0 ** digits
+    return np.sign(x) * np.floor(np.abs(x) * scale + 0.5) / scale
+
+'''
+
+
+class _RecordingBuilder(AstBuilder):
+    """记录 formulas 解析器输出的逆波兰（RPN）记号序列"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rpn = []
+
+    def append(self, token):
+        self.rpn.append(token)
+        super().append(token)
+
+
+class _RecordingParser(formulas.Parser):
+    ast_builder = _RecordingBuilder
+
+
+def generate_source(dsp, input_keys, output_keys, values):
+    """把编译子模型转成 Python 源代码
+
+    Args:
+        dsp: formulas 编译子模型的 schedula Dispatcher（DispatchPipe.dsp）
+        input_keys: 输入单元格键，对应生成函数的参数顺序
+        output_keys: 输出单元格键，对应生成函数的返回值顺序
+        values: 子模型中各数据节点的基准取值（区域中的常量单元格从这里读取）
+
+    Returns:
+        str: 模块源代码，其中 evaluate(*inputs) 返回输出单元格取值元组
+
+    Raises:
+        ValueError: 子模型包含不支持转译的公式或取值
+    """
+    return _SourceWriter(dsp, input_keys, output_keys, values).write()
+
+
+def load_kernel(source):
+    """执行生成的源代码，返回其中的 evaluate 函数"""
+    namespace = {}
+    exec(compile(source, '<transpiled formulas>', 'exec'), namespace)
+    return namespace['evaluate']
+
+
+class _SourceWriter:
+    """按拓扑顺序为每个公式单元格生成一行赋值语句"""
+
+    def __init__(self, dsp, input_keys, output_keys, values):
+        self.dsp = dsp
+        self.input_keys = list(input_keys)
+        self.output_keys = list(output_keys)
+        self.values = values
+        # 单元格键 -> 取值项：('expr', 代码) / ('empty',) / ('range', [取值项...])
+        self.terms = {}
+        self.lines = []
+
+    def write(self):
+        for i, key in enumerate(self.input_keys):
+            self.terms[key] = ('expr', f'x{i}')
+
+        functions = [k for k, v in self.dsp.nodes.items() if v['type'] == 'function']
+        for func_id in IncrementalEvaluator._topological_order(self.dsp, functions):
+            node = self.dsp.nodes[func_id]
+            function = node['function']
+            if isinstance(function, RangesAssembler):
+                self._write_range(node)
+            elif isinstance(function, CellWrapper):
+                self._write_formula(node)
+            else:
+                raise ValueError(f"不支持转译的节点: {func_id}")
+
+        outputs = []
+        for key in self.output_keys:
+            outputs.append(self._scalar(self._term(key), key))
+
+        params = ', '.join(f'x{i}' for i in range(len(self.input_keys)))
+        doc = ['    """计算输出单元格', '', '    输入:']
+        doc += [f'        x{i}: {key}' for i, key in enumerate(self.input_keys)]
+        doc += ['    输出:']
+        doc += [f'        {i}: {key}' for i, key in enumerate(self.output_keys)]
+        doc += ['    """']
+
+        body = [f'def evaluate({params}):'] + doc
+        body.append("    with np.errstate(all='ignore'):")
+        body += ['        ' + line for line in self.lines] or ['        pass']
+        body.append(f"        return ({', '.join(outputs)}{',' if len(outputs) == 1 else ''})")
+        return _PREAMBLE + '\n' + '\n'.join(body) + '\n'
+
+    def _term(self, key):
+        """返回单元格的取值项（计算过的公式或常量）"""
+        if key in self.terms:
+            return self.terms[key]
+        if key not in self.values:
+            raise ValueError(f"找不到单元格取值: {key}")
+        term = self._constant(self.values[key])
+        self.terms[key] = term
+        return term
+
+    def _constant(self, value):
+        """把 formulas 取值转成取值项"""
+        array = np.asarray(getattr(value, 'value', value), dtype=object)
+        if array.size == 1:
+            return self._constant_item(array.ravel()[0])
+        return ('range', [self._constant_item(v) for v in array.ravel()])
+
+    @staticmethod
+    def _constant_item(value):
+        if value is sh.EMPTY:
+            return ('empty',)
+        if isinstance(value, (bool, np.bool_)):
+            return ('expr', '1.0' if value else '0.0')
+        if isinstance(value, (int, float, np.integer, np.floating)):
+            return ('expr', repr(float(value)))
+        return ('other', value)
+
+    def _assign(self, key, expr):
+        """生成一行赋值语句并登记单元格变量"""
+        name = f'c{len(self.lines)}'
+        self.lines.append(f'{name} = {expr}  # {key}')
+        self.terms[key] = ('expr', name)
+
+    def _write_range(self, node):
+        """区域：基准取值中的常量 + 子模型中计算的单元格"""
+        function = node['function']
+        (output,) = node['outputs']
+        base = np.asarray(getattr(self.values[output], 'value', self.values[output]), dtype=object)
+        cols = [c for c, _ in function.indices]
+        rows = [r for _, r in function.indices]
+        col0, row0 = min(cols), min(rows)
+        if base.shape != (max(rows) - row0 + 1, max(cols) - col0 + 1):
+            raise ValueError(f"不支持转译的区域: {output}")
+
+        items = [[self._constant_item(v) for v in row] for row in base]
+        # RangesAssembler.outputs: 区域内由子模型计算的单元格 -> (列号, 行号)
+        for key, (col, row) in function.outputs.items():
+            items[row - row0][col - col0] = self._term(key)
+        self.terms[output] = ('range', [item for row in items for item in row])
+
+    def _write_formula(self, node):
+        """公式单元格：按 RPN 记号生成表达式"""
+        formula = node['function'].__name__
+        (output,) = node['outputs']
+        try:
+            _, builder = _RecordingParser().ast(formula)
+        except Exception as e:
+            raise ValueError(f"无法解析公式 {formula}: {e}") from e
+
+        stack = []
+        for token in builder.rpn:
+            kind = type(token).__name__
+            if kind == 'Range':
+                stack.append(self._term(self._range_key(token.name)))
+            elif kind == 'Number':
+                stack.append(self._number(token.name))
+            elif kind == 'OperatorToken':
+                args = [stack.pop() for _ in range(token.get_n_args)][::-1]
+                stack.append(self._operator(token.name, args, formula))
+            elif kind == 'Function':
+                args = [stack.pop() for _ in range(token.get_n_args)][::-1]
+                stack.append(self._function(token.name.upper(), args, formula))
+            else:
+                raise ValueError(f"不支持转译的公式 {formula}: {token}")
+
+        if len(stack) != 1:
+            raise ValueError(f"无法解析公式 {formula}")
+        self._assign(output, self._scalar(stack[0], formula))
+
+    def _range_key(self, name):
+        """公式中的引用 -> 子模型数据节点键"""
+        if name in self.terms or name in self.values:
+            return name
+        upper = name.upper()
+        for key in list(self.terms) + list(self.values):
+            if isinstance(key, str) and key.upper() == upper:
+                return key
+        raise ValueError(f"找不到单元格取值: {name}")
+
+    @staticmethod
+    def _number(name):
+        upper = name.upper()
+        if upper == 'TRUE':
+            return ('expr', '1.0')
+        if upper == 'FALSE':
+            return ('expr', '0.0')
+        return ('expr', repr(float(name)))
+
+    @staticmethod
+    def _scalar(term, formula):
+        """取值项 -> 标量表达式（空单元格按 0 参与运算）"""
+        if term[0] == 'expr':
+            return term[1]
+        if term[0] == 'empty':
+            return '0.0'
+        raise ValueError(f"不支持转译的取值 {formula}: {term}")
+
+    def _operator(self, name, args, formula):
+        if name == 'u-':
+            return ('expr', f'(-{self._scalar(args[0], formula)})')
+        if name == 'u+':
+            return ('expr', self._scalar(args[0], formula))
+        if name == '%':
+            return ('expr', f'({self._scalar(args[0], formula)} / 100.0)')
+        if name in _BINARY_OPERATORS:
+            left, right = (self._scalar(a, formula) for a in args)
+            return ('expr', f'({left} {_BINARY_OPERATORS[name]} {right})')
+        raise ValueError(f"不支持转译的运算符 {formula}: {name}")
+
+    def _function(self, name, args, formula):
+        if name == 'IF' and len(args) == 3:
+            cond, then, other = (self._scalar(a, formula) for a in args)
+            return ('expr', f'np.where({cond} != 0, {then}, {other})')
+        if name == 'ABS' and len(args) == 1:
+            return ('expr', f'np.abs({self._scalar(args[0], formula)})')
+        if name == 'ROUND' and len(args) == 2:
+            value, digits = (self._scalar(a, formula) for a in args)
+            return ('expr', f'_round({value}, {digits})')
+        if name in ('SUM', 'MAX', 'MIN'):
+            items = self._aggregate_items(args, formula)
+            if name == 'SUM':
+                return ('expr', f"({' + '.join(items) or '0.0'})")
+            if not items:
+                return ('expr', '0.0')
+            reduce = 'np.maximum' if name == 'MAX' else 'np.minimum'
+            expr = items[0]
+            for item in items[1:]:
+                expr = f'{reduce}({expr}, {item})'
+            return ('expr', expr)
+        raise ValueError(f"不支持转译的函数 {formula}: {name}")
+
+    @staticmethod
+    def _aggregate_items(args, formula):
+        """SUM/MAX/MIN 的参数展开：区域中的空单元格与文本被忽略"""
+        items = []
+        for arg in args:
+            for item in (arg[1] if arg[0] == 'range' else [arg]):
+                if item[0] == 'expr':
+                    items.append(item[1])
+                elif item[0] == 'other' and isinstance(item[1], str) and arg[0] == 'range':
+                    continue
+                elif item[0] != 'empty':
+                    raise ValueError(f"不支持转译的取值 {formula}: {item}")
+        return items
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索热启动记录
+按公司（工作簿系列）保存上一次的求解结果，下次搜索从该点附近的小区间开始
+"""
+
+import json
+import os
+import re
+import time
+
+# 工作簿名中的期间（如 洪运来2511-back 中的 2511）及其后的后缀
+_PERIOD_PATTERN = re.compile(r'\d{4}.*$')
+
+
+class WarmStartStore:
+    """上一次求解结果的本地记录（单个 JSON 文件，按工作簿系列索引）"""
+
+    # 记录文件名
+    FILENAME = 'warm_start.json'
+
+    def __init__(self, store_dir=None):
+        """初始化记录
+
+        Args:
+            store_dir: 记录目录，默认 ~/.accounting_assistant
+        """
+        if store_dir is None:
+            store_dir = os.path.join(os.path.expanduser('~'), '.accounting_assistant')
+        self.store_dir = store_dir
+        self.path = os.path.join(store_dir, self.FILENAME)
+
+    @staticmethod
+    def lineage(file_path):
+        """工作簿系列：去掉期间与后缀的文件名（洪运来2511.xlsx、洪运来2512-原.xlsx -> 洪运来）"""
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        return _PERIOD_PATTERN.sub('', stem).strip(' -_') or stem
+
+    def _read(self):
+        """读取全部记录，文件不存在或损坏时返回空字典"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def load(self, lineage):
+        """读取工作簿系列的上一次结果，未记录时返回 None"""
+        entry = self._read().get(lineage)
+        return entry if isinstance(entry, dict) else None
+
+    def save(self, lineage, file_path, **solution):
+        """合并保存工作簿系列的求解结果
+
+        Args:
+            lineage: 工作簿系列
+            file_path: 求得结果的工作簿
+            solution: 求解结果，如 E18、G25、margin 及 outputs（输出单元格取值）
+        """
+        entries = self._read()
+        entry = entries.get(lineage)
+        if not isinstance(entry, dict):
+            entry = {}
+        outputs = {**entry.get('outputs', {}), **solution.pop('outputs', {})}
+        entry.update(solution, outputs=outputs, file=os.path.basename(file_path), saved_at=time.time())
+        entries[lineage] = entry
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        finally:
+            try:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def clear(self, lineage=None):
+        """删除工作簿系列的记录（lineage 为 None 时删除全部）"""
+        if lineage is None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            return
+        entries = self._read()
+        if entries.pop(lineage, None) is not None:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, indent=1)
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+xlsx 单元格定点读写
+写入时只改写包含目标单元格的工作表 XML 及 workbook.xml（设置打开时完全重算），
+其余部件按原压缩数据原样复制，不解压、不重新序列化样式与其他工作表；
+读取时只流式解析涉及的工作表，取 Excel 保存的计算结果
+"""
+
+import os
+import posixpath
+import re
+import shutil
+import struct
+import tempfile
+import zipfile
+import zlib
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+_WORKBOOK_PART = 'xl/workbook.xml'
+_WORKBOOK_RELS = 'xl/_rels/workbook.xml.rels'
+_CONTENT_TYPES = '[Content_Types].xml'
+_CALC_CHAIN = 'xl/calcChain.xml'
+_SHARED_STRINGS = 'xl/sharedStrings.xml'
+
+# zip 记录结构（与 zipfile 模块一致）
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+_CENTRAL_HEADER = struct.Struct('<4s4B4H3L5H2L')
+_END_RECORD = struct.Struct('<4s4H2LH')
+_LOCAL_SIGNATURE = b'PK\x03\x04'
+_CENTRAL_SIGNATURE = b'PK\x01\x02'
+_END_SIGNATURE = b'PK\x05\x06'
+_DESCRIPTOR_SIGNATURE = b'PK\x07\x08'
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_ZIP_LIMIT = 0xFFFFFFFF
+
+# calcPr 之后可能出现的 workbook 子元素（缺少 calcPr 时插入到这些元素之前）
+_AFTER_CALC_PR = (
+    'oleSize', 'customWorkbookViews', 'pivotCaches', 'smartTagPr', 'smartTagTypes',
+    'webPublishing', 'fileRecoveryPr', 'webPublishObjects', 'extLst',
+)
+
+_CELL_REF = re.compile(r'^\$?([A-Z]{1,3})\$?(\d+)$')
+
+
+def _split_ref(cell):
+    """'$J$14' -> ('J', 14)"""
+    match = _CELL_REF.match(cell.strip().upper())
+    if not match:
+        raise ValueError(f"无效的单元格地址: {cell}")
+    return match.group(1), int(match.group(2))
+
+
+def _column_index(letters):
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index
+
+
+def _ref_key(ref):
+    """单元格地址的排序键 (行, 列)"""
+    letters, row = _split_ref(ref)
+    return row, _column_index(letters)
+
+
+def _format_number(value):
+    value = float(value)
+    if value != value or value in (float('inf'), float('-inf')):
+        raise ValueError(f"无法写入非有限数值: {value}")
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def _cell_xml(prefix, attrs, value):
+    """生成单元格元素（保留原有的地址、样式等属性，去掉类型与元数据属性）"""
+    attrs = re.sub(r'\s(?:t|cm|vm)="[^"]*"', '', attrs)
+    if value is None:
+        return f'<{prefix}c{attrs}/>'
+    if isinstance(value, bool):
+        return f'<{prefix}c{attrs} t="b"><{prefix}v>{int(value)}</{prefix}v></{prefix}c>'
+    if isinstance(value, str):
+        space = ' xml:space="preserve"' if value != value.strip() else ''
+        return (
+            f'<{prefix}c{attrs} t="inlineStr"><{prefix}is><{prefix}t{space}>{escape(value)}'
+            f'</{prefix}t></{prefix}is></{prefix}c>'
+        )
+    return f'<{prefix}c{attrs}><{prefix}v>{_format_number(value)}</{prefix}v></{prefix}c>'
+
+
+def _patch_sheet(xml, cells):
+    """改写工作表 XML 中的单元格
+
+    Args:
+        xml: 工作表 XML 文本
+        cells: {单元格地址: 值}
+
+    Returns:
+        (新的 XML 文本, 是否覆盖了公式单元格)
+    """
+    root = re.search(r'<(\w+:)?worksheet\b', xml)
+    p = (root.group(1) or '') if root else ''
+    replaced_formula = False
+    for ref, value in sorted(cells.items(), key=lambda item: _ref_key(item[0])):
+        letters, row = _split_ref(ref)
+        ref = f'{letters}{row}'
+        cell = re.search(
+            rf'<{p}c\b(?P<attrs>[^>]*?\br="{ref}"[^>]*?)(?:/>|>(?P<body>.*?)</{p}c>)', xml, re.S,
+        )
+        if cell:
+            body = cell.group('body') or ''
+            formula = re.search(rf'<{p}f\b([^>]*)', body)
+            if formula:
+                if re.search(r'\bref="', formula.group(1)):
+                    raise ValueError(f"{ref} 是共享公式或数组公式的主单元格，不能直接改写")
+                replaced_formula = True
+            xml = xml[:cell.start()] + _cell_xml(p, cell.group('attrs').rstrip(), value) + xml[cell.end():]
+            continue
+
+        new_cell = _cell_xml(p, f' r="{ref}"', value)
+        row_match = re.search(
+            rf'<{p}row\b(?P<attrs>[^>]*?\br="{row}"[^>]*?)(?P<close>/>|>(?P<body>.*?)</{p}row>)', xml, re.S,
+        )
+        if row_match:
+            if row_match.group('close') == '/>':
+                new_row = f'<{p}row{row_match.group("attrs").rstrip()}>{new_cell}</{p}row>'
+                xml = xml[:row_match.start()] + new_row + xml[row_match.end():]
+                continue
+            # 按列顺序插入到行内
+            position = row_match.end('body')
+            column = _column_index(letters)
+            for existing in re.finditer(rf'<{p}c\b[^>]*?\br="([A-Z]+)\d+"', row_match.group('body')):
+                if _column_index(existing.group(1)) > column:
+                    position = row_match.start('body') + existing.start()
+                    break
+            xml = xml[:position] + new_cell + xml[position:]
+            continue
+
+        # 按行顺序插入新行
+        new_row = f'<{p}row r="{row}">{new_cell}</{p}row>'
+        empty = re.search(rf'<{p}sheetData\s*/>', xml)
+        if empty:
+            xml = xml[:empty.start()] + f'<{p}sheetData>{new_row}</{p}sheetData>' + xml[empty.end():]
+            continue
+        position = xml.index(f'</{p}sheetData>')
+        for existing in re.finditer(rf'<{p}row\b[^>]*?\br="(\d+)"', xml):
+            if int(existing.group(1)) > row:
+                position = existing.start()
+                break
+        xml = xml[:position] + new_row + xml[position:]
+    return xml, replaced_formula
+
+
+def _set_full_calc_on_load(xml):
+    """在 workbook.xml 的 calcPr 上设置 fullCalcOnLoad="1"（Excel 打开时重算全部公式）"""
+    root = re.search(r'<(\w+:)?workbook\b', xml)
+    p = (root.group(1) or '') if root else ''
+    calc = re.search(rf'<{p}calcPr\b(?P<attrs>[^>]*?)(?P<close>/?>)', xml)
+    if calc:
+        attrs = calc.group('attrs')
+        if re.search(r'\sfullCalcOnLoad="', attrs):
+            attrs = re.sub(r'\sfullCalcOnLoad="[^"]*"', ' fullCalcOnLoad="1"', attrs)
+        else:
+            attrs = attrs.rstrip() + ' fullCalcOnLoad="1"'
+        return xml[:calc.start()] + f'<{p}calcPr{attrs}{calc.group("close")}' + xml[calc.end():]
+    position = xml.index(f'</{p}workbook>')
+    following = re.search(rf'<{p}(?:{"|".join(_AFTER_CALC_PR)})\b', xml)
+    if following:
+        position = following.start()
+    return xml[:position] + f'<{p}calcPr fullCalcOnLoad="1"/>' + xml[position:]
+
+
+def _drop_calc_chain(parts):
+    """从内容类型与工作簿关系中去掉 calcChain.xml（覆盖公式后由 Excel 重建计算链）"""
+    parts[_CONTENT_TYPES] = re.sub(
+        r'<(\w+:)?Override\b[^>]*?PartName="/xl/calcChain\.xml"[^>]*?/>', '', parts[_CONTENT_TYPES],
+    )
+    parts[_WORKBOOK_RELS] = re.sub(
+        r'<(\w+:)?Relationship\b[^>]*?Target="(?:/xl/)?calcChain\.xml"[^>]*?/>', '', parts[_WORKBOOK_RELS],
+    )
+
+
+def sheet_parts(archive):
+    """工作表名 -> 工作表 XML 部件名
+
+    Args:
+        archive: 已打开的 zipfile.ZipFile
+    """
+    workbook = ElementTree.fromstring(archive.read(_WORKBOOK_PART))
+    rels = ElementTree.fromstring(archive.read(_WORKBOOK_RELS))
+    targets = {rel.get('Id'): rel.get('Target') for rel in rels.iter(f'{{{_PKG_REL_NS}}}Relationship')}
+    parts = {}
+    for sheet in workbook.iter(f'{{{_MAIN_NS}}}sheet'):
+        target = targets.get(sheet.get(f'{{{_REL_NS}}}id'))
+        if target is None:
+            continue
+        if target.startswith('/'):
+            parts[sheet.get('name')] = target.lstrip('/')
+        else:
+            parts[sheet.get('name')] = posixpath.normpath(posixpath.join(posixpath.dirname(_WORKBOOK_PART), target))
+    return parts
+
+
+def _full_calc_on_load(archive):
+    """工作簿是否标记为打开时完全重算（此时公式单元格保存的计算结果可能已过期）"""
+    calc = ElementTree.fromstring(archive.read(_WORKBOOK_PART)).find(f'{{{_MAIN_NS}}}calcPr')
+    return calc is not None and calc.get('fullCalcOnLoad') in ('1', 'true')
+
+
+def _shared_strings(archive, indexes):
+    """流式读取共享字符串表中指定序号的字符串"""
+    strings = {}
+    if _SHARED_STRINGS not in archive.NameToInfo or not indexes:
+        return strings
+    last = max(indexes)
+    with archive.open(_SHARED_STRINGS) as f:
+        index = 0
+        for _, elem in ElementTree.iterparse(f):
+            if elem.tag != f'{{{_MAIN_NS}}}si':
+                continue
+            if index in indexes:
+                texts = elem.findall(f'{{{_MAIN_NS}}}t') + elem.findall(f'{{{_MAIN_NS}}}r/{{{_MAIN_NS}}}t')
+                strings[index] = ''.join(t.text or '' for t in texts)
+            elem.clear()
+            if index >= last:
+                break
+            index += 1
+    return strings
+
+
+def read_cached_values(source, cells):
+    """读取单元格中 Excel 保存的值，不加载、不计算整个工作簿
+
+    每个涉及的工作表只流式解析到最后一个目标单元格为止。
+    公式单元格没有保存计算结果，或工作簿标记为打开时重算（结果可能已过期）时，
+    该单元格不在返回结果中，由调用方改用模型计算。
+
+    Args:
+        source: xlsx 文件路径或文件对象
+        cells: [(工作表名, 单元格地址), ...]
+
+    Returns:
+        dict: {(工作表名, 单元格地址): 值}，空单元格为 None，
+              数值为 float，布尔为 bool，字符串与错误值为 str
+
+    Raises:
+        KeyError: 工作表不存在
+    """
+    ns = f'{{{_MAIN_NS}}}'
+    values = {}
+    shared = {}  # 共享字符串序号 -> [单元格, ...]
+    with zipfile.ZipFile(source) as archive:
+        parts = sheet_parts(archive)
+        stale = _full_calc_on_load(archive)
+        by_sheet = {}
+        for sheet, cell in cells:
+            letters, row = _split_ref(cell)
+            by_sheet.setdefault(sheet, {})[f'{letters}{row}'] = (sheet, cell)
+
+        for sheet, wanted in by_sheet.items():
+            remaining = dict(wanted)
+            with archive.open(parts[sheet]) as f:
+                for _, elem in ElementTree.iterparse(f):
+                    if elem.tag == f'{ns}c':
+                        key = remaining.pop(elem.get('r'), None)
+                        if key is not None:
+                            formula = elem.find(f'{ns}f') is not None
+                            value = elem.find(f'{ns}v')
+                            cell_type = elem.get('t', 'n')
+                            if cell_type == 'inlineStr':
+                                values[key] = ''.join(elem.find(f'{ns}is').itertext())
+                            elif formula and (value is None or stale):
+                                pass  # 没有可信的计算结果
+                            elif value is None:
+                                values[key] = None
+                            elif cell_type == 's':
+                                shared.setdefault(int(value.text), []).append(key)
+                            elif cell_type == 'b':
+                                values[key] = value.text == '1'
+                            elif cell_type in ('str', 'e', 'd'):
+                                values[key] = value.text or ''
+                            else:
+                                values[key] = float(value.text)
+                            if not remaining:
+                                break
+                    elif elem.tag == f'{ns}row':
+                        elem.clear()
+            for key in remaining.values():
+                values[key] = None  # 工作表中没有该单元格
+
+        strings = _shared_strings(archive, set(shared))
+    for index, keys in shared.items():
+        for key in keys:
+            values[key] = strings.get(index)
+    return values
+
+
+def _dos_datetime(date_time):
+    year, month, day, hour, minute, second = date_time
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+def _encoded_name(info):
+    return info.orig_filename.encode('utf-8' if info.flag_bits & _FLAG_UTF8 else 'cp437')
+
+
+def _copy_raw(source, out, info):
+    """原样复制一个部件的本地文件头与压缩数据（含数据描述符）"""
+    source.seek(info.header_offset)
+    header = source.read(_LOCAL_HEADER.size)
+    fields = _LOCAL_HEADER.unpack(header)
+    if fields[0] != _LOCAL_SIGNATURE:
+        raise ValueError(f"无效的 xlsx 文件：{info.filename} 文件头损坏")
+    length = fields[9] + fields[10] + info.compress_size
+    if info.flag_bits & _FLAG_DATA_DESCRIPTOR:
+        source.seek(info.header_offset + _LOCAL_HEADER.size + length)
+        length += 16 if source.read(4) == _DESCRIPTOR_SIGNATURE else 12
+    source.seek(info.header_offset + _LOCAL_HEADER.size)
+    out.write(header)
+    while length > 0:
+        chunk = source.read(min(length, 1024 * 1024))
+        if not chunk:
+            raise ValueError(f"无效的 xlsx 文件：{info.filename} 数据不完整")
+        out.write(chunk)
+        length -= len(chunk)
+
+
+def _write_deflated(out, info, data):
+    """写入改写后的部件（deflate 压缩，不使用数据描述符），返回中央目录需要的字段"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    crc = zlib.crc32(data)
+    name = _encoded_name(info)
+    flags = info.flag_bits & _FLAG_UTF8
+    dos_time, dos_date = _dos_datetime(info.date_time)
+    out.write(_LOCAL_HEADER.pack(
+        _LOCAL_SIGNATURE, 20, flags, zlib.DEFLATED, dos_time, dos_date,
+        crc, len(compressed), len(data), len(name), 0,
+    ))
+    out.write(name)
+    out.write(compressed)
+    return flags, zlib.DEFLATED, crc, len(compressed), len(data)
+
+
+def _write_archive(source_path, out, rewritten, dropped):
+    """写出新的 zip：rewritten 中的部件重新压缩写入，dropped 中的部件去掉，其余原样复制"""
+    central = []
+    with open(source_path, 'rb') as source, zipfile.ZipFile(source) as archive:
+        infos = archive.infolist()
+        if len(infos) >= 0xFFFF:
+            raise ValueError("不支持 ZIP64 格式的工作簿")
+        for info in infos:
+            if info.filename in dropped:
+                continue
+            if max(info.header_offset, info.compress_size, info.file_size) >= _ZIP_LIMIT:
+                raise ValueError("不支持 ZIP64 格式的工作簿")
+            offset = out.tell()
+            if info.filename in rewritten:
+                flags, method, crc, compress_size, file_size = _write_deflated(out, info, rewritten[info.filename])
+                extract_version, extra = 20, b''
+            else:
+                _copy_raw(source, out, info)
+                flags, method, crc = info.flag_bits, info.compress_type, info.CRC
+                compress_size, file_size = info.compress_size, info.file_size
+                extract_version, extra = info.extract_version, info.extra
+            central.append((info, offset, flags, method, crc, compress_size, file_size, extract_version, extra))
+        comment = archive.comment
+
+    start = out.tell()
+    for info, offset, flags, method, crc, compress_size, file_size, extract_version, extra in central:
+        name = _encoded_name(info)
+        dos_time, dos_date = _dos_datetime(info.date_time)
+        out.write(_CENTRAL_HEADER.pack(
+            _CENTRAL_SIGNATURE, info.create_version, info.create_system, extract_version, info.reserved,
+            flags, method, dos_time, dos_date, crc, compress_size, file_size,
+            len(name), len(extra), len(info.comment), 0, info.internal_attr, info.external_attr, offset,
+        ))
+        out.write(name)
+        out.write(extra)
+        out.write(info.comment)
+    end = out.tell()
+    if end >= _ZIP_LIMIT:
+        raise ValueError("不支持 ZIP64 格式的工作簿")
+    out.write(_END_RECORD.pack(
+        _END_SIGNATURE, 0, 0, len(central), len(central), end - start, start, len(comment),
+    ))
+    out.write(comment)
+
+
+def patch_cells(file_path, values, output_path=None):
+    """把单元格的值写入 xlsx 文件
+
+    只改写包含这些单元格的工作表 XML，并在 workbook.xml 中设置 fullCalcOnLoad，
+    Excel 打开时重算公式；其他部件的压缩数据原样复制。被覆盖的单元格保留样式，
+    原有公式会被替换为值（此时同时去掉 calcChain.xml，由 Excel 重建）。
+    先写入同目录下的临时文件再替换目标文件，写入失败时目标文件不变。
+
+    Args:
+        file_path: 源 xlsx 文件路径
+        values: {(工作表名, 单元格地址): 值}，值为数值、布尔、字符串或 None（清空）
+        output_path: 输出路径，默认覆盖源文件
+
+    Returns:
+        list: 改写的部件名
+    """
+    output_path = os.path.abspath(output_path or file_path)
+    by_sheet = {}
+    for (sheet, cell), value in values.items():
+        by_sheet.setdefault(sheet, {})[cell] = value
+
+    with zipfile.ZipFile(file_path) as archive:
+        parts = sheet_parts(archive)
+        missing = [sheet for sheet in by_sheet if sheet not in parts]
+        if missing:
+            raise ValueError(f"工作表不存在: {', '.join(missing)}")
+
+        texts = {_WORKBOOK_PART: archive.read(_WORKBOOK_PART).decode('utf-8')}
+        replaced_formula = False
+        for sheet, cells in by_sheet.items():
+            xml, replaced = _patch_sheet(archive.read(parts[sheet]).decode('utf-8'), cells)
+            texts[parts[sheet]] = xml
+            replaced_formula = replaced_formula or replaced
+        texts[_WORKBOOK_PART] = _set_full_calc_on_load(texts[_WORKBOOK_PART])
+
+        dropped = set()
+        if replaced_formula and _CALC_CHAIN in archive.NameToInfo:
+            texts[_CONTENT_TYPES] = archive.read(_CONTENT_TYPES).decode('utf-8')
+            texts[_WORKBOOK_RELS] = archive.read(_WORKBOOK_RELS).decode('utf-8')
+            _drop_calc_chain(texts)
+            dropped.add(_CALC_CHAIN)
+
+    rewritten = {name: text.encode('utf-8') for name, text in texts.items()}
+    fd, temp_path = tempfile.mkstemp(suffix='.xlsx', dir=os.path.dirname(output_path))
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            _write_archive(file_path, out, rewritten, dropped)
+        shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return sorted(rewritten)
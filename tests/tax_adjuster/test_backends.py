@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+计算后端与比对模式测试
+"""
+
+import os
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+
+class _LinearBackend:
+    """测试用后端：输出 = 输入之和 * scale + offset"""
+
+    name = 'linear'
+
+    def __init__(self, scale=1.0, offset=0.0):
+        self.scale = scale
+        self.offset = offset
+        self.loaded = None
+
+    def load(self, file_path, content=None):
+        self.loaded = file_path
+
+    def evaluate(self, inputs, outputs):
+        total = sum(inputs.values())
+        return [total * self.scale + self.offset for _ in outputs]
+
+    def close(self):
+        self.loaded = None
+
+
+class TestParityBackend:
+    """测试比对模式的偏差统计"""
+
+    def test_reports_max_divergence_per_output(self):
+        """验证按输出单元格记录最大绝对/相对偏差，并返回参考后端结果"""
+        from modules.tax_adjuster.backends import ParityBackend
+
+        parity = ParityBackend(_LinearBackend(), _LinearBackend(offset=0.5))
+        parity.load('book.xlsx')
+        outputs = [('测算表', 'G22'), ('测算表', 'E31')]
+
+        assert parity.evaluate({('测算表', 'E18'): 10.0}, outputs) == [10.0, 10.0]
+        parity.evaluate({('测算表', 'E18'): 1.0}, outputs)
+
+        report = parity.report()
+        assert set(report) == set(outputs)
+        stats = report[('测算表', 'G22')]
+        assert stats['count'] == 2
+        assert stats['max_abs'] == pytest.approx(0.5)
+        assert stats['max_rel'] == pytest.approx(0.5)
+
+    def test_identical_backends_have_no_divergence(self):
+        """验证结果相同时偏差为 0"""
+        from modules.tax_adjuster.backends import ParityBackend
+
+        parity = ParityBackend(_LinearBackend(), _LinearBackend())
+        parity.evaluate({('测算表', 'E18'): 3.0}, [('测算表', 'G22')])
+
+        assert parity.report()[('测算表', 'G22')]['max_abs'] == 0
+
+
+class TestWorkbookBackends:
+    """测试 formulas 参考后端与剪枝编译后端一致"""
+
+    def test_compiled_backend_matches_reference(self):
+        """验证在示例工作簿上比对模式报告的偏差为 0"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+        from modules.tax_adjuster.backends import CompiledBackend, FormulasBackend, ParityBackend
+
+        parity = ParityBackend(
+            FormulasBackend(use_model_cache=False),
+            CompiledBackend(TaxAdjuster.SEARCH_INPUTS, TaxAdjuster.SEARCH_OUTPUTS, use_model_cache=False),
+        )
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, backend=parity, use_warm_start=False)
+        adjuster._load_model()
+        try:
+            adjuster.evaluate_many(
+                [(0.72, 0), (0.80, 150_000)],
+                adjuster.MARGIN_SEARCH_INPUTS, adjuster.MARGIN_SEARCH_OUTPUTS,
+            )
+            g22 = parity.evaluate({('测算表', 'E18'): 250_000}, [('测算表', 'G22')])[0]
+        finally:
+            adjuster._unload_model()
+
+        assert isinstance(g22, float)
+        report = adjuster.parity_report()
+        for cell in adjuster.SEARCH_OUTPUTS:
+            if cell in report:
+                assert report[cell]['max_abs'] == pytest.approx(0, abs=1e-9), cell
+        assert report[(adjuster.MARGIN_SHEET, 'H11')]['count'] == 2
+        assert report[('测算表', 'G22')]['count'] == 1
+
+    def test_pruned_model_matches_full_model(self):
+        """验证只加载可达工作表的模型不含无关工作表的单元格，计算结果与完整模型一致"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+        from modules.tax_adjuster.backends import FormulasBackend
+
+        cells = TaxAdjuster.CURRENT_DATA_CELLS + TaxAdjuster.SEARCH_OUTPUTS
+        inputs = {('测算表', 'E18'): 150_000, ('产品成本', 'B11'): 20_000}
+        results = []
+        for sheets in (None, TaxAdjuster.MODEL_SHEETS):
+            backend = FormulasBackend(use_model_cache=False, sheets=sheets)
+            backend.load(SAMPLE_WORKBOOK)
+            loaded = {key.split(']')[1].split("'")[0] for key in backend.model.cells if ']' in key}
+            results.append(backend.evaluate(inputs, cells))
+            backend.close()
+
+        assert not loaded & {'工资', '付工资', '加工成本'}
+        assert results[1] == results[0]
+
+
+class TestReachableSheets:
+    """测试从根工作表出发的工作表依赖闭包"""
+
+    def test_sample_workbook_closure(self):
+        """验证示例工作簿中只被无关工作表使用的工作表不可达"""
+        from formulas.excel.xlreader import load_workbook
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+        from modules.tax_adjuster.backends import reachable_sheets
+
+        book = load_workbook(SAMPLE_WORKBOOK)
+
+        assert reachable_sheets(book, TaxAdjuster.MODEL_SHEETS) == {
+            '测算表', '生产成本月结表', '产品成本', '销售成本', '材料', '电费', '废料',
+        }
+        assert reachable_sheets(book, ['付工资']) == {'付工资'}
@@ -35,18 +35,13 @@ class TestFindOptimalMarginV2:
             adjuster._model = MagicMock()
 
             # Mock _calculate to return predictable values
-            def side_effect(inputs):
-                margin = inputs.get("'[test]生产成本月结表'!J14", 0.80)
-                b11 = inputs.get("'[test]产品成本'!B11", 0)
+            def side_effect(inputs=None, outputs=(), default=0):
+                margin = inputs.get(('生产成本月结表', 'J14'), 0.80)
+                b11 = inputs.get(('产品成本', 'B11'), 0)
                 h11, f20 = mock_calculate(margin, b11)
-                solution = MagicMock()
-                solution.__getitem__ = lambda self, key: MagicMock(value=[[h11]] if 'H11' in key else [[f20]])
-                return solution
+                return tuple(h11 if cell == 'H11' else f20 for _, cell in outputs)
 
             adjuster._calculate = MagicMock(side_effect=side_effect)
-            adjuster._cell_key = lambda sheet, cell: f"'[test]{sheet}'!{cell}"
-            adjuster._to_number = lambda v, d=0: v[0][0] if hasattr(v, '__getitem__') else v
-            adjuster._get_value = lambda sol, sheet, cell: sol[f"'[test]{sheet}'!{cell}"].value
             adjuster.MARGIN_SHEET = '生产成本月结表'
             adjuster.MARGIN_CELL = 'J14'
             adjuster._report_progress = lambda *args: None
@@ -93,6 +88,19 @@ class TestFindOptimalMarginV2:
         pass
 
 
+class TestParetoFront:
+    """测试备选方案的非支配筛选"""
+
+    def test_keeps_non_dominated_sorted(self):
+        """验证只保留非支配方案，并按第一个误差升序"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        points = [(3, 1), (1, 3), (2, 2), (2, 3), (4, 4), (1, 4), (3, 1)]
+        front = TaxAdjuster._pareto_front(points, lambda p: p)
+
+        assert front == [(1, 3), (2, 2), (3, 1)]
+
+
 class TestCalculateInventoryMarginAdjustment:
     """测试 calculate_inventory_margin_adjustment 参数传递"""
 
@@ -225,18 +233,13 @@ class TestFindOptimalMarginV4:
             adjuster.F20_MAX = 40000
             adjuster._model = MagicMock()
 
-            def side_effect(inputs):
-                margin = inputs.get("'[test]生产成本月结表'!J14", 0.80)
-                b11 = inputs.get("'[test]产品成本'!B11", 0)
+            def side_effect(inputs=None, outputs=(), default=0):
+                margin = inputs.get(('生产成本月结表', 'J14'), 0.80)
+                b11 = inputs.get(('产品成本', 'B11'), 0)
                 h11, f20 = mock_calculate(margin, b11)
-                solution = MagicMock()
-                solution.__getitem__ = lambda self, key: MagicMock(value=[[h11]] if 'H11' in key else [[f20]])
-                return solution
+                return tuple(h11 if cell == 'H11' else f20 for _, cell in outputs)
 
             adjuster._calculate = MagicMock(side_effect=side_effect)
-            adjuster._cell_key = lambda sheet, cell: f"'[test]{sheet}'!{cell}"
-            adjuster._to_number = lambda v, d=0: v[0][0] if hasattr(v, '__getitem__') else v
-            adjuster._get_value = lambda sol, sheet, cell: sol[f"'[test]{sheet}'!{cell}"].value
             adjuster.MARGIN_SHEET = '生产成本月结表'
             adjuster.MARGIN_CELL = 'J14'
             adjuster._report_progress = lambda *args: None
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+计算结果备忘录测试
+"""
+
+import os
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+MARGIN = ('生产成本月结表', 'J14')
+B11 = ('产品成本', 'B11')
+H11 = ('生产成本月结表', 'H11')
+F20 = ('生产成本月结表', 'F20')
+
+
+class TestEvaluationMemo:
+    """测试备忘录的量化键、输出合并与 LRU 淘汰"""
+
+    def test_quantized_inputs_share_entry(self):
+        """验证量化后相同、顺序不同的输入命中同一条目"""
+        from modules.tax_adjuster.memo import EvaluationMemo
+
+        memo = EvaluationMemo(decimals={MARGIN: 6, B11: 0})
+        memo.store(memo.key({MARGIN: 0.8, B11: 1000.2}), [H11, F20], [1.0, 2.0])
+
+        key = memo.key({B11: 999.8, MARGIN: 0.8000001})
+        assert memo.lookup(key, [F20]) == [2.0]
+        assert memo.lookup(memo.key({MARGIN: 0.81, B11: 1000}), [F20]) is None
+        assert memo.counts() == (1, 1)
+
+    def test_missing_output_is_a_miss(self):
+        """验证请求未缓存的输出时按未命中处理，写入后合并到同一条目"""
+        from modules.tax_adjuster.memo import EvaluationMemo
+
+        memo = EvaluationMemo()
+        key = memo.key({MARGIN: 0.8})
+        memo.store(key, [H11], [1.0])
+
+        assert memo.lookup(key, [H11, F20]) is None
+        memo.store(key, [F20], [2.0])
+        assert memo.lookup(key, [H11, F20]) == [1.0, 2.0]
+        assert len(memo) == 1
+
+    def test_evicts_least_recently_used(self):
+        """验证超出容量时淘汰最久未使用的输入组"""
+        from modules.tax_adjuster.memo import EvaluationMemo
+
+        memo = EvaluationMemo(maxsize=2)
+        keys = [memo.key({MARGIN: m}) for m in (0.7, 0.8, 0.9)]
+        memo.store(keys[0], [H11], [0.0])
+        memo.store(keys[1], [H11], [1.0])
+        memo.lookup(keys[0], [H11])
+        memo.store(keys[2], [H11], [2.0])
+
+        assert memo.lookup(keys[1], [H11]) is None
+        assert memo.lookup(keys[0], [H11]) == [0.0]
+
+    def test_records_match_inputs_and_outputs(self):
+        """验证按输入单元格与输出筛选已缓存的计算结果，输入按请求顺序返回"""
+        from modules.tax_adjuster.memo import EvaluationMemo
+
+        memo = EvaluationMemo()
+        memo.store(memo.key({MARGIN: 0.8, B11: 1000}), [H11, F20], [1.0, 2.0])
+        memo.store(memo.key({MARGIN: 0.9, B11: 0}), [H11], [3.0])
+        memo.store(memo.key({MARGIN: 0.7}), [H11, F20], [4.0, 5.0])
+
+        assert memo.records((MARGIN, B11), (H11, F20)) == [((0.8, 1000.0), [1.0, 2.0])]
+        assert memo.records((B11, MARGIN), (H11,)) == [((1000.0, 0.8), [1.0]), ((0.0, 0.9), [3.0])]
+        assert memo.counts() == (0, 0)
+
+
+class TestSessionMemo:
+    """测试 TaxAdjuster 各搜索路径共用备忘录"""
+
+    def test_repeated_probes_hit_memo(self):
+        """验证重复的扫描行与单点计算命中备忘录，结果不变"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+        adjuster._load_model()
+        try:
+            first = adjuster._find_margin_for_b11(100_000, -10, 10, 0.70, 0.90)
+            hits, misses = adjuster._memo.counts()
+            second = adjuster._find_margin_for_b11(100_000, -10, 10, 0.70, 0.90)
+            assert adjuster._memo.counts()[1] == misses
+            assert adjuster._memo.counts()[0] > hits
+            assert second == first
+
+            # 边界点已由批量计算写入，单点计算同样命中
+            adjuster._calculate({MARGIN: 0.70, B11: 100_000}, [H11, F20])
+            assert adjuster._memo.counts()[1] == misses
+        finally:
+            adjuster._unload_model()
+
+    def test_alternatives_reuse_session_points(self, monkeypatch):
+        """验证备选方案取自会话中的计算点，补点只做一次批量计算，且互不支配"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+        adjuster._load_model()
+        try:
+            optimal = adjuster.find_optimal_margin_v4((59990, 60010), (-40000, 40000), (0.70, 0.90))
+            batches = []
+            evaluate_many = adjuster._backend.evaluate_many
+
+            def counted(inputs, rows, outputs):
+                batches.append(len(rows))
+                return evaluate_many(inputs, rows, outputs)
+
+            monkeypatch.setattr(adjuster._backend, 'evaluate_many', counted)
+            alternatives = adjuster.find_alternative_solutions(optimal, target_H11=60000, num_alternatives=3)
+            records = adjuster._memo.records(adjuster.MARGIN_SEARCH_INPUTS, adjuster.MARGIN_SEARCH_OUTPUTS)
+        finally:
+            adjuster._unload_model()
+
+        assert len(batches) <= 1
+        assert sum(batches) == adjuster._solver_evaluations['alternatives'] <= TaxAdjuster.PARETO_GAP_SAMPLES
+        assert len(alternatives) == 3 and alternatives[0]['label'] == 'H11优先'
+        assert all((alt['margin'], alt['B11']) != (optimal['margin'], optimal['B11']) for alt in alternatives)
+        # H11 优先方案在前沿上：除最优解外没有两个误差都更小的计算点
+        h11_error, f20_error = abs(alternatives[0]['H11'] - 60000), abs(alternatives[0]['F20'])
+        dominating = [
+            inputs for inputs, (h11, f20) in records if abs(h11 - 60000) < h11_error and abs(f20) < f20_error
+        ]
+        assert dominating == [] or dominating == [(round(optimal['margin'], 6), round(optimal['B11']))]
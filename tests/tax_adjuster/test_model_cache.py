@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型磁盘缓存测试
+"""
+
+import os
+import shutil
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+
+class TestModelCacheEviction:
+    """测试缓存大小上限与 LRU 淘汰"""
+
+    def _write_entry(self, cache, name, size, mtime):
+        path = os.path.join(cache.cache_dir, name + cache.SUFFIX)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """验证超出上限时优先淘汰最久未使用的条目"""
+        from modules.tax_adjuster.model_cache import ModelCache
+
+        cache = ModelCache(cache_dir=str(tmp_path), max_bytes=250)
+        oldest = self._write_entry(cache, 'a', 100, 1000)
+        middle = self._write_entry(cache, 'b', 100, 2000)
+        newest = self._write_entry(cache, 'c', 100, 3000)
+
+        cache.evict()
+
+        assert not os.path.exists(oldest)
+        assert os.path.exists(middle)
+        assert os.path.exists(newest)
+
+    def test_ignores_unrelated_files(self, tmp_path):
+        """验证淘汰不会删除非缓存文件"""
+        from modules.tax_adjuster.model_cache import ModelCache
+
+        cache = ModelCache(cache_dir=str(tmp_path), max_bytes=0)
+        other = tmp_path / 'notes.txt'
+        other.write_text('keep')
+        self._write_entry(cache, 'a', 10, 1000)
+
+        cache.evict()
+
+        assert other.exists()
+        assert os.listdir(tmp_path) == ['notes.txt']
+
+
+class TestModelCacheRoundTrip:
+    """测试缓存读写与失效"""
+
+    @pytest.fixture
+    def workbook(self, tmp_path):
+        """复制示例工作簿到临时目录"""
+        path = tmp_path / 'book.xlsx'
+        shutil.copy2(SAMPLE_WORKBOOK, path)
+        return str(path)
+
+    def test_digest_changes_with_content(self, workbook):
+        """验证文件内容变化后哈希变化（缓存自动失效）"""
+        from modules.tax_adjuster.model_cache import ModelCache
+
+        before = ModelCache.file_digest(workbook)
+        with open(workbook, 'ab') as f:
+            f.write(b'\0')
+        after = ModelCache.file_digest(workbook)
+
+        assert before != after
+
+    def test_cached_model_matches_original(self, workbook, tmp_path):
+        """验证从缓存加载的模型与直接编译的模型计算结果一致"""
+        import formulas
+        from modules.tax_adjuster.model_cache import ModelCache
+
+        cache = ModelCache(cache_dir=str(tmp_path / 'cache'))
+        digest = cache.file_digest(workbook)
+        assert cache.load(digest) is None
+
+        model = formulas.ExcelModel().loads(workbook).finish()
+        cache.save(digest, 'book.xlsx', model)
+
+        filename, cached_model = cache.load(digest)
+        assert filename == 'book.xlsx'
+
+        key = "'[book.xlsx]测算表'!G22"
+        inputs = {"'[book.xlsx]测算表'!E18": 150000}
+        expected = model.calculate(inputs=inputs)[key].value[0][0]
+        actual = cached_model.calculate(inputs=inputs)[key].value[0][0]
+        assert actual == pytest.approx(expected)
+
+    def test_adjuster_reuses_cache(self, workbook, tmp_path):
+        """验证 TaxAdjuster 第二次加载命中缓存，不再解析工作簿"""
+        from unittest.mock import patch
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+        from modules.tax_adjuster.model_cache import ModelCache
+
+        def read_current(adjuster):
+            adjuster._load_model()
+            try:
+                return adjuster._read_cells(adjuster.CURRENT_DATA_CELLS)
+            finally:
+                adjuster._unload_model()
+
+        cache = ModelCache(cache_dir=str(tmp_path / 'cache'))
+        first = read_current(TaxAdjuster(workbook, model_cache=cache, use_warm_start=False))
+
+        with patch('formulas.ExcelModel.loads', side_effect=AssertionError('应命中缓存')):
+            second = read_current(TaxAdjuster(workbook, model_cache=cache, use_warm_start=False))
+
+        assert second['G22'] == pytest.approx(first['G22'])
+        assert second['E31'] == pytest.approx(first['E31'])
+
+    def test_content_digest_matches_file_digest(self, workbook):
+        """验证按内存中的内容计算的哈希与按文件计算的一致，只加载部分工作表的模型使用不同的哈希"""
+        from modules.tax_adjuster.model_cache import ModelCache
+
+        with open(workbook, 'rb') as f:
+            content = f.read()
+
+        assert ModelCache.content_digest(content) == ModelCache.file_digest(workbook)
+        sheets = ('测算表', '产品成本')
+        assert ModelCache.content_digest(content, sheets) == ModelCache.file_digest(workbook, sheets[::-1])
+        assert ModelCache.content_digest(content, sheets) != ModelCache.content_digest(content)
+
+    def test_adjuster_loads_from_memory(self, workbook, tmp_path):
+        """验证加载时不在工作簿目录生成临时副本，单元格键仍使用原文件名"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        before = sorted(os.listdir(tmp_path))
+        adjuster = TaxAdjuster(workbook, use_model_cache=False, use_warm_start=False)
+        adjuster._load_model()
+        try:
+            assert sorted(os.listdir(tmp_path)) == before
+            assert adjuster._cell_key('测算表', 'G22') == "'[book.xlsx]测算表'!G22"
+            g22 = adjuster._calculate({('测算表', 'E18'): 150000}, [('测算表', 'G22')])[0]
+        finally:
+            adjuster._unload_model()
+
+        assert isinstance(g22, float)
+        assert sorted(os.listdir(tmp_path)) == before
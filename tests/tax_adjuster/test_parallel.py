@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描加工费对照表测试（并行、逐行延拓）
+"""
+
+import os
+import random
+import shutil
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+SCAN_PARAMS = dict(b11_start=20_000, b11_end=200_000, b11_step=40_000)
+
+
+def _scan(workbook, cache, seed, **kwargs):
+    from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+    random.seed(seed)
+    adjuster = TaxAdjuster(workbook, model_cache=cache, use_warm_start=False)
+    return adjuster.scan_b11_margin_table(**{**SCAN_PARAMS, **kwargs})
+
+
+class TestParallelScan:
+    """测试进程池并行扫描与顺序扫描一致"""
+
+    def test_matches_sequential_scan_in_order(self, tmp_path):
+        """验证并行结果与顺序扫描相同，且按 B11 顺序回调"""
+        from modules.tax_adjuster.model_cache import ModelCache
+
+        workbook = str(tmp_path / 'book.xlsx')
+        shutil.copy2(SAMPLE_WORKBOOK, workbook)
+        cache = ModelCache(cache_dir=str(tmp_path / 'cache'))
+
+        # 并行时各行独立搜索，与不延拓的顺序扫描逐行相同
+        sequential = _scan(workbook, cache, seed=3, continuation=False)
+        delivered = []
+        parallel = _scan(workbook, cache, seed=3, workers=2, row_callback=delivered.append)
+
+        assert parallel['table'] == sequential['table']
+        assert delivered == parallel['table']
+        assert [row['B11'] for row in delivered] == sorted(row['B11'] for row in delivered)
+
+    def test_stop_check_cancels_remaining_rows(self, tmp_path):
+        """验证停止请求后不再返回后续行"""
+        from modules.tax_adjuster.model_cache import ModelCache
+
+        workbook = str(tmp_path / 'book.xlsx')
+        shutil.copy2(SAMPLE_WORKBOOK, workbook)
+        cache = ModelCache(cache_dir=str(tmp_path / 'cache'))
+
+        delivered = []
+        result = _scan(
+            workbook, cache, seed=3, workers=2,
+            row_callback=delivered.append,
+            stop_check=lambda: len(delivered) >= 1,
+        )
+
+        assert result['stats']['user_stopped']
+        assert len(result['table']) == 1
+
+    def test_worker_init_failure_is_reported(self, tmp_path):
+        """验证工作进程初始化失败时握手报错，而不是不断重启进程"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+        from modules.tax_adjuster.parallel import WorkerError, WorkerPool
+
+        with WorkerPool(str(tmp_path / 'missing.xlsx'), 1, start_method=TaxAdjuster.PARALLEL_START_METHOD) as pool:
+            with pytest.raises(WorkerError, match='FileNotFoundError'):
+                pool.start()
+
+    def test_falls_back_to_sequential_scan(self, tmp_path):
+        """验证进程池无法启动时改为顺序计算，并记录原因"""
+        from unittest.mock import patch
+        from modules.tax_adjuster.model_cache import ModelCache
+        from modules.tax_adjuster.parallel import WorkerError, WorkerPool
+
+        workbook = str(tmp_path / 'book.xlsx')
+        shutil.copy2(SAMPLE_WORKBOOK, workbook)
+        cache = ModelCache(cache_dir=str(tmp_path / 'cache'))
+
+        sequential = _scan(workbook, cache, seed=3)
+        with patch.object(WorkerPool, 'start', side_effect=WorkerError('启动超时')):
+            fallback = _scan(workbook, cache, seed=3, workers=2)
+
+        assert fallback['table'] == sequential['table']
+        assert fallback['stats']['parallel_error'] == '启动超时'
+        assert sequential['stats']['parallel_error'] is None
+
+
+class TestContinuationScan:
+    """测试逐行延拓扫描"""
+
+    def test_matches_full_range_scan_with_fewer_evaluations(self, tmp_path):
+        """验证延拓扫描逐行收敛情况与整段搜索相同，计算次数更少，回调行与结果表一致"""
+        from modules.tax_adjuster.model_cache import ModelCache
+
+        workbook = str(tmp_path / 'book.xlsx')
+        shutil.copy2(SAMPLE_WORKBOOK, workbook)
+        cache = ModelCache(cache_dir=str(tmp_path / 'cache'))
+        params = dict(b11_start=20_000, b11_end=200_000, b11_step=20_000)
+
+        full = _scan(workbook, cache, seed=5, continuation=False, **params)
+        delivered = []
+        continued = _scan(workbook, cache, seed=5, row_callback=delivered.append, **params)
+
+        assert delivered == continued['table']
+        assert [(row['B11'], row['converged']) for row in continued['table']] == \
+            [(row['B11'], row['converged']) for row in full['table']]
+        for row, reference in zip(continued['table'], full['table']):
+            assert abs(row['margin'] - reference['margin']) < 1e-3
+            assert 'slope' not in row
+        assert continued['stats']['cache_misses'] < full['stats']['cache_misses']
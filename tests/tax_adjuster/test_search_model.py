@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+剪枝子模型测试
+"""
+
+import os
+import random
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+
+@pytest.fixture(scope='module')
+def loaded_adjuster():
+    """加载示例工作簿的 TaxAdjuster（不使用磁盘缓存）"""
+    from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+    adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+    adjuster._load_model()
+    yield adjuster
+    adjuster._unload_model()
+
+
+class TestSearchModel:
+    """测试剪枝子模型与完整模型结果一致"""
+
+    def test_matches_full_model(self, loaded_adjuster):
+        """验证随机输入下子模型输出与完整模型一致"""
+        from modules.tax_adjuster.backends import FormulasBackend
+
+        adjuster = loaded_adjuster
+        rng = random.Random(0)
+
+        for _ in range(3):
+            inputs = {
+                ('测算表', 'E18'): rng.uniform(adjuster.E18_MIN, 1_000_000),
+                ('测算表', 'G25'): rng.uniform(adjuster.G25_MIN, adjuster.G25_MAX),
+                (adjuster.MARGIN_SHEET, adjuster.MARGIN_CELL): rng.uniform(adjuster.MARGIN_MIN, adjuster.MARGIN_MAX),
+                ('产品成本', 'B11'): rng.uniform(adjuster.B11_MIN, adjuster.B11_MAX),
+            }
+            pruned = adjuster._calculate(inputs, adjuster.SEARCH_OUTPUTS)
+            full = adjuster._model.calculate(
+                inputs={adjuster._cell_key(*cell): value for cell, value in inputs.items()}
+            )
+
+            for (sheet, cell), actual in zip(adjuster.SEARCH_OUTPUTS, pruned):
+                expected = adjuster._to_number(FormulasBackend.scalar(full.get(adjuster._cell_key(sheet, cell))))
+                assert actual == pytest.approx(expected), f"{sheet}!{cell}"
+
+    def test_returns_requested_cells_as_floats(self, loaded_adjuster):
+        """验证 _calculate 只返回请求的输出单元格，且均为 Python float"""
+        adjuster = loaded_adjuster
+        outputs = [(adjuster.MARGIN_SHEET, 'F20'), ('测算表', 'G22')]
+
+        values = adjuster._calculate({('测算表', 'E18'): 250_000}, outputs)
+
+        assert isinstance(values, tuple)
+        assert len(values) == len(outputs)
+        assert all(type(value) is float for value in values)
+
+    def test_falls_back_for_other_inputs(self, loaded_adjuster):
+        """验证输入不在搜索输入范围内时使用完整模型"""
+        adjuster = loaded_adjuster
+        search_model = adjuster._get_search_model()
+
+        assert search_model is not None
+        assert not search_model.accepts({adjuster._cell_key('测算表', 'B2'): 1})
+
+
+class TestIncrementalEvaluation:
+    """测试增量重算与完整重算结果一致"""
+
+    def test_incremental_matches_full_recalculation(self, loaded_adjuster):
+        """验证逐个修改输入时增量结果与完整重算一致（开启校验开关）"""
+        from modules.tax_adjuster.search_model import SearchModel
+
+        adjuster = loaded_adjuster
+        search_model = SearchModel(
+            adjuster._model,
+            [adjuster._cell_key(sheet, cell) for sheet, cell in adjuster.SEARCH_INPUTS],
+            [adjuster._cell_key(sheet, cell) for sheet, cell in adjuster.SEARCH_OUTPUTS],
+            base_solution=adjuster._backend.solution(),
+            verify_incremental=True,
+        )
+        assert search_model._incremental is not None
+
+        e18_key = adjuster._cell_key('测算表', 'E18')
+        g25_key = adjuster._cell_key('测算表', 'G25')
+        # 模拟二分搜索：每次只修改一个输入
+        for e18 in (0, 5_000_000, 2_500_000, 1_250_000):
+            search_model.calculate({e18_key: e18})
+        for g25 in (0.85, 1.0, 0.925):
+            search_model.calculate({e18_key: 1_250_000, g25_key: g25})
+
+    def test_verify_switch_checks_generated_code(self, loaded_adjuster):
+        """验证后端开启校验开关后，生成函数的结果也与完整重算比对，不一致时报错"""
+        from unittest.mock import patch
+        from modules.tax_adjuster.search_model import SearchModel
+
+        adjuster = loaded_adjuster
+        search_model = adjuster._get_search_model()
+        assert search_model._kernel is not None
+
+        e18_key = adjuster._cell_key('测算表', 'E18')
+        backend = adjuster._backend
+        backend.verify_incremental = True
+        try:
+            with patch.object(SearchModel, '_recalculate', autospec=True,
+                              side_effect=SearchModel._recalculate) as recalculate:
+                backend.solution({e18_key: 123_456})
+                backend.solution_many([e18_key], [[234_567], [345_678]])
+            assert recalculate.call_count == 3
+
+            kernel = search_model._kernel
+            search_model._kernel = lambda *args: [value * 1.01 for value in kernel(*args)]
+            try:
+                with pytest.raises(RuntimeError):
+                    backend.solution({e18_key: 456_789})
+            finally:
+                search_model._kernel = kernel
+        finally:
+            backend.verify_incremental = False
+
+
+class TestEvaluateMany:
+    """测试批量计算与逐个计算结果一致"""
+
+    def test_matches_single_evaluations(self, loaded_adjuster):
+        """验证乱序输入网格的批量结果与逐个 _calculate 一致且保持行顺序"""
+        adjuster = loaded_adjuster
+        rng = random.Random(1)
+        points = [
+            (rng.uniform(adjuster.MARGIN_MIN, adjuster.MARGIN_MAX), rng.choice([0, 50_000, 100_000]))
+            for _ in range(8)
+        ]
+
+        values = adjuster.evaluate_many(
+            points, adjuster.MARGIN_SEARCH_INPUTS, adjuster.MARGIN_SEARCH_OUTPUTS
+        )
+
+        assert values.shape == (len(points), 2)
+        for point, row in zip(points, values):
+            expected = adjuster._calculate(
+                dict(zip(adjuster.MARGIN_SEARCH_INPUTS, point)), adjuster.MARGIN_SEARCH_OUTPUTS
+            )
+            assert tuple(row) == pytest.approx(expected)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+灵敏度矩阵与 what_if 估算测试
+"""
+
+import os
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+
+@pytest.fixture(scope='module')
+def adjuster():
+    from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+    return TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+
+
+class TestSensitivity:
+    """测试灵敏度矩阵"""
+
+    def test_matrix_shape_and_structure(self, adjuster):
+        """验证矩阵形状，且 G22 只依赖 E18（E18 增加 1 元，G22 减少约 0.1）"""
+        sensitivity = adjuster.sensitivity()
+
+        assert sensitivity['matrix'].shape == (4, 4)
+        assert list(sensitivity['inputs']) == ['E18', 'G25', 'J14', 'B11']
+        assert list(sensitivity['base']) == ['G22', 'E31', 'H11', 'F20']
+        assert sensitivity['matrix'][0, 0] == pytest.approx(-0.1, rel=1e-3)
+        assert sensitivity['matrix'][0, 1:].tolist() == [0, 0, 0]
+
+    def test_computed_once_per_workbook(self, adjuster):
+        """验证重复调用不再计算"""
+        first = adjuster.sensitivity()
+        misses = adjuster._memo.counts()[1]
+
+        assert adjuster.sensitivity() is first
+        assert adjuster._memo.counts()[1] == misses
+
+
+class TestWhatIf:
+    """测试线性估算"""
+
+    def test_estimate_matches_exact_for_tax_inputs(self, adjuster):
+        """验证 E18、G25 小幅变化时估算与实际计算一致"""
+        result = adjuster.what_if({'E18': 1000, 'G25': 0.001}, verify=True)
+
+        assert result['inputs']['E18'] == pytest.approx(adjuster.sensitivity()['inputs']['E18'] + 1000)
+        assert abs(result['error']['G22']) < 1e-3
+        assert abs(result['error']['E31']) < 1e-3
+        assert result['estimate']['G22'] == pytest.approx(result['exact']['G22'] + result['error']['G22'])
+
+    def test_without_verify_has_no_exact(self, adjuster):
+        """验证不验证时只返回估算值"""
+        result = adjuster.what_if({'J14': 0.01})
+
+        assert set(result) == {'inputs', 'estimate'}
+        assert result['estimate']['G22'] == adjuster.sensitivity()['base']['G22']
+
+    def test_unknown_input_raises(self, adjuster):
+        """验证未知的输入单元格名报错"""
+        with pytest.raises(ValueError):
+            adjuster.what_if({'E19': 1})
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+调整器会话（模型在调用之间保持加载）测试
+"""
+
+import os
+import shutil
+from unittest.mock import patch
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """复制示例工作簿到临时目录"""
+    path = tmp_path / 'book.xlsx'
+    shutil.copy2(SAMPLE_WORKBOOK, path)
+    return str(path)
+
+
+def _count_loads(adjuster):
+    """统计后端加载工作簿的次数"""
+    calls = []
+    load = adjuster._backend.load
+
+    def counted(*args, **kwargs):
+        calls.append(args[0])
+        return load(*args, **kwargs)
+
+    patch.object(adjuster._backend, 'load', side_effect=counted).start()
+    return calls
+
+
+class TestSession:
+    """测试会话模式下模型的复用与失效"""
+
+    def test_model_reused_until_content_changes(self, workbook):
+        """验证文件不变或只有修改时间变化时复用模型与备忘录，内容变化后重新加载"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(workbook, use_model_cache=False, use_warm_start=False, keep_loaded=True)
+        loads = _count_loads(adjuster)
+        try:
+            before = adjuster.sensitivity()['base']['G22']
+            adjuster.what_if({'E18': 1000}, verify=True)
+            assert len(loads) == 1 and adjuster._model is not None
+
+            stat = os.stat(workbook)
+            os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            misses = adjuster._memo.counts()[1]
+            adjuster.what_if({'E18': 1000}, verify=True)
+            assert len(loads) == 1
+            assert adjuster._memo.counts()[1] == misses
+
+            adjuster.apply_solution({'E18': 150000})
+            after = adjuster.sensitivity()['base']['G22']
+            assert len(loads) == 2
+            assert after != pytest.approx(before)
+        finally:
+            patch.stopall()
+            adjuster.close()
+
+        assert adjuster._model is None and adjuster._content is None
+        assert len(adjuster._memo) == 0
+
+    def test_default_releases_model_after_each_call(self, workbook):
+        """验证非会话模式下每次调用结束即释放模型"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(workbook, use_model_cache=False, use_warm_start=False)
+        adjuster.sensitivity()
+
+        assert adjuster._model is None and adjuster._content is None
+
+    def test_close_during_use_defers_release(self, workbook):
+        """验证有调用正在使用模型时 close 不释放，调用结束后释放"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(workbook, use_model_cache=False, use_warm_start=False, keep_loaded=True)
+        adjuster._load_model()
+        adjuster.close()
+        assert adjuster._model is not None
+
+        adjuster._unload_model()
+        assert adjuster._model is None
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单变量求根测试
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+
+def _g22_like(x):
+    """与 G22 相似的分段线性递减函数（累进税率拐点）"""
+    tax = np.interp(x, [0, 30_000, 90_000, 300_000, 500_000, 10_000_000],
+                    [0, 1_500, 7_500, 49_500, 109_500, 3_434_500])
+    return float(50_000 - 0.9 * tax - 0.05 * x)
+
+
+class TestBracketedSolvers:
+    """测试 Brent 法与 Illinois 试位法"""
+
+    @pytest.mark.parametrize('method', ['brent', 'illinois'])
+    def test_piecewise_linear_root(self, method):
+        """验证分段线性函数在容差内收敛，且计算次数远少于二分法（~30 次）"""
+        from modules.tax_adjuster import solver
+
+        root = getattr(solver, method)(_g22_like, 0, 10_000_000, tolerance=0.009)
+
+        assert root.converged
+        assert abs(root.value) < 0.009
+        assert root.value == pytest.approx(_g22_like(root.x))
+        assert root.evaluations <= 10
+
+    def test_known_endpoints_are_not_reevaluated(self):
+        """验证给出端点函数值时不再计算端点"""
+        from modules.tax_adjuster.solver import brent
+
+        calls = []
+
+        def f(x):
+            calls.append(x)
+            return x - 0.3
+
+        root = brent(f, 0, 1, tolerance=1e-9, f_low=-0.3, f_high=0.7)
+
+        assert root.converged
+        assert 0 not in calls and 1 not in calls
+        assert root.evaluations == len(calls)
+
+    def test_accept_predicate(self):
+        """验证 accept 判断代替容差（目标范围内即停止）"""
+        from modules.tax_adjuster.solver import brent
+
+        root = brent(lambda x: 100 * x - 80, 0, 1, accept=lambda x, h11: -10 <= h11 <= 10)
+
+        assert root.converged
+        assert -10 <= root.value <= 10
+
+    def test_unbracketed_returns_closest_endpoint(self):
+        """验证区间不包含解时返回最接近目标的端点"""
+        from modules.tax_adjuster.solver import brent
+
+        root = brent(lambda x: x + 5, 0, 5, tolerance=1e-9)
+
+        assert not root.converged
+        assert root.x == 0
+        assert root.evaluations == 2
+
+
+class TestSectionSearch:
+    """测试批量 k 等分法"""
+
+    @staticmethod
+    def _decreasing(batches):
+        """f(x) = 1000 - 0.1 * x，记录每轮批量计算的点数"""
+        def evaluate(points):
+            batches.append(len(points))
+            return 1000 - 0.1 * np.asarray(points, dtype=float)
+        return evaluate
+
+    @pytest.mark.parametrize('sections', [1, 3, 7])
+    def test_finds_root_within_tolerance(self, sections):
+        """验证不同 k 下都能找到满足容差的解"""
+        from modules.tax_adjuster.solver import section_search
+
+        batches = []
+        root = section_search(self._decreasing(batches), 0, 10_000_000, 0, 0.009,
+                              xtol=0.01, sections=sections)
+
+        assert root.converged
+        assert abs(root.value) < 0.009
+        assert set(batches) == {sections}
+        assert root.evaluations == sum(batches)
+
+    def test_more_sections_need_fewer_rounds(self):
+        """验证每轮计算 7 个内点时轮数约为二分法的 1/3"""
+        from modules.tax_adjuster.solver import section_search
+
+        bisection, sections = [], []
+        section_search(self._decreasing(bisection), 0, 10_000_000, 0, 0.009, xtol=0.01, sections=1)
+        section_search(self._decreasing(sections), 0, 10_000_000, 0, 0.009, xtol=0.01, sections=7)
+
+        assert len(sections) <= len(bisection) // 3 + 1
+
+    def test_increasing_function(self):
+        """验证递增函数按方向收缩区间"""
+        from modules.tax_adjuster.solver import section_search
+
+        root = section_search(lambda points: np.asarray(points) - 0.3, 0, 1, 0, 1e-6,
+                              xtol=1e-9, sections=4, decreasing=False)
+
+        assert root.converged
+        assert root.x == pytest.approx(0.3, abs=1e-6)
+
+
+class TestPiecewiseLinear:
+    """测试已知拐点的分段线性求解"""
+
+    KNOTS = (30_000, 90_000, 300_000, 500_000)
+
+    def test_solves_segment_with_one_verification(self):
+        """验证拐点批量计算后线性求解，只需一次验证计算"""
+        from modules.tax_adjuster.solver import piecewise_linear
+
+        batches = []
+
+        def evaluate(points):
+            batches.append(list(points))
+            return [_g22_like(x) for x in points]
+
+        root = piecewise_linear(evaluate, 0, 10_000_000, self.KNOTS, tolerance=0.009,
+                                f_low=_g22_like(0), f_high=_g22_like(10_000_000))
+
+        assert root.converged
+        assert abs(root.value) < 0.009
+        assert batches[0] == list(self.KNOTS)
+        assert len(batches) == 2 and len(batches[1]) == 1
+        assert root.evaluations == len(self.KNOTS) + 1
+
+    def test_falls_back_when_segment_is_not_linear(self):
+        """验证拐点不完整（线段内非线性）时退回 Brent 法仍收敛"""
+        from modules.tax_adjuster.solver import piecewise_linear
+
+        root = piecewise_linear(lambda points: [_g22_like(x) for x in points],
+                                0, 10_000_000, [30_000], tolerance=0.009)
+
+        assert root.converged
+        assert abs(root.value) < 0.009
+
+
+class TestBroyden:
+    """测试有界 Broyden 法联立求解"""
+
+    @staticmethod
+    def _system(points):
+        """与 (G22, E31) 相似的二元系统：第一分量只依赖 x，第二分量同时依赖 x、y"""
+        return [(_g22_like(x), 1_000_000 * y - x / 12 * 11 - 700_000) for x, y in points]
+
+    def test_converges_from_distant_start(self):
+        """验证远离解的初始点也能在少量计算内收敛"""
+        from modules.tax_adjuster.solver import broyden
+
+        root = broyden(self._system, [0, 0.85], low=[0, 0.85], high=[10_000_000, 1.0],
+                       targets=[0, 0], tolerances=[0.009, 0.009], steps=[1.0, 1e-4])
+
+        assert root.converged
+        assert np.all(np.abs(root.value) < 0.009)
+        assert root.evaluations <= 12
+
+    def test_clamps_to_bounds(self):
+        """验证解在区间外时停在边界上且报告未收敛"""
+        from modules.tax_adjuster.solver import broyden
+
+        root = broyden(lambda points: [[x + 5, y - 2] for x, y in points], [0.5, 0.5],
+                       low=[0, 0], high=[1, 1], targets=[0, 0], tolerances=[1e-6, 1e-6],
+                       steps=[1e-3, 1e-3])
+
+        assert not root.converged
+        assert np.all((root.x >= 0) & (root.x <= 1))
+
+
+class TestCombinedAdjustment:
+    """测试 E18、G25 联立求解"""
+
+    def test_joint_matches_sequential(self):
+        """验证联立求解与逐个求解结果一致，且结果格式不变"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        options = dict(use_model_cache=False, use_warm_start=False)
+        joint = TaxAdjuster(SAMPLE_WORKBOOK, **options).calculate_combined_adjustment()
+        sequential = TaxAdjuster(SAMPLE_WORKBOOK, **options).calculate_combined_adjustment(method='sequential')
+
+        assert joint.keys() == sequential.keys()
+        assert joint['verify'].keys() == sequential['verify'].keys()
+        assert joint['in_range']
+        assert abs(joint['verify']['G22']) < 0.009 and abs(joint['verify']['E31']) < 0.009
+        assert joint['target']['E18'] == pytest.approx(sequential['target']['E18'], abs=0.1)
+        assert joint['target']['G25'] == pytest.approx(sequential['target']['G25'], abs=1e-6)
+
+    def test_joint_from_distant_start(self):
+        """验证从远离解的初始点联立求解的计算次数少于逐个求解"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+        adjuster._load_model()
+        try:
+            root = adjuster._solve_E18_G25_jointly(TaxAdjuster.E18_MIN, TaxAdjuster.G25_MIN)
+            assert root.converged
+            assert root.evaluations < 10
+        finally:
+            adjuster._unload_model()
+
+
+class TestFindE18:
+    """测试 E18 搜索返回格式不变"""
+
+    def test_solvers_keep_contract(self):
+        """验证 Brent 法与 k 等分法都返回 (E18, G22, is_in_range, boundary_info)"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+        adjuster._load_model()
+        try:
+            for kwargs in ({}, {'method': 'brent'}, {'sections': 7}):
+                E18, G22, in_range, boundary = adjuster.find_E18_for_target_G22(**kwargs)
+                assert in_range and boundary is None
+                assert abs(G22) < 0.009
+                assert adjuster._get_G22_at_E18(E18) == pytest.approx(G22)
+            assert adjuster._solver_evaluations['E18'] > 0
+        finally:
+            adjuster._unload_model()
+
+    def test_piecewise_needs_fewer_than_eight_evaluations(self):
+        """验证按税率档拐点求解（含边界）少于 8 次计算"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+        adjuster._load_model()
+        try:
+            _, G22, in_range, _ = adjuster.find_E18_for_target_G22()
+            assert in_range and abs(G22) < 0.009
+            assert adjuster._solver_evaluations['E18'] < 8
+        finally:
+            adjuster._unload_model()
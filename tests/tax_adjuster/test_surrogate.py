@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应面代理求解测试
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+MARGIN_RANGE = (0.7, 0.9)
+F20_RANGE = (-40000, 40000)
+
+
+class TestQuadraticSurface:
+    """测试二次响应面"""
+
+    def test_fits_quadratic_exactly(self):
+        """验证对二次函数精确拟合，且能反解 y、给出梯度"""
+        from modules.tax_adjuster.surrogate import QuadraticSurface, grid_design
+
+        def f(points):
+            x, y = points[:, 0], points[:, 1]
+            return 3 + 2 * x - 0.5 * y + x * x + 0.1 * x * y + 0.02 * y * y
+
+        low, high = (0, 0), (2, 10)
+        design = grid_design(low, high)
+        surface = QuadraticSurface(low, high).fit(design, f(design))
+
+        assert design.shape == (9, 2)
+        assert surface.residual < 1e-9
+        assert surface([(1.5, 4)])[0] == pytest.approx(f(np.array([(1.5, 4)]))[0])
+        y = surface.solve_y(1.0, 5.0)
+        assert 0 <= y <= 10
+        assert f(np.array([(1.0, y)]))[0] == pytest.approx(5.0)
+        assert surface.gradient((1.0, 2.0)) == pytest.approx([2 + 2 + 0.2, -0.5 + 0.1 + 0.08])
+
+
+class TestSurrogateSearch:
+    """测试响应面代理求解毛利率"""
+
+    @pytest.fixture
+    def adjuster(self):
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+        adjuster._load_model()
+        yield adjuster
+        adjuster._unload_model()
+
+    def test_matches_v4_with_fewer_model_calls(self, adjuster):
+        """验证目标可达时结果与 v4 一致，模型调用次数更少，计算点数按备忘录未命中统计"""
+        h11_range = (89990, 90010)
+        v4 = adjuster.find_optimal_margin_v4(h11_range, F20_RANGE, MARGIN_RANGE)
+        adjuster._memo.clear()
+        result = adjuster.find_optimal_margin_surrogate(h11_range, F20_RANGE, MARGIN_RANGE)
+
+        stats = result['surrogate']
+        assert result['converged'] and result['h11_ok']
+        assert h11_range[0] <= result['H11'] <= h11_range[1]
+        assert result['margin'] == pytest.approx(v4['margin'], abs=1e-4)
+        assert stats['fallback'] is None
+        assert stats['model_calls'] < v4['iterations']
+        assert stats['points'] == result['iterations']
+        assert stats['points_saved_estimate'] == stats['v4_points_estimate'] - stats['points']
+        assert 'points_saved' not in stats
+
+    def test_unreachable_falls_back_to_v4(self, adjuster):
+        """验证目标不可达时退回 v4，结果与 v4 相同"""
+        h11_range = (-10, 10)
+        v4 = adjuster.find_optimal_margin_v4(h11_range, F20_RANGE, MARGIN_RANGE)
+        adjuster._memo.clear()
+        result = adjuster.find_optimal_margin_surrogate(h11_range, F20_RANGE, MARGIN_RANGE)
+
+        stats = result['surrogate']
+        assert stats['fallback'] == 'unreachable'
+        # 退回时多计算的是 9 个设计点
+        assert stats['points'] == stats['v4_points'] + 9
+        assert stats['points_saved'] == -9
+        assert 'points_saved_estimate' not in stats
+        assert (result['margin'], result['B11'], result['converged']) == (v4['margin'], v4['B11'], v4['converged'])
+
+    def test_inventory_adjustment_reports_stats(self):
+        """验证整体流程可选 surrogate 算法并在统计中报告"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+        result = adjuster.calculate_inventory_margin_adjustment(algorithm='surrogate')
+
+        assert 'surrogate' in result['stats']
+        assert all('surrogate' not in solution for solution in result['solutions'])
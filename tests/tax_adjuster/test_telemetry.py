@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索计时统计测试
+"""
+
+import json
+import os
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+
+class TestSearchTelemetry:
+    """测试计时统计的汇总"""
+
+    def test_phase_name_drops_variable_parts(self):
+        """验证进度消息中的迭代次数、取值等不区分阶段"""
+        from modules.tax_adjuster.telemetry import SearchTelemetry
+
+        assert SearchTelemetry.phase_name("搜索中... (迭代 3)") == "搜索中"
+        assert SearchTelemetry.phase_name("正在计算 B11=20,000...") == "正在计算 B11"
+        assert SearchTelemetry.phase_name("跳过搜索（毛利率过低）") == "跳过搜索"
+        assert SearchTelemetry.phase_name("计算完成") == "计算完成"
+
+    def test_summary_counts_and_percentiles(self):
+        """验证计算次数、点数、耗时百分位与同名阶段累计"""
+        from modules.tax_adjuster.telemetry import SearchTelemetry
+
+        telemetry = SearchTelemetry()
+        telemetry.phase("搜索中... (迭代 1)")
+        for seconds in (0.1, 0.2, 0.3, 0.4):
+            telemetry.record_evaluation(seconds)
+        telemetry.record_evaluation(1.0, points=9)
+        telemetry.record_load(2.0)
+        telemetry.phase("搜索中... (迭代 2)")
+        telemetry.phase("计算完成")
+        summary = telemetry.summary()
+
+        assert (summary['evaluations'], summary['points']) == (5, 13)
+        assert summary['evaluation_time'] == pytest.approx(2.0)
+        assert summary['latency_p50'] == pytest.approx(0.3)
+        assert summary['load_time'] == 2.0
+        assert list(summary['phases']) == ['搜索中', '计算完成']
+
+    def test_empty_summary(self):
+        """验证没有计算时百分位为 None"""
+        from modules.tax_adjuster.telemetry import SearchTelemetry
+
+        summary = SearchTelemetry().summary()
+        assert summary['evaluations'] == 0 and summary['latency_p90'] is None
+
+
+class TestAdjusterTelemetry:
+    """测试计算结果中的计时统计与日志"""
+
+    def test_results_report_and_log(self, tmp_path):
+        """验证每次调用的 stats 含计时统计，并各追加一行日志"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        log_path = tmp_path / 'telemetry.jsonl'
+        adjuster = TaxAdjuster(
+            SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False, telemetry_log=str(log_path),
+        )
+        inventory = adjuster.calculate_inventory_margin_adjustment()
+        combined = adjuster.calculate_combined_adjustment()
+
+        telemetry = inventory['stats']['telemetry']
+        assert telemetry['points'] >= inventory['stats']['cache_misses'] > 0
+        assert telemetry['load_time'] > 0
+        assert '正在加载 Excel 模型' in telemetry['phases']
+        assert sum(telemetry['phases'].values()) <= telemetry['total_time']
+        assert combined['stats']['telemetry']['evaluations'] > 0
+
+        records = [json.loads(line) for line in log_path.read_text(encoding='utf-8').splitlines()]
+        assert [record['operation'] for record in records] == ['inventory', 'combined']
+        assert records[0]['file'] == '洪运来2511.xlsx'
+        assert records[0]['stats']['telemetry'] == telemetry
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+限时搜索（time_budget）测试
+"""
+
+import os
+import time
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+H11_RANGE = (59990, 60010)
+
+
+def _adjuster(delay=0.0, monkeypatch=None):
+    """测试用调整器；delay 大于 0 时每次模型计算额外耗时 delay 秒"""
+    from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+    adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+    if delay:
+        backend = adjuster._backend
+        for name in ('evaluate', 'evaluate_many'):
+            def slow(*args, _compute=getattr(backend, name), **kwargs):
+                time.sleep(delay)
+                return _compute(*args, **kwargs)
+            monkeypatch.setattr(backend, name, slow)
+    return adjuster
+
+
+class TestInventoryTimeBudget:
+    """测试库存毛利率调整的限时模式"""
+
+    def test_zero_budget_returns_current(self):
+        """验证预算为 0 时不做搜索计算，返回当前值作为限时最优解"""
+        result = _adjuster().calculate_inventory_margin_adjustment(
+            h11_range=H11_RANGE, algorithm='v2', time_budget=0,
+        )
+
+        current, best = result['solutions']
+        stats = result['stats']
+        assert stats['timed_out'] and not stats['converged']
+        assert best['label'] == '限时最优解' and best['timed_out']
+        assert (best['margin'], best['H11']) == (current['margin'], current['H11'])
+        assert stats['h11_error'] == pytest.approx(H11_RANGE[0] - current['H11'])
+        assert best['iterations'] == 0
+
+    def test_deadline_returns_best_so_far(self, monkeypatch):
+        """验证搜索中途到时返回已计算点中 H11 误差最小的方案"""
+        result = _adjuster(0.2, monkeypatch).calculate_inventory_margin_adjustment(
+            h11_range=H11_RANGE, algorithm='v2', time_budget=0.5,
+        )
+
+        current, best = result['solutions'][:2]
+        assert result['stats']['timed_out']
+        assert best['timed_out'] and best['converged'] is False
+        assert 1 <= best['iterations'] < 9
+        assert best['h11_error'] <= H11_RANGE[0] - current['H11']
+        assert result['stats']['h11_error'] == best['h11_error']
+
+    def test_generous_budget_converges(self):
+        """验证预算充足时结果与不限时相同"""
+        result = _adjuster().calculate_inventory_margin_adjustment(
+            h11_range=H11_RANGE, time_budget=600,
+        )
+
+        assert result['stats']['converged'] and not result['stats']['timed_out']
+        assert result['stats']['h11_error'] == 0
+        assert len(result['solutions']) == 5
+
+
+class TestScanTimeBudget:
+    """测试对照表扫描的限时模式"""
+
+    def test_scan_stops_at_deadline(self, monkeypatch):
+        """验证到时停止扫描，最后一行标记为限时"""
+        rows = []
+        result = _adjuster(0.2, monkeypatch).scan_b11_margin_table(
+            b11_start=20_000, b11_end=200_000, b11_step=40_000,
+            row_callback=rows.append, time_budget=1.0,
+        )
+
+        stats = result['stats']
+        assert stats['timed_out'] and not stats['user_stopped']
+        assert 1 <= stats['total_rows'] < 5
+        assert rows == result['table']
+        assert all(row['converged'] for row in rows[:-1])
+        assert rows[-1].get('timed_out') or rows[-1]['converged']
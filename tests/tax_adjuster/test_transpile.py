@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公式转译（生成 Python/NumPy 代码）测试
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+
+@pytest.fixture(scope='module')
+def loaded_adjuster():
+    """加载示例工作簿的 TaxAdjuster（不使用磁盘缓存）"""
+    from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+    adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+    adjuster._load_model()
+    yield adjuster
+    adjuster._unload_model()
+
+
+class TestGeneratedCode:
+    """测试生成代码与 formulas 计算结果一致"""
+
+    def test_parity_on_random_inputs(self, loaded_adjuster):
+        """验证安全范围内随机输入下生成代码与完整 formulas 模型一致"""
+        from modules.tax_adjuster.transpile import load_kernel
+
+        adjuster = loaded_adjuster
+        search_model = adjuster._get_search_model()
+        kernel = load_kernel(search_model.generate_source())
+
+        rng = np.random.default_rng(0)
+        n = 5
+        columns = {
+            ('测算表', 'E18'): rng.uniform(adjuster.E18_MIN, adjuster.E18_MAX, n),
+            ('测算表', 'G25'): rng.uniform(adjuster.G25_MIN, adjuster.G25_MAX, n),
+            (adjuster.MARGIN_SHEET, adjuster.MARGIN_CELL): rng.uniform(adjuster.MARGIN_MIN, adjuster.MARGIN_MAX, n),
+            ('产品成本', 'B11'): rng.uniform(adjuster.B11_MIN, adjuster.B11_MAX, n),
+        }
+        keys = {adjuster._cell_key(sheet, cell): values for (sheet, cell), values in columns.items()}
+
+        # 一次调用计算全部输入组
+        outputs = kernel(*[keys[key] for key in search_model.input_keys])
+
+        for i in range(n):
+            inputs = {key: float(values[i]) for key, values in keys.items()}
+            full = adjuster._model.calculate(inputs=inputs)
+            for key, output in zip(search_model.output_keys, outputs):
+                expected = full[key].value[0][0]
+                assert float(np.broadcast_to(output, n)[i]) == pytest.approx(expected, rel=1e-12, abs=1e-9), key
+
+    def test_calculate_uses_generated_code(self, loaded_adjuster):
+        """验证默认情况下子模型使用生成代码计算"""
+        adjuster = loaded_adjuster
+        assert adjuster._get_search_model()._kernel is not None
+
+    def test_generated_code_not_read_from_cache(self, tmp_path):
+        """验证生成代码不写入也不读取缓存目录，每次加载时由模型重新生成"""
+        from unittest.mock import patch
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+        from modules.tax_adjuster.model_cache import ModelCache
+        from modules.tax_adjuster.search_model import SearchModel
+
+        workbook = str(tmp_path / 'book.xlsx')
+        shutil.copy2(SAMPLE_WORKBOOK, workbook)
+        cache = ModelCache(cache_dir=str(tmp_path / 'cache'))
+
+        for _ in range(2):
+            adjuster = TaxAdjuster(workbook, model_cache=cache, use_warm_start=False)
+            adjuster._load_model()
+            try:
+                with patch.object(SearchModel, 'generate_source', autospec=True,
+                                  side_effect=SearchModel.generate_source) as generate:
+                    assert adjuster._get_search_model()._kernel is not None
+                assert generate.call_count == 1
+            finally:
+                adjuster._unload_model()
+
+        assert all(name.endswith(cache.SUFFIX) for name in os.listdir(cache.cache_dir))
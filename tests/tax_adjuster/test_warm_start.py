@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索热启动测试
+"""
+
+import os
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+
+class TestWarmStartStore:
+    """测试上一次求解结果的本地记录"""
+
+    def test_lineage_strips_period_and_suffix(self):
+        """验证同一公司不同期间、不同后缀的工作簿属于同一系列"""
+        from modules.tax_adjuster.warm_start import WarmStartStore
+
+        names = ['洪运来2510.xlsx', '/tmp/洪运来2511-back.xlsx', 'data/洪运来2512-原.xlsx']
+        assert {WarmStartStore.lineage(name) for name in names} == {'洪运来'}
+        assert WarmStartStore.lineage('全量发票查询导出结果-洪运来.xlsx') == '全量发票查询导出结果-洪运来'
+
+    def test_save_merges_solutions(self, tmp_path):
+        """验证年利润与毛利率结果分别保存后合并在同一条记录中"""
+        from modules.tax_adjuster.warm_start import WarmStartStore
+
+        store = WarmStartStore(str(tmp_path))
+        store.save('洪运来', '洪运来2511.xlsx', E18=1000.0, G25=0.9, outputs={'G22': 0.001})
+        store.save('洪运来', '洪运来2512.xlsx', margin=0.8, B11=5000.0, outputs={'H11': 1.0})
+
+        entry = WarmStartStore(str(tmp_path)).load('洪运来')
+        assert (entry['E18'], entry['G25'], entry['margin'], entry['B11']) == (1000.0, 0.9, 0.8, 5000.0)
+        assert entry['outputs'] == {'G22': 0.001, 'H11': 1.0}
+        assert entry['file'] == '洪运来2512.xlsx'
+        assert store.load('其他') is None
+
+    def test_corrupt_store_is_empty(self, tmp_path):
+        """验证记录文件损坏时按无记录处理，且仍可写入"""
+        from modules.tax_adjuster.warm_start import WarmStartStore
+
+        store = WarmStartStore(str(tmp_path))
+        with open(store.path, 'w', encoding='utf-8') as f:
+            f.write('{not json')
+
+        assert store.load('洪运来') is None
+        store.save('洪运来', '洪运来2511.xlsx', E18=1.0)
+        assert store.load('洪运来')['E18'] == 1.0
+
+
+class TestExpandBracket:
+    """测试从上一次结果附近查找区间"""
+
+    def test_extrapolates_toward_target(self):
+        """验证线性响应下一次外推即满足容差"""
+        from modules.tax_adjuster.solver import expand_bracket
+
+        a, b, fa, fb, bracketed, evaluations = expand_bracket(
+            lambda points: [1000 - 0.1 * x for x in points], 5_000, 0, 10_000_000, 2_000, tolerance=1e-6,
+        )
+
+        assert bracketed and a == b == pytest.approx(10_000)
+        assert evaluations == 3
+
+    def test_widens_to_range_when_unreachable(self):
+        """验证目标超出范围时扩大到边界并报告未包含"""
+        from modules.tax_adjuster.solver import expand_bracket
+
+        a, _, _, _, bracketed, evaluations = expand_bracket(
+            lambda points: [x + 5 for x in points], 0.5, 0, 1, 0.01, tolerance=1e-9,
+        )
+
+        assert not bracketed
+        assert a == 0
+        assert evaluations <= 6
+
+
+class TestWarmStartSearch:
+    """测试搜索从上一次结果热启动"""
+
+    def test_e18_warm_start_needs_fewer_evaluations(self):
+        """验证 E18 从附近的点开始时结果相同、计算次数更少"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+        adjuster._load_model()
+        try:
+            cold_E18, cold_G22, _, _ = adjuster.find_E18_for_target_G22()
+            cold = adjuster._solver_evaluations['E18']
+
+            adjuster._memo.clear()
+            warm_E18, warm_G22, in_range, _ = adjuster.find_E18_for_target_G22(start=cold_E18 - 10_000)
+            warm = adjuster._solver_evaluations['E18']
+        finally:
+            adjuster._unload_model()
+
+        assert in_range and abs(warm_G22) < 0.009
+        assert warm_E18 == pytest.approx(cold_E18, abs=0.1)
+        assert warm < cold
+
+    def test_combined_saves_solution(self, tmp_path):
+        """验证整合调整达标后保存本工作簿系列的结果"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+        from modules.tax_adjuster.warm_start import WarmStartStore
+
+        store = WarmStartStore(str(tmp_path))
+        result = TaxAdjuster(SAMPLE_WORKBOOK, warm_start=store, use_model_cache=False).calculate_combined_adjustment()
+
+        entry = store.load('洪运来')
+        assert result['in_range']
+        assert entry['E18'] == result['target']['E18']
+        assert entry['G25'] == result['target']['G25']
+        assert entry['outputs']['G22'] == result['verify']['G22']
+
+    def test_sequential_g25_warm_start(self, tmp_path):
+        """验证逐个求解时 G25 也从上一次结果热启动，统计如实报告"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+        from modules.tax_adjuster.warm_start import WarmStartStore
+
+        store = WarmStartStore(str(tmp_path))
+        cold = TaxAdjuster(SAMPLE_WORKBOOK, warm_start=store, use_model_cache=False)
+        first = cold.calculate_combined_adjustment(method='sequential')
+        warm = TaxAdjuster(SAMPLE_WORKBOOK, warm_start=store, use_model_cache=False)
+        second = warm.calculate_combined_adjustment(method='sequential')
+
+        assert not first['stats']['warm_start'] and second['stats']['warm_start']
+        assert warm._warm_used == {'E18', 'G25'}
+        assert second['target']['G25'] == pytest.approx(first['target']['G25'], abs=1e-6)
+        assert second['stats']['solver_evaluations']['G25'] < first['stats']['solver_evaluations']['G25']
+
+    def test_surrogate_fallback_reports_warm_start(self, tmp_path):
+        """验证响应面退回 v4 且 v4 使用了热启动时，统计报告热启动"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+        from modules.tax_adjuster.warm_start import WarmStartStore
+
+        store = WarmStartStore(str(tmp_path))
+        h11_range = (59990, 60010)
+        first = TaxAdjuster(SAMPLE_WORKBOOK, warm_start=store, use_model_cache=False)
+        assert first.calculate_inventory_margin_adjustment(h11_range=h11_range)['stats']['converged']
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, warm_start=store, use_model_cache=False)
+        adjuster.SURROGATE_MAX_RESIDUAL = -1  # 强制退回 v4
+        result = adjuster.calculate_inventory_margin_adjustment(h11_range=h11_range, algorithm='surrogate')
+
+        assert result['stats']['surrogate']['fallback'] == 'fit_residual'
+        assert result['stats']['warm_start'] and 'B11' not in store.load('洪运来')
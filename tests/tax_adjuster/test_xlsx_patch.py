@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+xlsx 单元格定点读写测试
+"""
+
+import os
+import shutil
+import zipfile
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_WORKBOOK = os.path.join(REPO_DIR, '洪运来2511.xlsx')
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """复制示例工作簿到临时目录"""
+    path = tmp_path / 'book.xlsx'
+    shutil.copy2(SAMPLE_WORKBOOK, path)
+    return str(path)
+
+
+class TestPatchSheet:
+    """测试工作表 XML 的单元格改写"""
+
+    SHEET = (
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        '<row r="2"><c r="A2" s="1"><f>B2*2</f><v>4</v></c><c r="C2" t="s"><v>0</v></c></row>'
+        '<row r="5"><c r="A5"><f t="shared" ref="A5:A6" si="0">B5</f><v>1</v></c></row>'
+        '</sheetData></worksheet>'
+    )
+
+    def test_replaces_and_inserts_in_order(self):
+        """验证覆盖单元格时保留样式，新单元格与新行按顺序插入"""
+        from modules.tax_adjuster.xlsx_patch import _patch_sheet
+
+        xml, replaced_formula = _patch_sheet(self.SHEET, {'A2': 1.5, 'B2': 'x', 'A3': 7, 'C2': None})
+
+        assert replaced_formula
+        assert '<c r="A2" s="1"><v>1.5</v></c><c r="B2" t="inlineStr"><is><t>x</t></is></c><c r="C2"/>' in xml
+        assert xml.index('<row r="3">') < xml.index('<row r="5">')
+        assert '<c r="A3"><v>7</v></c>' in xml
+
+    def test_shared_formula_master_raises(self):
+        """验证不改写共享公式的主单元格"""
+        from modules.tax_adjuster.xlsx_patch import _patch_sheet
+
+        with pytest.raises(ValueError):
+            _patch_sheet(self.SHEET, {'A5': 0})
+
+
+class TestPatchCells:
+    """测试在示例工作簿上写入单元格"""
+
+    def test_only_target_parts_rewritten(self, workbook, tmp_path):
+        """验证只改写目标工作表与 workbook.xml，其他部件的压缩数据不变"""
+        import openpyxl
+        from modules.tax_adjuster.xlsx_patch import patch_cells
+
+        output = str(tmp_path / 'out.xlsx')
+        parts = patch_cells(workbook, {('测算表', 'E18'): 150000, ('产品成本', 'B11'): 20000.5}, output)
+
+        with zipfile.ZipFile(workbook) as before, zipfile.ZipFile(output) as after:
+            assert after.testzip() is None
+            assert [info.filename for info in after.infolist()] == [info.filename for info in before.infolist()]
+            for info in before.infolist():
+                if info.filename not in parts:
+                    patched = after.getinfo(info.filename)
+                    assert (patched.CRC, patched.compress_size) == (info.CRC, info.compress_size)
+        assert len(parts) == 3 and 'xl/workbook.xml' in parts
+
+        original = openpyxl.load_workbook(workbook)
+        wb = openpyxl.load_workbook(output)
+        assert wb['测算表']['E18'].value == 150000
+        assert wb['产品成本']['B11'].value == 20000.5
+        assert wb['测算表']['E18'].number_format == original['测算表']['E18'].number_format
+        assert wb.calculation.fullCalcOnLoad
+
+    def test_unknown_sheet_leaves_file_unchanged(self, workbook, tmp_path):
+        """验证工作表不存在时报错，且不改动文件、不留下临时文件"""
+        from modules.tax_adjuster.xlsx_patch import patch_cells
+
+        with open(workbook, 'rb') as f:
+            content = f.read()
+        with pytest.raises(ValueError):
+            patch_cells(workbook, {('不存在', 'A1'): 1})
+
+        with open(workbook, 'rb') as f:
+            assert f.read() == content
+        assert os.listdir(tmp_path) == ['book.xlsx']
+
+
+class TestReadCachedValues:
+    """测试读取工作簿保存的值"""
+
+    def test_reads_numbers_strings_and_empty_cells(self):
+        """验证数值、共享字符串与空单元格"""
+        from modules.tax_adjuster.xlsx_patch import read_cached_values
+
+        values = read_cached_values(SAMPLE_WORKBOOK, [
+            ('生产成本月结表', 'J14'), ('测算表', 'G22'), ('测算表', 'A2'), ('测算表', 'B47'), ('测算表', 'ZZ999'),
+        ])
+
+        assert values[('生产成本月结表', 'J14')] == pytest.approx(0.71947)
+        assert values[('测算表', 'G22')] == pytest.approx(0.000442190506873885)
+        assert values[('测算表', 'A2')] == '收入'
+        assert values[('测算表', 'B47')] is None
+        assert values[('测算表', 'ZZ999')] is None
+
+    def test_formulas_untrusted_after_patch(self, workbook):
+        """验证写入后工作簿标记为打开时重算，公式单元格不再返回保存的旧结果"""
+        from modules.tax_adjuster.xlsx_patch import patch_cells, read_cached_values
+
+        patch_cells(workbook, {('测算表', 'E18'): 150000})
+        values = read_cached_values(workbook, [('测算表', 'E18'), ('测算表', 'G22')])
+
+        assert values == {('测算表', 'E18'): 150000}
+
+
+class TestCurrentData:
+    """测试当前数据与毛利率单元格的快速读取"""
+
+    def test_current_data_without_model(self):
+        """验证读取当前数据不加载模型，且与模型计算值一致"""
+        from unittest.mock import patch
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(SAMPLE_WORKBOOK, use_model_cache=False, use_warm_start=False)
+        with patch.object(adjuster._backend, 'load', side_effect=AssertionError('不应加载模型')):
+            data = adjuster.get_current_data()
+            is_valid, margin, _ = adjuster._check_margin_cell()
+
+        adjuster._load_model()
+        try:
+            expected = adjuster._read_cells(adjuster.CURRENT_DATA_CELLS + (('测算表', 'B2'),))
+        finally:
+            adjuster._unload_model()
+
+        assert is_valid and margin == pytest.approx(0.71947)
+        assert data.keys() == expected.keys()
+        for name, value in expected.items():
+            assert data[name] == pytest.approx(value, rel=1e-9, abs=1e-9), name
+
+
+class TestApplySolution:
+    """测试把求解结果写回工作簿"""
+
+    def test_written_inputs_are_recalculated(self, workbook):
+        """验证写回 E18 后重新读取的 G22 与按该输入计算的结果一致"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        adjuster = TaxAdjuster(workbook, use_model_cache=False, use_warm_start=False)
+        adjuster._load_model()
+        try:
+            (expected,) = adjuster._calculate({('测算表', 'E18'): 150000}, [('测算表', 'G22')])
+        finally:
+            adjuster._unload_model()
+
+        adjuster.apply_solution({'E18': 150000})
+        data = adjuster.get_current_data()
+
+        assert data['E18'] == 150000
+        assert data['G22'] == pytest.approx(expected)
+
+    def test_unknown_input_raises(self, workbook):
+        """验证未知的输入单元格名报错"""
+        from modules.tax_adjuster.adjust_tax import TaxAdjuster
+
+        with pytest.raises(ValueError):
+            TaxAdjuster(workbook, use_model_cache=False, use_warm_start=False).apply_solution({'E19': 1})